@@ -0,0 +1,59 @@
+"""
+Bounded-Concurrency Batch Runner for the Cognitive Network
+
+Symbols in a batch run concurrently, at most BATCH_CONCURRENCY at a time, each
+with its own BATCH_SYMBOL_TIMEOUT. A failed or timed-out symbol becomes an
+{"symbol", "error"} entry instead of failing the batch, so a watchlist takes
+about as long as its slowest symbol rather than the sum of all of them.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "20"))
+BATCH_SYMBOL_TIMEOUT = float(os.getenv("BATCH_SYMBOL_TIMEOUT", "15"))
+MAX_BATCH_SYMBOLS = int(os.getenv("MAX_BATCH_SYMBOLS", "500"))
+
+def parse_symbols(symbols: str) -> List[str]:
+    """Comma-separated symbols, blanks and duplicates removed, order kept"""
+    return list(dict.fromkeys(s.strip() for s in symbols.split(',') if s.strip()))
+
+class BatchRunner:
+    def __init__(self, process: Callable[[str], Awaitable[Dict[str, Any]]],
+                 concurrency: int = BATCH_CONCURRENCY, timeout: float = BATCH_SYMBOL_TIMEOUT):
+        self.process = process
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    async def run(self, symbols: List[str]) -> List[Dict[str, Any]]:
+        """Results in input order, once every symbol has finished"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*[self._run_one(semaphore, symbol) for symbol in symbols])
+
+    async def stream(self, symbols: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """Results in completion order, as each symbol finishes"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [asyncio.ensure_future(self._run_one(semaphore, symbol)) for symbol in symbols]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # Client went away: stop the symbols still queued or running
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _run_one(self, semaphore: asyncio.Semaphore, symbol: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(self.process(symbol), self.timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Batch symbol {symbol} timed out after {self.timeout}s")
+                return {"symbol": symbol, "error": f"Timed out after {self.timeout}s"}
+            except Exception as e:
+                logger.warning(f"Batch symbol {symbol} failed: {e}")
+                return {"symbol": symbol, "error": str(e)}
@@ -5,18 +5,22 @@ LangGraph Node Network - Autonomous Cognitive Architecture
 
 import asyncio
 import json
-from typing import Dict, Any, List
+import operator
+from typing import Dict, Any, List, Annotated
 from datetime import datetime
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel
-import redis
 import os
 import logging
 import traceback
 from typing import Literal
 from dotenv import load_dotenv
 from shared_state import shared_state
+from batch_runner import BatchRunner, parse_symbols, MAX_BATCH_SYMBOLS
+from http_clients import http_clients
+from redis_publisher import redis_publisher
+from tracing import graph_tracer, node_timeline, TRACE_HISTORY
 
 load_dotenv()
 
@@ -38,35 +42,45 @@ class CognitiveState(BaseModel):
     confidence_threshold: float = 0.6
     risk_tolerance: str = "MEDIUM"
     learning_feedback: Dict[str, Any] = {}
-    node_errors: List[str] = []
+    feedback_rounds: int = 0
+    # Written by parallel branches, so these are merged instead of overwritten
+    node_errors: Annotated[List[str], operator.add] = []
+    node_timings: Annotated[List[Dict[str, Any]], operator.add] = []
+
+# Monitor -> Strategy reinforcement passes allowed per run
+MAX_FEEDBACK_ROUNDS = int(os.getenv("MAX_FEEDBACK_ROUNDS", "1"))
 
 class CognitiveEngine:
     def __init__(self):
-        self.redis_client = redis.Redis(host='localhost', port=6379, db=0)
+        # Node writes are buffered per run and flushed in one pipeline
+        self.publisher = redis_publisher
+        self.tracer = graph_tracer
         self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
+        self.http = http_clients
         self.graph = self._build_cognitive_graph()
         
     def _build_cognitive_graph(self) -> StateGraph:
         """Build the LangGraph cognitive network with conditional edges"""
         workflow = StateGraph(CognitiveState)
         
-        # Add nodes
-        workflow.add_node("data_node", self.data_node)
-        workflow.add_node("indicator_node", self.indicator_node)
-        workflow.add_node("sentiment_node", self.sentiment_node)
-        workflow.add_node("breakout_node", self.breakout_node)
-        workflow.add_node("strategy_node", self.strategy_node)
-        workflow.add_node("execution_node", self.execution_node)
-        workflow.add_node("monitor_node", self.monitor_node)
-        workflow.add_node("adaptive_node", self.adaptive_node)
-        workflow.add_node("error_handler", self.error_handler)
+        # Add nodes; each returns only the state keys it changes, plus its traced timing span
+        workflow.add_node("data_node", self.tracer.wrap("data_node", self.data_node))
+        workflow.add_node("indicator_node", self.tracer.wrap("indicator_node", self.indicator_node))
+        workflow.add_node("sentiment_node", self.tracer.wrap("sentiment_node", self.sentiment_node))
+        workflow.add_node("breakout_node", self.tracer.wrap("breakout_node", self.breakout_node))
+        workflow.add_node("strategy_node", self.tracer.wrap("strategy_node", self.strategy_node))
+        workflow.add_node("execution_node", self.tracer.wrap("execution_node", self.execution_node))
+        workflow.add_node("monitor_node", self.tracer.wrap("monitor_node", self.monitor_node))
+        workflow.add_node("adaptive_node", self.tracer.wrap("adaptive_node", self.adaptive_node))
+        workflow.add_node("error_handler", self.tracer.wrap("error_handler", self.error_handler))
         
         # Define conditional routing
         workflow.set_entry_point("data_node")
+        # Fan out: indicators and sentiment run concurrently in the same step
         workflow.add_edge("data_node", "indicator_node")
         workflow.add_edge("data_node", "sentiment_node")
-        workflow.add_edge("indicator_node", "breakout_node")
-        workflow.add_edge("sentiment_node", "breakout_node")
+        # Join: breakout waits for both branches
+        workflow.add_edge(["indicator_node", "sentiment_node"], "breakout_node")
         
         # Conditional edge based on confidence
         workflow.add_conditional_edges(
@@ -94,7 +108,7 @@ class CognitiveEngine:
         
         return workflow.compile()
     
-    async def data_node(self, state: CognitiveState) -> CognitiveState:
+    async def data_node(self, state: CognitiveState) -> Dict[str, Any]:
         """Market Data Collector Node with error handling"""
         try:
             # Simulate live market data with validation
@@ -111,24 +125,18 @@ class CognitiveEngine:
             if market_data["price"] <= 0 or market_data["volume"] < 0:
                 raise ValueError("Invalid market data")
             
-            state.market_data = market_data
-            state.timestamp = datetime.now().isoformat()
             
-            # Publish to Redis with error handling
-            try:
-                self.redis_client.publish(f"market_data:{state.symbol}", json.dumps(market_data))
-            except Exception as e:
-                logger.warning(f"Redis publish failed: {e}")
+            # Publish to Redis (buffered until the run ends)
+            self.publisher.publish(f"market_data:{state.symbol}", market_data)
             
             logger.info(f"Data node processed {state.symbol}")
-            return state
+            return {"market_data": market_data, "timestamp": datetime.now().isoformat()}
             
         except Exception as e:
             logger.error(f"Data node error: {e}")
-            state.node_errors.append(f"data_node: {str(e)}")
-            return state
+            return {"node_errors": [f"data_node: {str(e)}"]}
     
-    async def indicator_node(self, state: CognitiveState) -> CognitiveState:
+    async def indicator_node(self, state: CognitiveState) -> Dict[str, Any]:
         """Technical Processor Node"""
         price = state.market_data.get("price", 150)
         
@@ -142,14 +150,12 @@ class CognitiveEngine:
             "volatility": abs(state.market_data.get("change_pct", 0)) * 10
         }
         
-        state.indicators = indicators
-        
         # Publish indicators
-        self.redis_client.publish(f"indicators:{state.symbol}", json.dumps(indicators))
+        self.publisher.publish(f"indicators:{state.symbol}", indicators)
         
-        return state
+        return {"indicators": indicators}
     
-    async def sentiment_node(self, state: CognitiveState) -> CognitiveState:
+    async def sentiment_node(self, state: CognitiveState) -> Dict[str, Any]:
         """Context & Emotion Analyzer Node"""
         # Simulate sentiment analysis
         change_pct = state.market_data.get("change_pct", 0)
@@ -168,14 +174,12 @@ class CognitiveEngine:
         if volume > 500000:
             sentiment_score *= 1.2
             
-        state.sentiment_score = max(min(sentiment_score, 1.0), -1.0)
-        
         # Publish sentiment
-        self.redis_client.publish(f"sentiment:{state.symbol}", str(sentiment_score))
+        self.publisher.publish(f"sentiment:{state.symbol}", str(sentiment_score))
         
-        return state
+        return {"sentiment_score": max(min(sentiment_score, 1.0), -1.0)}
     
-    async def breakout_node(self, state: CognitiveState) -> CognitiveState:
+    async def breakout_node(self, state: CognitiveState) -> Dict[str, Any]:
         """Pattern Recognition Engine Node"""
         price = state.market_data.get("price", 150)
         rsi = state.indicators.get("rsi", 50)
@@ -193,18 +197,15 @@ class CognitiveEngine:
         elif volatility > 10:
             breakout_signals.append("HIGH_VOLATILITY")
             
-        state.breakout_signals = breakout_signals
-        
         # Publish breakout signals
-        self.redis_client.publish(f"breakouts:{state.symbol}", json.dumps(breakout_signals))
+        self.publisher.publish(f"breakouts:{state.symbol}", breakout_signals)
         
-        return state
+        return {"breakout_signals": breakout_signals}
     
-    async def strategy_node(self, state: CognitiveState) -> CognitiveState:
+    async def strategy_node(self, state: CognitiveState) -> Dict[str, Any]:
         """Decision & Synthesis Core Node - Now uses Strategy Library"""
         try:
             # Call Strategy Engine API
-            import aiohttp
             strategy_request = {
                 "symbol": state.symbol,
                 "market_data": state.market_data,
@@ -214,26 +215,19 @@ class CognitiveEngine:
                 "fusion_method": "weighted_average"
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "http://localhost:8003/evaluate",
-                    json=strategy_request
-                ) as response:
-                    if response.status == 200:
-                        strategy_response = await response.json()
-                        fused_signal = strategy_response["fused_signal"]
-                        
-                        strategy_decision = {
-                            "action": fused_signal["action"],
-                            "confidence": fused_signal["confidence"],
-                            "reasoning": fused_signal["reasoning"],
-                            "risk_level": fused_signal["risk_level"],
-                            "target_price": fused_signal.get("target_price"),
-                            "stop_loss": fused_signal.get("stop_loss"),
-                            "strategy_count": len(strategy_response["individual_signals"])
-                        }
-                    else:
-                        raise Exception(f"Strategy API error: {response.status}")
+            # Pooled, time-limited and circuit-broken; raises on any failure
+            strategy_response = await self.http.get("strategy").post_json("/evaluate", strategy_request)
+            fused_signal = strategy_response["fused_signal"]
+            
+            strategy_decision = {
+                "action": fused_signal["action"],
+                "confidence": fused_signal["confidence"],
+                "reasoning": fused_signal["reasoning"],
+                "risk_level": fused_signal["risk_level"],
+                "target_price": fused_signal.get("target_price"),
+                "stop_loss": fused_signal.get("stop_loss"),
+                "strategy_count": len(strategy_response["individual_signals"])
+            }
                         
         except Exception as e:
             logger.warning(f"Strategy Library unavailable, using fallback: {e}")
@@ -260,17 +254,12 @@ class CognitiveEngine:
                     "risk_level": "MEDIUM"
                 }
         
-        state.strategy_decision = strategy_decision
-        
         # Publish strategy
-        try:
-            self.redis_client.publish(f"strategy:{state.symbol}", json.dumps(strategy_decision))
-        except Exception as e:
-            sentry_sdk.capture_exception(e)
+        self.publisher.publish(f"strategy:{state.symbol}", strategy_decision)
         
-        return state
+        return {"strategy_decision": strategy_decision}
     
-    async def execution_node(self, state: CognitiveState) -> CognitiveState:
+    async def execution_node(self, state: CognitiveState) -> Dict[str, Any]:
         """Trade Placement & Routing Node - Now with Risk Firewall"""
         strategy = state.strategy_decision
         
@@ -288,8 +277,6 @@ class CognitiveEngine:
         if strategy.get("confidence", 0) > 0.6 and strategy.get("action") != "HOLD":
             try:
                 # Call Risk Engine for pre-trade evaluation
-                import aiohttp
-                
                 risk_request = {
                     "trade_request": {
                         "symbol": state.symbol,
@@ -315,47 +302,40 @@ class CognitiveEngine:
                     }
                 }
                 
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        "http://localhost:8004/evaluate",
-                        json=risk_request
-                    ) as response:
-                        if response.status == 200:
-                            risk_response = await response.json()
-                            risk_assessment = risk_response["assessment"]
-                            
-                            # Apply risk firewall decision
-                            if risk_assessment["action"] == "ALLOW":
-                                final_quantity = risk_assessment.get("adjustments", {}).get("quantity", 100)
-                                execution_result.update({
-                                    "status": "EXECUTED",
-                                    "quantity": final_quantity,
-                                    "risk_assessment": risk_assessment
-                                })
-                            elif risk_assessment["action"] == "RESIZE":
-                                final_quantity = risk_assessment["adjustments"]["quantity"]
-                                execution_result.update({
-                                    "status": "EXECUTED",
-                                    "quantity": final_quantity,
-                                    "risk_assessment": risk_assessment
-                                })
-                            elif risk_assessment["action"] == "DELAY":
-                                execution_result.update({
-                                    "status": "DELAYED",
-                                    "quantity": 0,
-                                    "risk_assessment": risk_assessment,
-                                    "delay_reason": risk_assessment["reasoning"]
-                                })
-                            else:  # BLOCK
-                                execution_result.update({
-                                    "status": "BLOCKED",
-                                    "quantity": 0,
-                                    "risk_assessment": risk_assessment,
-                                    "block_reason": risk_assessment["reasoning"]
-                                })
-                        else:
-                            raise Exception(f"Risk API error: {response.status}")
-                            
+                # Pooled, time-limited and circuit-broken; a hung risk engine fails fast to the fallback
+                risk_response = await self.http.get("risk").post_json("/evaluate", risk_request)
+                risk_assessment = risk_response["assessment"]
+                
+                # Apply risk firewall decision
+                if risk_assessment["action"] == "ALLOW":
+                    final_quantity = risk_assessment.get("adjustments", {}).get("quantity", 100)
+                    execution_result.update({
+                        "status": "EXECUTED",
+                        "quantity": final_quantity,
+                        "risk_assessment": risk_assessment
+                    })
+                elif risk_assessment["action"] == "RESIZE":
+                    final_quantity = risk_assessment["adjustments"]["quantity"]
+                    execution_result.update({
+                        "status": "EXECUTED",
+                        "quantity": final_quantity,
+                        "risk_assessment": risk_assessment
+                    })
+                elif risk_assessment["action"] == "DELAY":
+                    execution_result.update({
+                        "status": "DELAYED",
+                        "quantity": 0,
+                        "risk_assessment": risk_assessment,
+                        "delay_reason": risk_assessment["reasoning"]
+                    })
+                else:  # BLOCK
+                    execution_result.update({
+                        "status": "BLOCKED",
+                        "quantity": 0,
+                        "risk_assessment": risk_assessment,
+                        "block_reason": risk_assessment["reasoning"]
+                    })
+                    
             except Exception as e:
                 logger.warning(f"Risk Engine unavailable, using fallback: {e}")
                 # Fallback execution without risk checks
@@ -367,17 +347,12 @@ class CognitiveEngine:
         else:
             execution_result["status"] = "SKIPPED"
             
-        state.execution_result = execution_result
-        
         # Publish execution
-        try:
-            self.redis_client.publish(f"execution:{state.symbol}", json.dumps(execution_result))
-        except Exception as e:
-            sentry_sdk.capture_exception(e)
+        self.publisher.publish(f"execution:{state.symbol}", execution_result)
         
-        return state
+        return {"execution_result": execution_result}
     
-    async def monitor_node(self, state: CognitiveState) -> CognitiveState:
+    async def monitor_node(self, state: CognitiveState) -> Dict[str, Any]:
         """Feedback & Supervision Layer Node"""
         execution = state.execution_result
         
@@ -417,17 +392,17 @@ class CognitiveEngine:
             
             shared_state.set_state(f"performance:{state.symbol}", historical)
         
-        state.monitor_feedback = monitor_feedback
-        
         # Publish monitoring
-        self.redis_client.publish(f"monitor:{state.symbol}", json.dumps(monitor_feedback))
+        self.publisher.publish(f"monitor:{state.symbol}", monitor_feedback)
         
-        return state
+        return {"monitor_feedback": monitor_feedback, "feedback_rounds": state.feedback_rounds + 1}
     
     def should_feedback(self, state: CognitiveState) -> str:
         """Determine if feedback loop should trigger"""
         performance = state.monitor_feedback.get("performance_score", 0.5)
-        return "feedback" if performance < 0.4 else "continue"
+        if performance < 0.4 and state.feedback_rounds <= MAX_FEEDBACK_ROUNDS:
+            return "feedback"
+        return "continue"
     
     def should_execute(self, state: CognitiveState) -> Literal["execute", "skip", "error"]:
         """Conditional routing based on strategy confidence"""
@@ -439,44 +414,45 @@ class CognitiveEngine:
             return "execute"
         return "skip"
     
-    async def adaptive_node(self, state: CognitiveState) -> CognitiveState:
+    async def adaptive_node(self, state: CognitiveState) -> Dict[str, Any]:
         """Adaptive Learning Node - adjusts thresholds based on performance"""
         try:
             performance = state.monitor_feedback.get("performance_score", 0.5)
             
             # Adaptive threshold adjustment
+            confidence_threshold = state.confidence_threshold
             if performance > 0.8:
-                state.confidence_threshold = max(0.5, state.confidence_threshold - 0.05)
+                confidence_threshold = max(0.5, confidence_threshold - 0.05)
             elif performance < 0.4:
-                state.confidence_threshold = min(0.9, state.confidence_threshold + 0.05)
+                confidence_threshold = min(0.9, confidence_threshold + 0.05)
             
             # Store learning feedback
-            state.learning_feedback = {
-                "threshold_adjusted": state.confidence_threshold,
+            learning_feedback = {
+                "threshold_adjusted": confidence_threshold,
                 "performance_trend": "improving" if performance > 0.6 else "declining",
                 "adaptation_timestamp": datetime.now().isoformat()
             }
             
             # Persist learning state
-            self.redis_client.set(
+            self.publisher.set(
                 f"learning:{state.symbol}", 
-                json.dumps(state.learning_feedback)
+                json.dumps(learning_feedback)
             )
             
             logger.info(f"Adaptive learning applied for {state.symbol}")
-            return state
+            return {"confidence_threshold": confidence_threshold, "learning_feedback": learning_feedback}
             
         except Exception as e:
             logger.error(f"Adaptive node error: {e}")
-            return state
+            return {}
     
-    async def error_handler(self, state: CognitiveState) -> CognitiveState:
+    async def error_handler(self, state: CognitiveState) -> Dict[str, Any]:
         """Error Handler Node for graceful failure recovery"""
         try:
             logger.error(f"Processing errors for {state.symbol}: {state.node_errors}")
             
             # Reset to safe defaults
-            state.strategy_decision = {
+            strategy_decision = {
                 "action": "HOLD",
                 "confidence": 0.0,
                 "reasoning": ["Error recovery mode"],
@@ -485,47 +461,61 @@ class CognitiveEngine:
             
             # Log error metrics
             error_count = len(state.node_errors)
-            self.redis_client.incr(f"errors:{state.symbol}:count")
-            self.redis_client.set(f"errors:{state.symbol}:last", json.dumps(state.node_errors))
+            self.publisher.incr(f"errors:{state.symbol}:count")
+            self.publisher.set(f"errors:{state.symbol}:last", json.dumps(state.node_errors))
             
-            return state
+            return {"strategy_decision": strategy_decision}
             
         except Exception as e:
             logger.critical(f"Error handler failed: {e}")
-            return state
+            return {}
+    
+    async def close(self):
+        """Close the pooled HTTP sessions and the Redis client on the loop that created them"""
+        await self.http.close()
+        await self.publisher.stop()
     
     async def process_symbol(self, symbol: str) -> Dict[str, Any]:
         """Process a single symbol through the cognitive network"""
         initial_state = CognitiveState(symbol=symbol)
         
-        # Run through the cognitive graph
-        result = await self.graph.ainvoke(initial_state)
+        # Run through the cognitive graph; its Redis writes go out in one pipeline at the end.
+        # The run's timeline is recorded even if it raises or is cancelled by a batch timeout.
+        with self.tracer.trace_run(symbol) as run:
+            async with self.publisher.run():
+                result = await self.graph.ainvoke(initial_state.model_dump())
+            if result["node_errors"]:
+                run["status"] = "error"
+        
+        timeline = node_timeline(result["node_timings"])
         
         return {
             "symbol": symbol,
-            "timestamp": result.timestamp,
-            "market_data": result.market_data,
-            "indicators": result.indicators,
-            "sentiment_score": result.sentiment_score,
-            "breakout_signals": result.breakout_signals,
-            "strategy_decision": result.strategy_decision,
-            "execution_result": result.execution_result,
-            "monitor_feedback": result.monitor_feedback,
-            "learning_feedback": result.learning_feedback,
-            "node_errors": result.node_errors,
-            "confidence_threshold": result.confidence_threshold
+            "timestamp": result["timestamp"],
+            "market_data": result["market_data"],
+            "indicators": result["indicators"],
+            "sentiment_score": result["sentiment_score"],
+            "breakout_signals": result["breakout_signals"],
+            "strategy_decision": result["strategy_decision"],
+            "execution_result": result["execution_result"],
+            "monitor_feedback": result["monitor_feedback"],
+            "learning_feedback": result["learning_feedback"],
+            "node_errors": result["node_errors"],
+            "confidence_threshold": result["confidence_threshold"],
+            "node_timings": timeline
         }
 
 # FastAPI Integration
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_client import Counter, Histogram, Gauge, generate_latest
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 import time
 
 # Prometheus metrics
-REQUEST_COUNT = Counter('cognitive_requests_total', 'Total requests', ['symbol', 'status'])
-PROCESSING_TIME = Histogram('cognitive_processing_seconds', 'Processing time', ['symbol'])
+# Per-symbol detail lives in /debug/trace/{symbol}; a symbol label on these would be unbounded
+REQUEST_COUNT = Counter('cognitive_requests_total', 'Total requests', ['status'])
+PROCESSING_TIME = Histogram('cognitive_processing_seconds', 'Processing time')
 ACTIVE_NODES = Gauge('cognitive_active_nodes', 'Active nodes', ['node_type'])
 ERROR_COUNT = Counter('cognitive_errors_total', 'Total errors', ['node', 'error_type'])
 
@@ -540,6 +530,7 @@ app.add_middleware(
 )
 
 cognitive_engine = CognitiveEngine()
+batch_runner = BatchRunner(cognitive_engine.process_symbol)
 
 @app.post("/process/{symbol}")
 async def process_symbol(symbol: str):
@@ -550,21 +541,29 @@ async def process_symbol(symbol: str):
         result = await cognitive_engine.process_symbol(symbol)
         
         # Record metrics
-        REQUEST_COUNT.labels(symbol=symbol, status='success').inc()
-        PROCESSING_TIME.labels(symbol=symbol).observe(time.time() - start_time)
+        REQUEST_COUNT.labels(status='success').inc()
+        PROCESSING_TIME.observe(time.time() - start_time)
         
         return result
         
     except Exception as e:
-        REQUEST_COUNT.labels(symbol=symbol, status='error').inc()
+        REQUEST_COUNT.labels(status='error').inc()
         ERROR_COUNT.labels(node='api', error_type=type(e).__name__).inc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.on_event("startup")
+async def start_publisher():
+    await redis_publisher.start()
+
+@app.on_event("shutdown")
+async def close_clients():
+    await cognitive_engine.close()
+
 @app.get("/health")
 async def health_check():
     try:
         # Test Redis connection
-        cognitive_engine.redis_client.ping()
+        await redis_publisher.client.ping()
         return {"status": "healthy", "service": "cognitive_engine", "redis": "connected"}
     except Exception as e:
         return {"status": "unhealthy", "service": "cognitive_engine", "error": str(e)}
@@ -574,20 +573,47 @@ async def metrics():
     """Prometheus metrics endpoint"""
     return Response(generate_latest(), media_type="text/plain")
 
+@app.get("/debug/trace/{symbol}")
+async def debug_trace(symbol: str, limit: int = Query(10, ge=1, le=TRACE_HISTORY)):
+    """Last run timelines for a symbol, newest first, with per-node durations"""
+    runs = graph_tracer.runs(symbol, limit)
+    if not runs:
+        raise HTTPException(status_code=404, detail=f"No traced runs for {symbol}")
+    return {"symbol": symbol, "runs": runs}
+
 @app.post("/batch/{symbols}")
 async def process_batch(symbols: str):
-    """Process multiple symbols (comma-separated)"""
-    symbol_list = [s.strip() for s in symbols.split(',')]
-    results = []
+    """Process multiple symbols (comma-separated) concurrently"""
+    symbol_list = _batch_symbols(symbols)
+    start_time = time.time()
     
-    for symbol in symbol_list:
-        try:
-            result = await cognitive_engine.process_symbol(symbol)
-            results.append(result)
-        except Exception as e:
-            results.append({"symbol": symbol, "error": str(e)})
+    results = await batch_runner.run(symbol_list)
     
-    return {"results": results, "processed": len(results)}
+    return {
+        "results": results,
+        "processed": len(results),
+        "failed": sum(1 for r in results if "error" in r),
+        "elapsed_seconds": round(time.time() - start_time, 3)
+    }
+
+@app.post("/batch/{symbols}/stream")
+async def process_batch_stream(symbols: str):
+    """Process multiple symbols, streaming one NDJSON line per symbol as it completes"""
+    symbol_list = _batch_symbols(symbols)
+    
+    async def lines():
+        async for result in batch_runner.stream(symbol_list):
+            yield json.dumps(result, default=str) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+def _batch_symbols(symbols: str) -> List[str]:
+    symbol_list = parse_symbols(symbols)
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    if len(symbol_list) > MAX_BATCH_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SYMBOLS} symbols per batch")
+    return symbol_list
 
 if __name__ == "__main__":
     import uvicorn
@@ -3,9 +3,11 @@ Celery tasks for distributed cognitive processing
 """
 
 from celery import Celery
+from celery.signals import worker_process_shutdown, worker_shutdown
 import os
 import asyncio
 from cognitive_engine import CognitiveEngine
+from batch_runner import BatchRunner
 
 # Initialize Celery
 redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
@@ -25,33 +27,45 @@ celery_app.conf.update(
 )
 
 cognitive_engine = CognitiveEngine()
+batch_runner = BatchRunner(cognitive_engine.process_symbol)
+
+# One event loop per worker process, reused by every task, so the pooled HTTP
+# sessions and the Redis client (bound to the loop that created them) are
+# reused across tasks instead of being rebuilt and leaked on each one
+_loop = None
+
+def run_async(coro):
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop.run_until_complete(coro)
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_event_loop(**kwargs):
+    """Close the shared clients on their own loop before the loop ends"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+    try:
+        _loop.run_until_complete(cognitive_engine.close())
+    finally:
+        _loop.close()
+        _loop = None
 
 @celery_app.task(bind=True, max_retries=3)
 def process_symbol_realtime(self, symbol: str):
     """Process single symbol in real-time queue"""
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(cognitive_engine.process_symbol(symbol))
-        loop.close()
-        return result
+        return run_async(cognitive_engine.process_symbol(symbol))
     except Exception as e:
         self.retry(countdown=60, exc=e)
 
 @celery_app.task(bind=True)
 def process_symbol_batch(self, symbols: list):
-    """Process multiple symbols in batch"""
-    results = []
-    for symbol in symbols:
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(cognitive_engine.process_symbol(symbol))
-            results.append(result)
-            loop.close()
-        except Exception as e:
-            results.append({"symbol": symbol, "error": str(e)})
-    return results
+    """Process multiple symbols in batch, concurrently on one event loop"""
+    return run_async(batch_runner.run(symbols))
 
 @celery_app.task
 def health_check():
@@ -0,0 +1,174 @@
+"""
+Pooled HTTP Clients for Downstream Services (Strategy Library, Risk Engine)
+
+Each downstream service gets one long-lived aiohttp session with a keep-alive
+connection pool, explicit connect/total timeouts and a circuit breaker. After
+CIRCUIT_FAILURE_THRESHOLD consecutive failures the circuit opens and calls fail
+immediately with CircuitOpenError, so nodes drop to their fallback without
+waiting on a hung service. After CIRCUIT_RESET_SECONDS one trial call is let
+through; its outcome closes or reopens the circuit.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+from prometheus_client import Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_SERVICE_URL = os.getenv("STRATEGY_SERVICE_URL", "http://localhost:8003")
+RISK_SERVICE_URL = os.getenv("RISK_SERVICE_URL", "http://localhost:8004")
+DOWNSTREAM_TIMEOUT = float(os.getenv("DOWNSTREAM_TIMEOUT", "2.0"))
+DOWNSTREAM_CONNECT_TIMEOUT = float(os.getenv("DOWNSTREAM_CONNECT_TIMEOUT", "0.5"))
+DOWNSTREAM_MAX_CONNECTIONS = int(os.getenv("DOWNSTREAM_MAX_CONNECTIONS", "100"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+DOWNSTREAM_LATENCY = Histogram('cognitive_downstream_seconds', 'Downstream service call latency', ['service', 'outcome'])
+CIRCUIT_OPEN = Gauge('cognitive_downstream_circuit_open', 'Whether the circuit to a downstream service is open', ['service'])
+
+class CircuitOpenError(Exception):
+    pass
+
+class DownstreamError(Exception):
+    pass
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds: float = CIRCUIT_RESET_SECONDS, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_running or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        self._trial_running = False
+
+    def release(self):
+        """A call ended without an outcome (e.g. cancelled); let another trial through"""
+        self._trial_running = False
+
+class DownstreamClient:
+    def __init__(self, name: str, base_url: str, timeout: float = DOWNSTREAM_TIMEOUT,
+                 connect_timeout: float = DOWNSTREAM_CONNECT_TIMEOUT,
+                 max_connections: int = DOWNSTREAM_MAX_CONNECTIONS,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.max_connections = max_connections
+        self.breaker = breaker or CircuitBreaker()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def session(self) -> aiohttp.ClientSession:
+        """Shared session for the running loop
+
+        A session is bound to the loop it was created on; whoever owns that loop
+        must await close() before ending it (see cognitive_tasks.run_async).
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._session is not None and not self._session.closed:
+                # Its loop can no longer run the close, so the connections leak
+                logger.warning(f"{self.name} session from a previous event loop was never closed")
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._loop = loop
+        return self._session
+
+    async def post_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        # Only the half-open trial may release the trial slot; calls started while closed must not
+        trial = self.breaker.state == "half_open"
+        if not self.breaker.allow():
+            DOWNSTREAM_LATENCY.labels(service=self.name, outcome="circuit_open").observe(0)
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        start_time = time.perf_counter()
+        outcome = "error"
+        try:
+            async with self.session().post(f"{self.base_url}{path}", json=payload) as response:
+                if response.status >= 500:
+                    raise DownstreamError(f"{self.name} API error: {response.status}")
+                if response.status != 200:
+                    # The service answered; a client error is not a reason to open the circuit
+                    outcome = "rejected"
+                    self.breaker.record_success()
+                    raise DownstreamError(f"{self.name} API error: {response.status}")
+                result = await response.json()
+            outcome = "success"
+            self.breaker.record_success()
+            return result
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            self.breaker.record_failure()
+            raise DownstreamError(f"{self.name} timed out after {self.timeout.total}s")
+        except DownstreamError:
+            if outcome == "error":
+                self.breaker.record_failure()
+            raise
+        except aiohttp.ClientError as e:
+            self.breaker.record_failure()
+            raise DownstreamError(f"{self.name} unreachable: {e}")
+        finally:
+            if trial:
+                self.breaker.release()
+            DOWNSTREAM_LATENCY.labels(service=self.name, outcome=outcome).observe(time.perf_counter() - start_time)
+            CIRCUIT_OPEN.labels(service=self.name).set(1 if self.breaker.opened_at is not None else 0)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+class HTTPClientManager:
+    """One DownstreamClient per service, shared by every node and request"""
+
+    def __init__(self):
+        self.clients: Dict[str, DownstreamClient] = {}
+
+    def register(self, name: str, base_url: str, **kwargs) -> DownstreamClient:
+        self.clients[name] = DownstreamClient(name, base_url, **kwargs)
+        return self.clients[name]
+
+    def get(self, name: str) -> DownstreamClient:
+        return self.clients[name]
+
+    async def close(self):
+        for client in self.clients.values():
+            await client.close()
+
+http_clients = HTTPClientManager()
+http_clients.register("strategy", STRATEGY_SERVICE_URL)
+http_clients.register("risk", RISK_SERVICE_URL, timeout=float(os.getenv("RISK_TIMEOUT", str(DOWNSTREAM_TIMEOUT))))
@@ -0,0 +1,130 @@
+"""
+Pipelined Redis Publishing for the Cognitive Graph
+
+Nodes call publish()/set()/incr() instead of talking to Redis directly. Inside
+`async with publisher.run():` those writes are buffered for the whole graph
+run (the buffer lives in a contextvar, so parallel branches share it) and sent
+in one redis.asyncio pipeline when the run ends - one round-trip per symbol
+instead of one per node. With PUBLISH_IN_BACKGROUND=true and the publisher
+started, the flush is handed to a background task so Redis latency stays off
+the decision path entirely.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, List, Optional, Tuple
+
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+PUBLISH_IN_BACKGROUND = os.getenv("PUBLISH_IN_BACKGROUND", "false").lower() == "true"
+PUBLISH_MAX_PENDING = int(os.getenv("PUBLISH_MAX_PENDING", "10000"))
+
+Op = Tuple[str, tuple]
+
+_run_buffer: contextvars.ContextVar[Optional[List[Op]]] = contextvars.ContextVar("redis_run_buffer", default=None)
+
+class RedisPublisher:
+    def __init__(self, redis_url: str = REDIS_URL, background: bool = PUBLISH_IN_BACKGROUND,
+                 max_pending: int = PUBLISH_MAX_PENDING):
+        self.redis_url = redis_url
+        self.background = background
+        self.max_pending = max_pending
+        self._client: Optional[aioredis.Redis] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> aioredis.Redis:
+        """Async client for the running loop; stop() it before that loop ends"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            if self._client is not None:
+                logger.warning("Redis client from a previous event loop was never closed")
+            self._client = aioredis.Redis.from_url(self.redis_url)
+            self._loop = loop
+        return self._client
+
+    async def start(self):
+        """Start the background flusher (only used when background publishing is on)"""
+        if self.background and self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._worker = asyncio.create_task(self._drain())
+
+    async def stop(self):
+        if self._worker is not None:
+            await self._queue.join()
+            self._worker.cancel()
+            self._worker = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @asynccontextmanager
+    async def run(self):
+        """Buffer every write made inside the block and flush them together at the end"""
+        buffer: List[Op] = []
+        token = _run_buffer.set(buffer)
+        try:
+            yield buffer
+        finally:
+            _run_buffer.reset(token)
+            await self.flush(buffer)
+
+    def publish(self, channel: str, message: Any):
+        payload = message if isinstance(message, (str, bytes)) else json.dumps(message)
+        self._add(("publish", (channel, payload)))
+
+    def set(self, key: str, value: Any):
+        self._add(("set", (key, value)))
+
+    def incr(self, key: str):
+        self._add(("incr", (key,)))
+
+    def _add(self, op: Op):
+        buffer = _run_buffer.get()
+        if buffer is not None:
+            buffer.append(op)
+            return
+        # Outside a run: send on its own
+        try:
+            asyncio.get_running_loop().create_task(self.flush([op]))
+        except RuntimeError:
+            logger.warning(f"Redis {op[0]} dropped: no running event loop")
+
+    async def flush(self, ops: List[Op]):
+        if not ops:
+            return
+        if self._worker is not None:
+            try:
+                self._queue.put_nowait(ops)
+            except asyncio.QueueFull:
+                logger.warning(f"Redis publish queue full, dropping {len(ops)} writes")
+            return
+        await self._execute(ops)
+
+    async def _execute(self, ops: List[Op]):
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for name, args in ops:
+                getattr(pipe, name)(*args)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis pipeline flush failed ({len(ops)} writes): {e}")
+
+    async def _drain(self):
+        while True:
+            ops = await self._queue.get()
+            try:
+                await self._execute(ops)
+            finally:
+                self._queue.task_done()
+
+redis_publisher = RedisPublisher()
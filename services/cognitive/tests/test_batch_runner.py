@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_runner import BatchRunner, parse_symbols
+
+
+def fake_process(delays, failures=()):
+    """process(symbol) that sleeps for delays[symbol] and raises for symbols in failures"""
+    started = []
+
+    async def process(symbol):
+        started.append(symbol)
+        await asyncio.sleep(delays.get(symbol, 0))
+        if symbol in failures:
+            raise ValueError(f"bad symbol {symbol}")
+        return {"symbol": symbol}
+
+    return process, started
+
+
+class TestBatchRunner:
+    def test_parse_symbols(self):
+        assert parse_symbols(" AAPL,MSFT,,AAPL , TSLA ") == ["AAPL", "MSFT", "TSLA"]
+        assert parse_symbols(",,") == []
+
+    def test_run_keeps_input_order(self):
+        process, _ = fake_process({"AAPL": 0.03, "MSFT": 0.0, "TSLA": 0.01})
+        results = asyncio.run(BatchRunner(process).run(["AAPL", "MSFT", "TSLA"]))
+        assert [r["symbol"] for r in results] == ["AAPL", "MSFT", "TSLA"]
+
+    def test_runs_concurrently_up_to_the_limit(self):
+        running = peak = 0
+
+        async def process(symbol):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {"symbol": symbol}
+
+        asyncio.run(BatchRunner(process, concurrency=3).run([f"S{i}" for i in range(10)]))
+        assert peak == 3
+
+    def test_timeouts_and_errors_become_entries(self):
+        process, _ = fake_process({"SLOW": 1.0}, failures={"BAD"})
+        results = asyncio.run(BatchRunner(process, timeout=0.05).run(["AAPL", "SLOW", "BAD"]))
+
+        assert results[0] == {"symbol": "AAPL"}
+        assert results[1]["symbol"] == "SLOW" and "Timed out" in results[1]["error"]
+        assert results[2] == {"symbol": "BAD", "error": "bad symbol BAD"}
+
+    def test_stream_yields_in_completion_order(self):
+        process, _ = fake_process({"AAPL": 0.05, "MSFT": 0.0, "TSLA": 0.02}, failures={"MSFT"})
+
+        async def run():
+            return [result async for result in BatchRunner(process).stream(["AAPL", "MSFT", "TSLA"])]
+
+        results = asyncio.run(run())
+        assert [r["symbol"] for r in results] == ["MSFT", "TSLA", "AAPL"]
+        assert "error" in results[0]
+
+    def test_closing_the_stream_cancels_remaining_symbols(self):
+        finished = []
+
+        async def process(symbol):
+            await asyncio.sleep(0 if symbol == "FAST" else 0.2)
+            finished.append(symbol)
+            return {"symbol": symbol}
+
+        async def run():
+            stream = BatchRunner(process, concurrency=1).stream(["FAST", "SLOW", "QUEUED"])
+            first = await stream.__anext__()
+            await stream.aclose()  # Client disconnected
+            await asyncio.sleep(0.3)
+            return first
+
+        assert asyncio.run(run()) == {"symbol": "FAST"}
+        assert finished == ["FAST"]
@@ -0,0 +1,135 @@
+import asyncio
+import pytest
+import sys
+import os
+from contextlib import asynccontextmanager
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("langgraph")
+pytest.importorskip("langchain_openai")
+pytest.importorskip("aiohttp")
+
+# Clients are built at import; the tests replace every call they would make
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import cognitive_engine
+from cognitive_engine import CognitiveEngine
+
+
+class FakeDownstream:
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    async def post_json(self, path, payload):
+        self.calls += 1
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+class FakeHTTP:
+    def __init__(self, **clients):
+        self.clients = clients
+
+    def get(self, name):
+        return self.clients[name]
+
+    async def close(self):
+        pass
+
+
+class FakePublisher:
+    def __init__(self):
+        self.ops = []
+
+    @asynccontextmanager
+    async def run(self):
+        yield self.ops
+
+    def publish(self, channel, message):
+        self.ops.append(("publish", channel))
+
+    def set(self, key, value):
+        self.ops.append(("set", key))
+
+    def incr(self, key):
+        self.ops.append(("incr", key))
+
+    async def stop(self):
+        pass
+
+
+class FakeSharedState:
+    def __init__(self):
+        self.values = {}
+
+    def get_state(self, key):
+        return self.values.get(key)
+
+    def set_state(self, key, data, ttl=3600):
+        self.values[key] = dict(data)
+
+
+class RecordingEngine(CognitiveEngine):
+    """Records the state breakout_node sees each time it runs"""
+
+    def __init__(self):
+        self.breakout_inputs = []
+        super().__init__()
+
+    async def breakout_node(self, state):
+        self.breakout_inputs.append((dict(state.indicators), state.sentiment_score))
+        return await super().breakout_node(state)
+
+
+def strategy_response(action, confidence):
+    return {
+        "fused_signal": {"action": action, "confidence": confidence, "reasoning": ["test"], "risk_level": "LOW"},
+        "individual_signals": [{}]
+    }
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(cognitive_engine, "shared_state", FakeSharedState())
+    engine = RecordingEngine()
+    engine.publisher = FakePublisher()
+    return engine
+
+
+class TestCognitiveGraph:
+    def test_breakout_runs_once_after_both_branches(self, engine):
+        engine.http = FakeHTTP(strategy=FakeDownstream(strategy_response("HOLD", 0.5)),
+                               risk=FakeDownstream(RuntimeError("not called")))
+
+        result = asyncio.run(engine.process_symbol("AAPL"))
+
+        assert len(engine.breakout_inputs) == 1
+        indicators, sentiment = engine.breakout_inputs[0]
+        assert indicators and sentiment != 0.0  # Both branch results were merged before the join
+
+        spans = {span["node"]: span for span in result["node_timings"]["spans"]}
+        assert [s["node"] for s in result["node_timings"]["spans"]].count("breakout_node") == 1
+        assert spans["breakout_node"]["start_ms"] >= max(spans["indicator_node"]["end_ms"],
+                                                         spans["sentiment_node"]["end_ms"])
+        assert result["node_errors"] == []
+
+    @pytest.mark.parametrize("max_rounds", [0, 1, 3])
+    def test_feedback_loop_stops_after_max_rounds(self, engine, monkeypatch, max_rounds):
+        monkeypatch.setattr(cognitive_engine, "MAX_FEEDBACK_ROUNDS", max_rounds)
+        # Executed at low confidence every time, so the monitor keeps asking for feedback
+        strategy = FakeDownstream(strategy_response("BUY", 0.65))
+        risk = FakeDownstream({"assessment": {"action": "ALLOW", "adjustments": {"quantity": 10}}})
+        engine.http = FakeHTTP(strategy=strategy, risk=risk)
+
+        result = asyncio.run(engine.process_symbol("AAPL"))
+
+        assert strategy.calls == max_rounds + 1
+        assert result["monitor_feedback"]["performance_score"] < 0.4
+        assert result["learning_feedback"]  # The run still reached adaptive_node
+        assert len(engine.breakout_inputs) == 1
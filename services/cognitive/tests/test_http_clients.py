@@ -0,0 +1,197 @@
+import asyncio
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from http_clients import CircuitBreaker, CircuitOpenError, DownstreamClient, DownstreamError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+
+    async def json(self):
+        return self.body
+
+
+class FakeSession:
+    """aiohttp.ClientSession stand-in; each reply is a status code, an exception or an Event to wait on"""
+
+    closed = False
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def post(self, url, json=None):
+        self.calls += 1
+        reply = self.replies.pop(0)
+
+        class Request:
+            async def __aenter__(self):
+                if isinstance(reply, asyncio.Event):
+                    await reply.wait()
+                    return FakeResponse(200, {"ok": True})
+                if isinstance(reply, BaseException):
+                    raise reply
+                return FakeResponse(reply, {"ok": True})
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Request()
+
+
+def make_client(replies, threshold=2, reset=30.0):
+    clock = FakeClock()
+    client = DownstreamClient("test", "http://downstream", breaker=CircuitBreaker(threshold, reset, clock=clock))
+    session = FakeSession(replies)
+    client.session = lambda: session
+    return client, session, clock
+
+
+async def outcome(call):
+    try:
+        return await call
+    except (DownstreamError, CircuitOpenError) as e:
+        return type(e)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_then_half_opens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, reset_seconds=10, clock=clock)
+
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == "closed" and breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state == "open" and not breaker.allow()
+
+        clock.now = 10
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+        assert not breaker.allow()  # One trial at a time
+
+    def test_trial_outcome_closes_or_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow()
+        breaker.record_failure()  # A failed trial reopens at once
+        assert breaker.state == "open"
+
+        clock.now = 20
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed" and breaker.failures == 0
+
+    def test_success_resets_the_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+
+
+class TestDownstreamClient:
+    def test_server_errors_open_the_circuit(self):
+        client, session, _ = make_client([500, aiohttp.ClientError("refused")])
+
+        async def run():
+            return [await outcome(client.post_json("/x", {})) for _ in range(3)]
+
+        assert asyncio.run(run()) == [DownstreamError, DownstreamError, CircuitOpenError]
+        assert session.calls == 2  # The third call never reached the service
+
+    def test_client_errors_do_not_count(self):
+        client, _, _ = make_client([400, 422, 404])
+
+        async def run():
+            return [await outcome(client.post_json("/x", {})) for _ in range(3)]
+
+        assert asyncio.run(run()) == [DownstreamError] * 3
+        assert client.breaker.state == "closed" and client.breaker.failures == 0
+
+    def test_timeouts_count_as_failures(self):
+        client, _, _ = make_client([asyncio.TimeoutError(), asyncio.TimeoutError()])
+
+        async def run():
+            return [await outcome(client.post_json("/x", {})) for _ in range(2)]
+
+        assert asyncio.run(run()) == [DownstreamError, DownstreamError]
+        assert client.breaker.state == "open"
+
+    def test_half_open_lets_one_trial_through(self):
+        gate = asyncio.Event()
+        client, session, clock = make_client([500, 500, gate])
+
+        async def run():
+            await outcome(client.post_json("/x", {}))
+            await outcome(client.post_json("/x", {}))
+            clock.now = 30
+            trial = asyncio.ensure_future(client.post_json("/x", {}))
+            await asyncio.sleep(0)
+            blocked = await outcome(client.post_json("/x", {}))
+            gate.set()
+            return blocked, await trial
+
+        assert asyncio.run(run()) == (CircuitOpenError, {"ok": True})
+        assert session.calls == 3
+        assert client.breaker.state == "closed"
+
+    def test_cancelled_trial_releases_the_slot(self):
+        client, session, clock = make_client([500, 500, asyncio.Event(), 200])
+
+        async def run():
+            await outcome(client.post_json("/x", {}))
+            await outcome(client.post_json("/x", {}))
+            clock.now = 30
+            trial = asyncio.ensure_future(client.post_json("/x", {}))
+            await asyncio.sleep(0)
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+            return await client.post_json("/x", {})
+
+        assert asyncio.run(run()) == {"ok": True}
+        assert client.breaker.state == "closed"
+
+    def test_cancelled_call_from_before_the_trial_keeps_it_exclusive(self):
+        client, session, clock = make_client([asyncio.Event(), 500, 500, asyncio.Event()])
+
+        async def run():
+            straggler = asyncio.ensure_future(client.post_json("/x", {}))  # Started while closed
+            await asyncio.sleep(0)
+            await outcome(client.post_json("/x", {}))
+            await outcome(client.post_json("/x", {}))
+            clock.now = 30
+            trial = asyncio.ensure_future(client.post_json("/x", {}))
+            await asyncio.sleep(0)
+
+            straggler.cancel()
+            await asyncio.gather(straggler, return_exceptions=True)
+            blocked = await outcome(client.post_json("/x", {}))
+            trial.cancel()
+            await asyncio.gather(trial, return_exceptions=True)
+            return blocked
+
+        assert asyncio.run(run()) is CircuitOpenError
+        assert session.calls == 4
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("redis")
+
+from redis_publisher import RedisPublisher
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.ops = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.ops.append((name, args))
+        return queue
+
+    async def execute(self):
+        await self.client.gate.wait()
+        self.client.executed.append(self.ops)
+
+
+class FakeRedis:
+    """redis.asyncio stand-in recording each pipeline execute; close the gate to hold executes"""
+
+    def __init__(self):
+        self.executed = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.closed = False
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        self.closed = True
+
+
+def attach(publisher: RedisPublisher) -> FakeRedis:
+    """Bind a fake client to the running loop, as the client property would"""
+    fake = FakeRedis()
+    publisher._client = fake
+    publisher._loop = asyncio.get_running_loop()
+    return fake
+
+
+class TestRedisPublisher:
+    def test_branch_writes_flush_as_one_pipeline(self):
+        publisher = RedisPublisher(background=False)
+
+        async def branch(name):
+            await asyncio.sleep(0)
+            publisher.publish(f"{name}:AAPL", {"value": 1})
+
+        async def run():
+            fake = attach(publisher)
+            async with publisher.run():
+                await asyncio.gather(branch("indicators"), branch("sentiment"))
+                publisher.set("decision:AAPL", "BUY")
+                publisher.incr("runs:AAPL")
+                assert fake.executed == []  # Nothing is sent before the run ends
+            return fake
+
+        fake = asyncio.run(run())
+        assert len(fake.executed) == 1
+        assert sorted(fake.executed[0]) == sorted([
+            ("publish", ("indicators:AAPL", '{"value": 1}')),
+            ("publish", ("sentiment:AAPL", '{"value": 1}')),
+            ("set", ("decision:AAPL", "BUY")),
+            ("incr", ("runs:AAPL",)),
+        ])
+
+    def test_writes_outside_a_run_are_sent_on_their_own(self):
+        publisher = RedisPublisher(background=False)
+
+        async def run():
+            fake = attach(publisher)
+            publisher.publish("alerts", "up")
+            await asyncio.sleep(0)
+            return fake
+
+        assert asyncio.run(run()).executed == [[("publish", ("alerts", "up"))]]
+
+    def test_background_queue_drops_when_full_and_drains_on_stop(self):
+        publisher = RedisPublisher(background=True, max_pending=1)
+
+        async def run():
+            fake = attach(publisher)
+            fake.gate.clear()  # Hold Redis so the queue backs up
+            await publisher.start()
+
+            await publisher.flush([("incr", ("first",))])
+            await asyncio.sleep(0)  # The worker takes it and blocks on Redis
+            await publisher.flush([("incr", ("second",))])  # Fills the one queue slot
+            await publisher.flush([("incr", ("dropped",))])
+
+            fake.gate.set()
+            await publisher.stop()
+            return fake
+
+        fake = asyncio.run(run())
+        assert fake.executed == [[("incr", ("first",))], [("incr", ("second",))]]
+        assert fake.closed
+        assert publisher._worker is None
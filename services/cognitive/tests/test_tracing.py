@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("prometheus_client")
+
+from tracing import GraphTracer, node_timeline
+
+
+def state(symbol="AAPL"):
+    return SimpleNamespace(symbol=symbol)
+
+
+class TestTracing:
+    def test_timeline_has_the_same_keys_with_or_without_spans(self):
+        empty = node_timeline([])
+        full = node_timeline([
+            {"node": "data_node", "start": 1.0, "end": 1.002, "outcome": "success"},
+            {"node": "indicator_node", "start": 1.002, "end": 1.005, "outcome": "success"},
+            {"node": "sentiment_node", "start": 1.002, "end": 1.003, "outcome": "success"},
+        ])
+
+        assert set(empty) == set(full)
+        assert empty["by_node_ms"] == {} and empty["slowest_node"] is None
+        assert full["slowest_node"] == "indicator_node"
+        assert full["wall_ms"] == pytest.approx(5.0)
+        assert full["node_total_ms"] == pytest.approx(6.0)  # Above wall time: the branches overlapped
+
+    def test_failed_run_is_recorded_with_finished_spans(self):
+        tracer = GraphTracer()
+
+        async def ok(s):
+            return {"value": 1}
+
+        async def boom(s):
+            raise ValueError("bad data")
+
+        async def run():
+            with tracer.trace_run("AAPL"):
+                await tracer.wrap("data_node", ok)(state())
+                await tracer.wrap("indicator_node", boom)(state())
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+
+        [recorded] = tracer.runs("AAPL")
+        assert recorded["status"] == "error"
+        assert recorded["error"] == "ValueError: bad data"
+        assert [(s["node"], s["outcome"]) for s in recorded["spans"]] == [
+            ("data_node", "success"), ("indicator_node", "error")
+        ]
+
+    def test_cancelled_run_is_recorded_with_the_unfinished_node(self):
+        tracer = GraphTracer()
+
+        async def slow(s):
+            await asyncio.sleep(10)
+
+        async def traced():
+            with tracer.trace_run("AAPL"):
+                await tracer.wrap("strategy_node", slow)(state())
+
+        async def run():
+            task = asyncio.ensure_future(traced())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        asyncio.run(run())
+
+        [recorded] = tracer.runs("AAPL")
+        assert (recorded["status"], recorded["error"]) == ("error", "cancelled")
+        assert recorded["spans"][0]["node"] == "strategy_node"
+        assert recorded["spans"][0]["outcome"] == "error"  # Cut short inside the node
+
+    def test_history_and_symbols_are_bounded(self):
+        tracer = GraphTracer(history=2, max_symbols=2)
+        for i in range(3):
+            tracer.record_run("AAPL", node_timeline([]), error=f"run {i}")
+        assert [run["error"] for run in tracer.runs("AAPL")] == ["run 2", "run 1"]
+
+        tracer.record_run("MSFT", node_timeline([]))
+        tracer.record_run("AAPL", node_timeline([]))  # Touching AAPL makes MSFT the oldest
+        tracer.record_run("TSLA", node_timeline([]))
+
+        assert tracer.runs("MSFT") == []
+        assert tracer.runs("AAPL") and tracer.runs("TSLA")
@@ -0,0 +1,146 @@
+"""
+Per-Node Latency Tracing for the Cognitive Graph
+
+Every node is wrapped so that each call:
+  - adds a {node, start, end, outcome} span to the run state (node_timings)
+  - is observed in the cognitive_node_seconds histogram, labelled by node and outcome
+  - opens an OpenTelemetry span under the run span, when opentelemetry is installed
+
+Each run inside `with tracer.trace_run(symbol):` is kept as a millisecond
+timeline in a per-symbol ring buffer (TRACE_HISTORY runs each, for up to
+TRACE_MAX_SYMBOLS symbols), which /debug/trace/{symbol} serves. Runs that raise
+or are cancelled are recorded too, with the spans of the nodes that did finish.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from prometheus_client import Histogram
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # Spans are optional; the histogram and timelines work without them
+    otel_trace = None
+
+TRACE_HISTORY = int(os.getenv("TRACE_HISTORY", "20"))
+TRACE_MAX_SYMBOLS = int(os.getenv("TRACE_MAX_SYMBOLS", "1000"))
+
+# Spans of the run in progress; parallel branches share the list like redis_publisher's buffer
+_run_spans: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = contextvars.ContextVar("trace_run_spans", default=None)
+
+NODE_SECONDS = Histogram(
+    'cognitive_node_seconds', 'Time spent in each cognitive graph node', ['node', 'outcome'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+def node_timeline(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Node spans as millisecond offsets from the run start, with wall and summed node time"""
+    if not spans:
+        return {"spans": [], "wall_ms": 0.0, "node_total_ms": 0.0, "by_node_ms": {}, "slowest_node": None}
+    origin = min(span["start"] for span in spans)
+    timeline = [
+        {
+            "node": span["node"],
+            "outcome": span.get("outcome", "success"),
+            "start_ms": round((span["start"] - origin) * 1000, 3),
+            "end_ms": round((span["end"] - origin) * 1000, 3),
+            "duration_ms": round((span["end"] - span["start"]) * 1000, 3)
+        }
+        for span in sorted(spans, key=lambda span: span["start"])
+    ]
+
+    # Per-node totals (a node can run more than once, e.g. the feedback loop)
+    by_node: Dict[str, float] = {}
+    for span in timeline:
+        by_node[span["node"]] = round(by_node.get(span["node"], 0.0) + span["duration_ms"], 3)
+
+    return {
+        "spans": timeline,
+        # Wall time below the summed node time means branches overlapped
+        "wall_ms": round(max(span["end"] for span in spans) * 1000 - origin * 1000, 3),
+        "node_total_ms": round(sum(span["duration_ms"] for span in timeline), 3),
+        "by_node_ms": by_node,
+        "slowest_node": max(by_node, key=by_node.get)
+    }
+
+class GraphTracer:
+    def __init__(self, history: int = TRACE_HISTORY, max_symbols: int = TRACE_MAX_SYMBOLS):
+        self.history = history
+        self.max_symbols = max_symbols
+        self._runs: "OrderedDict[str, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._otel = otel_trace.get_tracer("cognitive_engine") if otel_trace is not None else None
+
+    def span(self, name: str, **attributes):
+        """OpenTelemetry span (a no-op without opentelemetry or a configured SDK)"""
+        if self._otel is None:
+            return nullcontext()
+        return self._otel.start_as_current_span(name, attributes=attributes)
+
+    def wrap(self, name: str, node):
+        """Node wrapper that times each call and adds its span to the state update"""
+        async def run(state) -> Dict[str, Any]:
+            span = {"node": name, "start": time.perf_counter(), "end": None, "outcome": "error"}
+            spans = _run_spans.get()
+            if spans is not None:
+                spans.append(span)  # Added up front so a run cut short still shows the node it was in
+            with self.span(f"cognitive.{name}", symbol=state.symbol):
+                try:
+                    update = await node(state)
+                    span["outcome"] = "success"
+                finally:
+                    span["end"] = time.perf_counter()
+                    NODE_SECONDS.labels(node=name, outcome=span["outcome"]).observe(span["end"] - span["start"])
+            return {**(update or {}), "node_timings": [span]}
+        return run
+
+    @contextmanager
+    def trace_run(self, symbol: str):
+        """Span for one graph run; its timeline is recorded when the block ends, however it ends
+
+        Yields a dict whose "status" the caller may set (e.g. "error" when nodes reported errors).
+        """
+        run = {"status": "success", "error": None}
+        spans: List[Dict[str, Any]] = []
+        token = _run_spans.set(spans)
+        try:
+            with self.span("cognitive.run", symbol=symbol):
+                yield run
+        except asyncio.CancelledError:
+            run.update(status="error", error="cancelled")
+            raise
+        except Exception as e:
+            run.update(status="error", error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _run_spans.reset(token)
+            now = time.perf_counter()
+            finished = [span if span["end"] is not None else dict(span, end=now, outcome="unfinished") for span in spans]
+            self.record_run(symbol, node_timeline(finished), run["status"], run["error"])
+
+    def record_run(self, symbol: str, timeline: Dict[str, Any], status: str = "success",
+                   error: Optional[str] = None):
+        run = {"symbol": symbol, "status": status, "error": error, "finished_at": datetime.now().isoformat(), **timeline}
+        with self._lock:
+            runs = self._runs.get(symbol)
+            if runs is None:
+                runs = self._runs[symbol] = deque(maxlen=self.history)
+            self._runs.move_to_end(symbol)
+            runs.append(run)
+            while len(self._runs) > self.max_symbols:
+                self._runs.popitem(last=False)
+
+    def runs(self, symbol: str, limit: int = TRACE_HISTORY) -> List[Dict[str, Any]]:
+        """Most recent runs first"""
+        with self._lock:
+            runs = list(self._runs.get(symbol, ()))
+        return runs[::-1][:limit]
+
+graph_tracer = GraphTracer()
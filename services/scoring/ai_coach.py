@@ -1,11 +1,16 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Dict, Any
-import openai
+from typing import List, Dict, Any, Optional, Tuple
+from openai import AsyncOpenAI
+import asyncio
 import os
 from datetime import datetime
 from supabase import create_client
 
+from cache_utils import SingleFlight
+from coach_cache import coach_cache, bucket_key, parse_bucket, RISK_LEVELS, BUCKET_SIGNAL_LIMIT, COACH_FALLBACK_TTL
+
 router = APIRouter()
 
 class RiskProfile(BaseModel):
@@ -27,7 +32,7 @@ class DailySummaryResponse(BaseModel):
     market_outlook: str
 
 # Initialize OpenAI and Supabase
-openai.api_key = os.getenv("OPENAI_API_KEY")
+openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY")) if os.getenv("OPENAI_API_KEY") else None
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_ANON_KEY")
 supabase = create_client(supabase_url, supabase_key)
@@ -36,28 +41,23 @@ supabase = create_client(supabase_url, supabase_key)
 async def generate_daily_summary(request: DailySummaryRequest):
     """Generate personalized daily trading summary with AI coach"""
     try:
-        # Get signals matching user's risk profile
-        matching_signals = await get_matching_signals(request.risk_profile)
-        total_signals = await get_total_signals()
-        
-        # Generate AI coach message
-        coach_message = await generate_coach_message(
-            request.risk_profile, 
-            len(matching_signals), 
-            total_signals
-        )
+        # Precomputed per risk-profile bucket by coach_tasks; computed and cached on a miss
+        summary = await get_bucket_summary(request.risk_profile)
+        matching_signals = summary["signals"]
         
         # Generate recommendations
         recommendations = generate_recommendations(request.risk_profile, matching_signals)
         
         return DailySummaryResponse(
             matching_signals_count=len(matching_signals),
-            total_signals_count=total_signals,
-            coach_message=coach_message,
+            total_signals_count=summary["total_signals_count"],
+            coach_message=summary["coach_message"],
             recommendations=recommendations,
-            market_outlook=await generate_market_outlook()
+            market_outlook=await get_market_outlook()
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate summary: {str(e)}")
 
@@ -65,27 +65,52 @@ async def generate_daily_summary(request: DailySummaryRequest):
 async def get_personalized_signals(request: DailySummaryRequest):
     """Get signals filtered by user's risk profile"""
     try:
-        signals = await get_matching_signals(request.risk_profile)
+        signals = (await get_bucket_summary(request.risk_profile))["signals"]
         
         return {
             "signals": signals,
             "message": f"Found {len(signals)} signals matching your {request.risk_profile.risk_tolerance} risk profile"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get personalized signals: {str(e)}")
 
-async def get_matching_signals(risk_profile: RiskProfile) -> List[Dict[str, Any]]:
-    """Get signals that match user's risk profile"""
+_summary_flight = SingleFlight()
+
+async def get_bucket_summary(risk_profile: RiskProfile) -> Dict[str, Any]:
+    """Cached summary for the profile's bucket; concurrent misses share one computation"""
     try:
-        # Map risk tolerance to signal risk levels
-        risk_level_map = {
-            'conservative': ['low'],
-            'moderate': ['low', 'medium'],
-            'aggressive': ['low', 'medium', 'high']
-        }
-        
-        allowed_risk_levels = risk_level_map.get(risk_profile.risk_tolerance, ['medium'])
+        bucket = bucket_key(risk_profile.risk_tolerance, risk_profile.preferred_sectors, risk_profile.trade_frequency)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    summary = await run_in_threadpool(coach_cache.get_summary, bucket)
+    if summary is not None:
+        return summary
+    return await _summary_flight.do(bucket, lambda: compute_bucket_summary(bucket))
+
+async def compute_bucket_summary(bucket: str, total_signals: Optional[int] = None) -> Dict[str, Any]:
+    """Query signals and write the coach message for one bucket, then cache it"""
+    profile = parse_bucket(bucket)
+    matching_signals = await get_matching_signals(profile["risk_tolerance"], profile["preferred_sectors"])
+    if total_signals is None:
+        total_signals = await get_total_signals()
+        await run_in_threadpool(coach_cache.set_total, total_signals)
+    coach_message, generated = await generate_coach_message(bucket, len(matching_signals), total_signals)
+    await run_in_threadpool(coach_cache.set_summary, bucket, matching_signals, coach_message,
+                            ttl=None if generated else COACH_FALLBACK_TTL)
+    return {
+        "signals": matching_signals,
+        "coach_message": coach_message,
+        "total_signals_count": total_signals,
+        "generated_at": datetime.utcnow().isoformat()
+    }
+
+async def get_matching_signals(risk_tolerance: str, preferred_sectors: List[str]) -> List[Dict[str, Any]]:
+    """Get signals that match a risk profile bucket"""
+    try:
+        allowed_risk_levels = RISK_LEVELS.get(risk_tolerance, ['medium'])
         
         # Build query
         query = supabase.table("signals").select("*").eq("is_active", True)
@@ -94,13 +119,13 @@ async def get_matching_signals(risk_profile: RiskProfile) -> List[Dict[str, Any]
         query = query.in_("risk_level", allowed_risk_levels)
         
         # Filter by preferred sectors if specified
-        if risk_profile.preferred_sectors:
-            query = query.in_("sector", risk_profile.preferred_sectors)
+        if preferred_sectors:
+            query = query.in_("sector", preferred_sectors)
         
         # Order by confidence
-        query = query.order("confidence", desc=True).limit(20)
+        query = query.order("confidence", desc=True).limit(BUCKET_SIGNAL_LIMIT)
         
-        result = query.execute()
+        result = await asyncio.to_thread(query.execute)
         return result.data or []
         
     except Exception as e:
@@ -110,21 +135,28 @@ async def get_matching_signals(risk_profile: RiskProfile) -> List[Dict[str, Any]
 async def get_total_signals() -> int:
     """Get total number of active signals"""
     try:
-        result = supabase.table("signals").select("id", count="exact").eq("is_active", True).execute()
+        query = supabase.table("signals").select("id", count="exact").eq("is_active", True)
+        result = await asyncio.to_thread(query.execute)
         return result.count or 0
     except Exception as e:
         print(f"Error getting total signals: {e}")
         return 0
 
-async def generate_coach_message(risk_profile: RiskProfile, matching_count: int, total_count: int) -> str:
-    """Generate personalized AI coach message"""
+async def generate_coach_message(bucket: str, matching_count: int, total_count: int) -> Tuple[str, bool]:
+    """Generate the AI coach message shared by every user in a risk-profile bucket
+
+    Returns (message, generated); generated is False when the fallback text was used.
+    """
+    profile = parse_bucket(bucket)
     try:
+        if openai_client is None:
+            raise RuntimeError("OPENAI_API_KEY is not set")
+        
         prompt = f"""
-        You are an AI trading coach. Generate a personalized daily message for a trader with this profile:
-        - Risk tolerance: {risk_profile.risk_tolerance}
-        - Holding time: {risk_profile.holding_time}
-        - Trade frequency: {risk_profile.trade_frequency}
-        - Max position size: ${risk_profile.max_position_size}
+        You are an AI trading coach. Generate a daily message for traders with this profile:
+        - Risk tolerance: {profile['risk_tolerance']}
+        - Trade frequency: {profile['trade_frequency']}
+        - Preferred sectors: {', '.join(profile['preferred_sectors']) or 'any'}
         
         Today there are {matching_count} signals matching their profile out of {total_count} total signals.
         
@@ -136,7 +168,7 @@ async def generate_coach_message(risk_profile: RiskProfile, matching_count: int,
         Keep it professional but friendly, like a personal trading mentor.
         """
         
-        response = openai.chat.completions.create(
+        response = await openai_client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a professional trading coach providing personalized guidance."},
@@ -146,9 +178,10 @@ async def generate_coach_message(risk_profile: RiskProfile, matching_count: int,
             temperature=0.7
         )
         
-        return response.choices[0].message.content.strip()
+        return response.choices[0].message.content.strip(), True
         
     except Exception as e:
+        print(f"Coach message generation failed for {bucket}: {e}")
         # Fallback message
         risk_messages = {
             'conservative': f"With your conservative approach, I've found {matching_count} low-risk signals for you today.",
@@ -156,7 +189,7 @@ async def generate_coach_message(risk_profile: RiskProfile, matching_count: int,
             'aggressive': f"For your high-growth strategy, there are {matching_count} signals worth considering today."
         }
         
-        return risk_messages.get(risk_profile.risk_tolerance, f"Found {matching_count} signals matching your profile today.")
+        return risk_messages.get(profile['risk_tolerance'], f"Found {matching_count} signals matching your profile today."), False
 
 def generate_recommendations(risk_profile: RiskProfile, signals: List[Dict[str, Any]]) -> List[str]:
     """Generate personalized recommendations based on profile and signals"""
@@ -187,16 +220,37 @@ def generate_recommendations(risk_profile: RiskProfile, signals: List[Dict[str,
     
     return recommendations[:3]  # Return top 3 recommendations
 
-async def generate_market_outlook() -> str:
-    """Generate general market outlook"""
+_outlook_flight = SingleFlight()
+
+async def get_market_outlook() -> str:
+    """Today's market outlook, generated once per day and shared by every user"""
+    day = datetime.utcnow().date().isoformat()
+    outlook = await run_in_threadpool(coach_cache.get_outlook, day)
+    if outlook is not None:
+        return outlook
+    return await _outlook_flight.do(day, lambda: refresh_market_outlook(day))
+
+async def refresh_market_outlook(day: str) -> str:
+    outlook, generated = await generate_market_outlook()
+    if generated:
+        await run_in_threadpool(coach_cache.set_outlook, day, outlook)
+    else:
+        await run_in_threadpool(coach_cache.set_outlook, day, outlook, ttl=COACH_FALLBACK_TTL)
+    return outlook
+
+async def generate_market_outlook() -> Tuple[str, bool]:
+    """Generate general market outlook; returns (outlook, generated) like generate_coach_message"""
     try:
+        if openai_client is None:
+            raise RuntimeError("OPENAI_API_KEY is not set")
+        
         prompt = """
         Provide a brief 1-sentence market outlook for today based on general market conditions.
         Keep it neutral and educational, avoiding specific predictions.
         Focus on general market sentiment or volatility patterns.
         """
         
-        response = openai.chat.completions.create(
+        response = await openai_client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a market analyst providing general market commentary."},
@@ -206,7 +260,8 @@ async def generate_market_outlook() -> str:
             temperature=0.5
         )
         
-        return response.choices[0].message.content.strip()
+        return response.choices[0].message.content.strip(), True
         
     except Exception as e:
-        return "Mixed market conditions today - stay focused on your strategy."
\ No newline at end of file
+        print(f"Market outlook generation failed: {e}")
+        return "Mixed market conditions today - stay focused on your strategy.", False
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from celery_app import celery_app
-from backtest_tasks import run_backtest
+from backtest_tasks import run_backtest, TIMEFRAME_MINUTES
+from storage import supabase
+from progress import ProgressPublisher, last_event, subscribe, format_sse
+from result_cache import result_cache, request_hash
 from typing import Optional
+import uuid
 
 router = APIRouter()
 
@@ -15,6 +21,7 @@ class BacktestResponse(BaseModel):
     task_id: str
     status: str
     message: str
+    result: Optional[dict] = None
 
 class BacktestStatusResponse(BaseModel):
     task_id: str
@@ -29,19 +36,95 @@ async def trigger_backtest(request: BacktestRequest):
         # Validate inputs
         if request.period_days < 1 or request.period_days > 365:
             raise HTTPException(status_code=400, detail="Period must be between 1 and 365 days")
+        if request.timeframe not in TIMEFRAME_MINUTES:
+            raise HTTPException(status_code=400, detail=f"Unsupported timeframe: {request.timeframe}")
+        
+        bar_seconds = TIMEFRAME_MINUTES[request.timeframe] * 60
+        key = request_hash(request.symbol, request.timeframe, request.period_days,
+                           await run_in_threadpool(result_cache.data_version, request.symbol, bar_seconds))
+        
+        # Identical request on the same market data: reuse the stored result
+        cached = await run_in_threadpool(result_cache.get, key) or await run_in_threadpool(find_backtest_record, key)
+        if cached:
+            return BacktestResponse(
+                task_id=cached["task_id"],
+                status="completed",
+                message=f"Cached backtest result for {request.symbol}",
+                result=cached["result"]
+            )
+        
+        # Identical request already running: share its task
+        task_id = str(uuid.uuid4())
+        running = await run_in_threadpool(result_cache.claim, key, task_id)
+        if running:
+            return BacktestResponse(
+                task_id=running,
+                status="started",
+                message=f"Backtest already running for {request.symbol}"
+            )
+        
+        # Progress state exists before the task does, so the worker's first stage can't be overwritten
+        # and the stream can tell a queued task from an unknown one
+        publisher = ProgressPublisher(task_id)
+        await run_in_threadpool(publisher.stage, 'Queued')
         
         # Start Celery task
-        task = run_backtest.delay(request.symbol, request.timeframe, request.period_days)
+        try:
+            run_backtest.apply_async(
+                args=(request.symbol, request.timeframe, request.period_days),
+                kwargs={"request_hash": key},
+                task_id=task_id
+            )
+        except Exception as e:
+            await run_in_threadpool(result_cache.release, key)
+            await run_in_threadpool(publisher.error, f"Failed to enqueue backtest: {e}")
+            raise
         
         return BacktestResponse(
-            task_id=task.id,
+            task_id=task_id,
             status="started",
             message=f"Backtest started for {request.symbol}"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start backtest: {str(e)}")
 
+def find_backtest_record(key: str) -> Optional[dict]:
+    """Completed backtests row for a request hash, once its Redis entry has expired"""
+    try:
+        rows = supabase.table("backtests").select("*").eq("request_hash", key).limit(1).execute().data
+    except Exception as e:
+        print(f"Backtest record lookup failed: {e}")
+        return None
+    if not rows:
+        return None
+    
+    row = rows[0]
+    cached = {
+        "task_id": row.get("task_id") or row["id"],
+        "result": {
+            "status": "completed",
+            "symbol": row["symbol"],
+            "metrics": row["metrics"],
+            "pdf_url": row["pdf_url"],
+            "csv_url": row["csv_url"],
+            "report_status": row.get("report_status"),
+            "backtest_id": row["id"]
+        }
+    }
+    result_cache.set(key, cached["task_id"], cached["result"])
+    return cached
+
+@router.delete("/backtest/cache/{symbol}")
+async def invalidate_backtest_cache(symbol: str):
+    """Move a symbol's backtests onto a new market data version after a data correction"""
+    version = result_cache.bump_market_data(symbol)
+    if version is None:
+        raise HTTPException(status_code=503, detail="Result cache is unavailable")
+    return {"symbol": symbol.upper(), "market_data_version": version}
+
 @router.get("/backtest/{task_id}", response_model=BacktestStatusResponse)
 async def get_backtest_status(task_id: str):
     """Get backtest job status"""
@@ -78,6 +161,52 @@ async def get_backtest_status(task_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get status: {str(e)}")
 
+def task_outcome(task_id: str):
+    """(state, result or error) from the Celery result backend; blocking"""
+    task = celery_app.AsyncResult(task_id)
+    state = task.state
+    if state == 'SUCCESS':
+        return state, task.result
+    if state == 'FAILURE':
+        return state, str(task.info)
+    return state, None
+
+@router.get("/backtest/{task_id}/stream")
+async def stream_backtest_progress(task_id: str, request: Request):
+    """Server-Sent Events stream of backtest progress, partial equity and metrics"""
+    state, outcome = await run_in_threadpool(task_outcome, task_id)
+    # Celery reports unknown ids as PENDING; without progress state the task is unknown or expired
+    if state == 'PENDING':
+        try:
+            known = await last_event(task_id) is not None
+        except Exception as e:
+            raise HTTPException(status_code=503, detail=f"Progress state unavailable: {str(e)}")
+        if not known:
+            raise HTTPException(status_code=404, detail=f"No backtest task {task_id}")
+
+    async def event_stream():
+        # Already finished: answer from the result backend instead of subscribing
+        if state == 'SUCCESS':
+            yield format_sse({'type': 'complete', 'task_id': task_id, 'result': outcome})
+            return
+        if state == 'FAILURE':
+            yield format_sse({'type': 'error', 'task_id': task_id, 'error': outcome})
+            return
+
+        try:
+            async for event in subscribe(task_id):
+                if await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n" if event is None else format_sse(event)
+        except Exception as e:
+            yield format_sse({'type': 'error', 'task_id': task_id, 'error': f"Progress stream failed: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/backtests")
 async def list_backtests():
     """List all completed backtests"""
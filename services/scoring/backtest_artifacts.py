@@ -0,0 +1,45 @@
+"""
+Columnar backtest artifacts - compressed .npz payloads instead of JSON lists
+"""
+
+import io
+from typing import Any, Dict
+
+import numpy as np
+
+COLUMNS = ["dates", "prices", "signals", "portfolio_values"]
+
+def encode_backtest(backtest_data: Dict[str, Any]) -> bytes:
+    """Serialize the backtest columns into a compressed .npz payload"""
+    buffer = io.BytesIO()
+    np.savez_compressed(
+        buffer,
+        dates=np.asarray(backtest_data["dates"], dtype="datetime64[ns]"),
+        prices=np.asarray(backtest_data["prices"], dtype=np.float64),
+        signals=np.asarray(backtest_data["signals"], dtype="U4"),
+        portfolio_values=np.asarray(backtest_data["portfolio_values"], dtype=np.float64),
+        period_days=np.int64(backtest_data["period_days"]),
+        timeframe=np.str_(backtest_data.get("timeframe", "1d"))
+    )
+    return buffer.getvalue()
+
+def decode_backtest(payload: bytes) -> Dict[str, Any]:
+    """Inverse of encode_backtest"""
+    with np.load(io.BytesIO(payload), allow_pickle=False) as columns:
+        data = {name: columns[name] for name in COLUMNS}
+        data["period_days"] = int(columns["period_days"])
+        data["timeframe"] = str(columns["timeframe"])
+    return data
+
+def summarize_backtest(backtest_data: Dict[str, Any], artifact_url: str) -> Dict[str, Any]:
+    """Small JSON summary stored in the backtests row in place of the full series"""
+    dates = backtest_data["dates"]
+    return {
+        "format": "npz",
+        "artifact_url": artifact_url,
+        "columns": COLUMNS,
+        "bars": int(len(dates)),
+        "timeframe": backtest_data.get("timeframe", "1d"),
+        "start_date": str(dates[0])[:19],
+        "end_date": str(dates[-1])[:19]
+    }
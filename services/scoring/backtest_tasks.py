@@ -3,152 +3,181 @@ import numpy as np
 import pandas as pd
 import json
 from datetime import datetime, timedelta
-from supabase import create_client
 import os
-from report_generator import generate_pdf_report, generate_csv_report
+from backtest_artifacts import encode_backtest, summarize_backtest
+from progress import ProgressPublisher, PROGRESS_CHUNKS
+from result_cache import result_cache
+from report_tasks import render_reports
+from storage import supabase, upload_bytes_to_storage
 
-# Supabase client
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_ANON_KEY")
-supabase = create_client(supabase_url, supabase_key)
+# Bar size in minutes per supported timeframe; intraday sessions are 390 minutes
+TIMEFRAME_MINUTES = {
+    '1m': 1,
+    '5m': 5,
+    '15m': 15,
+    '30m': 30,
+    '1h': 60,
+    '4h': 240,
+    '1d': 1440
+}
 
 @celery_app.task(bind=True)
-def run_backtest(self, symbol: str, timeframe: str, period_days: int):
-    """Run backtest for a symbol and generate report"""
+def run_backtest(self, symbol: str, timeframe: str, period_days: int, request_hash: str = None):
+    """Run backtest for a symbol and queue its reports"""
+    progress = ProgressPublisher(self.request.id)
     try:
         # Update task status
         self.update_state(state='PROGRESS', meta={'status': 'Starting backtest...'})
+        progress.stage('Starting backtest...')
         
-        # Generate mock backtest data
-        backtest_data = generate_mock_backtest(symbol, period_days)
+        # Generate mock backtest data, streaming bars processed, partial equity and
+        # running metrics to subscribers after each chunk of bars
+        periods_per_year = 252 * bars_per_day(timeframe)
+        backtest_data = generate_mock_backtest(
+            symbol, period_days, timeframe,
+            on_progress=lambda values, total: progress.bars(values, total, periods_per_year)
+        )
         
         self.update_state(state='PROGRESS', meta={'status': 'Calculating metrics...'})
+        progress.stage('Calculating metrics...')
         
         # Calculate performance metrics
         metrics = calculate_metrics(backtest_data)
         
-        self.update_state(state='PROGRESS', meta={'status': 'Generating reports...'})
-        
-        # Generate reports
-        pdf_path = generate_pdf_report(symbol, backtest_data, metrics)
-        csv_path = generate_csv_report(symbol, backtest_data, metrics)
-        
         self.update_state(state='PROGRESS', meta={'status': 'Uploading to storage...'})
+        progress.stage('Uploading to storage...')
         
-        # Upload to Supabase Storage
-        pdf_url = upload_to_storage(pdf_path, f"backtests/{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
-        csv_url = upload_to_storage(csv_path, f"backtests/{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        # Upload the columnar artifact; hashed requests get content-addressed paths
+        stamp = request_hash[:16] if request_hash else datetime.now().strftime('%Y%m%d_%H%M%S')
+        artifact_path = f"backtests/{symbol}_{stamp}.npz"
+        artifact_url = upload_bytes_to_storage(encode_backtest(backtest_data), artifact_path)
+        if not artifact_url:
+            raise RuntimeError(f"Failed to store backtest artifact {artifact_path}")
         
-        # Save backtest record
+        # Save backtest record; report URLs are filled in by the report worker
         backtest_record = {
             "symbol": symbol,
             "timeframe": timeframe,
             "period_days": period_days,
-            "results": backtest_data,
+            "results": summarize_backtest(backtest_data, artifact_url),
             "metrics": metrics,
-            "pdf_url": pdf_url,
-            "csv_url": csv_url,
+            "pdf_url": None,
+            "csv_url": None,
+            "report_status": "pending",
+            "request_hash": request_hash,
+            "task_id": self.request.id,
             "created_at": datetime.now().isoformat()
         }
         
-        supabase.table("backtests").insert(backtest_record).execute()
+        inserted = supabase.table("backtests").insert(backtest_record).execute()
+        backtest_id = inserted.data[0]['id'] if inserted.data else None
         
-        return {
+        result = {
             'status': 'completed',
             'symbol': symbol,
             'metrics': metrics,
-            'pdf_url': pdf_url,
-            'csv_url': csv_url
+            'pdf_url': None,
+            'csv_url': None,
+            'report_status': 'pending',
+            'backtest_id': backtest_id
         }
+        if request_hash:
+            result_cache.set(request_hash, self.request.id, result)
+        
+        # Render reports on the reports queue so this worker moves on to the next backtest
+        report = render_reports.apply_async(
+            args=(backtest_id, symbol, artifact_path, metrics, stamp),
+            kwargs={'request_hash': request_hash, 'backtest_task_id': self.request.id},
+            queue='reports'
+        )
+        result['report_task_id'] = report.id
+        progress.complete(result)
+        return result
         
     except Exception as e:
         self.update_state(state='FAILURE', meta={'error': str(e)})
+        progress.error(str(e))
         raise
+    finally:
+        if request_hash:
+            result_cache.release(request_hash)
 
-def generate_mock_backtest(symbol: str, period_days: int):
-    """Generate mock backtest data"""
+def bars_per_day(timeframe: str) -> int:
+    minutes = TIMEFRAME_MINUTES.get(timeframe, 1440)
+    return 1 if minutes >= 1440 else max(1, 390 // minutes)
+
+def generate_mock_backtest(symbol: str, period_days: int, timeframe: str = '1d',
+                           on_progress=None, chunks: int = PROGRESS_CHUNKS):
+    """Generate mock backtest data as columnar NumPy arrays
+
+    The equity curve is built in `chunks` pieces; on_progress(values_so_far, total_bars)
+    is called after each one.
+    """
     np.random.seed(42)  # For reproducible results
     
-    dates = pd.date_range(end=datetime.now(), periods=period_days, freq='D')
+    per_day = bars_per_day(timeframe)
+    n_bars = period_days * per_day
+    dates = pd.date_range(end=datetime.now(), periods=n_bars, freq=pd.Timedelta(minutes=TIMEFRAME_MINUTES.get(timeframe, 1440)))
     
-    # Mock price data
+    # Mock price data; daily drift and volatility scaled to the bar size
     initial_price = 100
-    returns = np.random.normal(0.001, 0.02, period_days)  # Daily returns
-    prices = [initial_price]
-    
-    for ret in returns[1:]:
-        prices.append(prices[-1] * (1 + ret))
+    returns = np.random.normal(0.001 / per_day, 0.02 / np.sqrt(per_day), n_bars)
+    returns[0] = 0.0
+    prices = initial_price * np.cumprod(1 + returns)
     
     # Mock signals (buy/sell decisions)
-    signals = np.random.choice(['BUY', 'SELL', 'HOLD'], period_days, p=[0.3, 0.2, 0.5])
+    signals = np.random.choice(np.array(['BUY', 'SELL', 'HOLD']), n_bars, p=[0.3, 0.2, 0.5])
     
-    # Mock performance
-    portfolio_values = []
-    position = 0
-    cash = 10000
+    # Position after each bar: the last BUY/SELL decision carried forward (BUY = fully invested)
+    decided = signals != 'HOLD'
+    last_decision = np.maximum.accumulate(np.where(decided, np.arange(n_bars), -1))
+    invested = (last_decision >= 0) & (signals[np.maximum(last_decision, 0)] == 'BUY')
     
-    for i, (price, signal) in enumerate(zip(prices, signals)):
-        if signal == 'BUY' and cash > price:
-            shares_to_buy = cash // price
-            position += shares_to_buy
-            cash -= shares_to_buy * price
-        elif signal == 'SELL' and position > 0:
-            cash += position * price
-            position = 0
-            
-        portfolio_value = cash + position * price
-        portfolio_values.append(portfolio_value)
+    # Portfolio grows with the bar return whenever it was invested at the previous close
+    held_return = np.zeros(n_bars)
+    held_return[1:] = returns[1:] * invested[:-1]
+    portfolio_values = np.empty(n_bars)
+    value = 10000.0
+    step = max(1, -(-n_bars // max(1, chunks)))
+    for start in range(0, n_bars, step):
+        end = min(start + step, n_bars)
+        portfolio_values[start:end] = value * np.cumprod(1 + held_return[start:end])
+        value = portfolio_values[end - 1]
+        if on_progress is not None:
+            on_progress(portfolio_values[:end], n_bars)
     
     return {
-        'dates': [d.isoformat() for d in dates],
+        'dates': dates.values,
         'prices': prices,
-        'signals': signals.tolist(),
+        'signals': signals,
         'portfolio_values': portfolio_values,
-        'period_days': period_days
+        'period_days': period_days,
+        'timeframe': timeframe,
+        'bars_per_day': per_day
     }
 
 def calculate_metrics(backtest_data):
     """Calculate performance metrics"""
-    portfolio_values = backtest_data['portfolio_values']
+    portfolio_values = np.asarray(backtest_data['portfolio_values'])
     returns = np.diff(portfolio_values) / portfolio_values[:-1]
+    periods_per_year = 252 * backtest_data.get('bars_per_day', 1)
     
     total_return = (portfolio_values[-1] - portfolio_values[0]) / portfolio_values[0] * 100
     accuracy = np.random.uniform(55, 85)  # Mock accuracy
-    sharpe_ratio = np.mean(returns) / np.std(returns) * np.sqrt(252) if np.std(returns) > 0 else 0
+    sharpe_ratio = np.mean(returns) / np.std(returns) * np.sqrt(periods_per_year) if np.std(returns) > 0 else 0
     max_drawdown = calculate_max_drawdown(portfolio_values)
     
     return {
-        'total_return': round(total_return, 2),
-        'accuracy': round(accuracy, 2),
-        'sharpe_ratio': round(sharpe_ratio, 2),
-        'max_drawdown': round(max_drawdown, 2),
-        'total_trades': len([s for s in backtest_data['signals'] if s != 'HOLD']),
-        'win_rate': round(np.random.uniform(45, 75), 2)
+        'total_return': round(float(total_return), 2),
+        'accuracy': round(float(accuracy), 2),
+        'sharpe_ratio': round(float(sharpe_ratio), 2),
+        'max_drawdown': round(float(max_drawdown), 2),
+        'total_trades': int(np.count_nonzero(np.asarray(backtest_data['signals']) != 'HOLD')),
+        'win_rate': round(float(np.random.uniform(45, 75)), 2)
     }
 
 def calculate_max_drawdown(portfolio_values):
     """Calculate maximum drawdown"""
-    peak = portfolio_values[0]
-    max_dd = 0
-    
-    for value in portfolio_values:
-        if value > peak:
-            peak = value
-        drawdown = (peak - value) / peak * 100
-        if drawdown > max_dd:
-            max_dd = drawdown
-            
-    return max_dd
-
-def upload_to_storage(file_path: str, storage_path: str) -> str:
-    """Upload file to Supabase Storage"""
-    try:
-        with open(file_path, 'rb') as f:
-            result = supabase.storage.from_("reports").upload(storage_path, f)
-        
-        # Get public URL
-        url = supabase.storage.from_("reports").get_public_url(storage_path)
-        return url
-    except Exception as e:
-        print(f"Upload failed: {e}")
-        return ""
\ No newline at end of file
+    values = np.asarray(portfolio_values, dtype=float)
+    peak = np.maximum.accumulate(values)
+    return float(((peak - values) / peak * 100).max())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Compare the native (XGBoost + TensorFlow) and ONNX Runtime model stacks
+
+    python export_models.py --onnx
+    python benchmark_runtime.py [--runs 200] [--batch 500] [--models xgboost,lstm]
+
+Each runtime is measured in a fresh interpreter: import time, model load time,
+single and batch latency, peak RSS, and the scores for a fixed input so the
+ONNX results can be checked against the originals.
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+RUNTIMES = ["native", "onnx"]
+
+def market_data_batch(n: int) -> list:
+    rng = np.random.default_rng(7)
+    return [
+        {
+            "price_change_percent": float(rng.uniform(-5, 5)),
+            "volume_ratio": float(rng.uniform(0.5, 3.0)),
+            "rsi": float(rng.uniform(20, 80)),
+            "macd": float(rng.uniform(-2, 2)),
+            "bb_position": float(rng.uniform(0, 1)),
+            "atr": float(rng.uniform(0.5, 2.0)),
+            "ma_signal": int(rng.integers(-1, 2)),
+            "volatility": float(rng.uniform(0.1, 0.5)),
+            "momentum": float(rng.uniform(-0.1, 0.1)),
+            "sector_performance": float(rng.uniform(-3, 3))
+        }
+        for _ in range(n)
+    ]
+
+def measure(runtime: str, runs: int, batch: int, names: list) -> dict:
+    """Runs inside the child interpreter"""
+    started = time.perf_counter()
+    from models.ensemble import EnsembleModel
+    import_seconds = time.perf_counter() - started
+
+    ensemble = EnsembleModel(runtime=runtime)
+    models = {name: {"xgboost": ensemble.xgb_model, "lstm": ensemble.lstm_model}[name] for name in names}
+
+    started = time.perf_counter()
+    for name, model in models.items():
+        model.load()
+        if model.model is None:
+            raise RuntimeError(f"{runtime} {name} model failed to load")
+        model.predict_batch(market_data_batch(1))
+    load_seconds = time.perf_counter() - started
+
+    data = market_data_batch(batch)
+
+    single = []
+    for i in range(runs):
+        started = time.perf_counter()
+        for model in models.values():
+            model.predict_batch(data[i % batch:i % batch + 1])
+        single.append(time.perf_counter() - started)
+
+    batched = []
+    for _ in range(max(3, runs // 20)):
+        started = time.perf_counter()
+        for model in models.values():
+            model.predict_batch(data)
+        batched.append(time.perf_counter() - started)
+
+    return {
+        "runtime": runtime,
+        "import_seconds": import_seconds,
+        "load_seconds": load_seconds,
+        "single_p50_ms": float(np.percentile(single, 50) * 1000),
+        "single_p95_ms": float(np.percentile(single, 95) * 1000),
+        "batch_p50_ms": float(np.percentile(batched, 50) * 1000),
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "scores": {name: model.predict_batch(data).tolist() for name, model in models.items()}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--models", default="xgboost,lstm")
+    parser.add_argument("--child", choices=RUNTIMES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.runs, args.batch, args.models.split(","))))
+        return
+
+    results = {}
+    for runtime in RUNTIMES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", runtime, "--runs", str(args.runs),
+             "--batch", str(args.batch), "--models", args.models],
+            capture_output=True, text=True
+        )
+        if output.returncode != 0:
+            print(f"[FAIL] {runtime}: {output.stderr.strip().splitlines()[-1] if output.stderr else 'no output'}")
+            continue
+        results[runtime] = json.loads(output.stdout.strip().splitlines()[-1])
+
+    columns = ["import_seconds", "load_seconds", "single_p50_ms", "single_p95_ms", "batch_p50_ms", "max_rss_mb"]
+    print(f"{'runtime':<8}" + "".join(f"{column:>16}" for column in columns))
+    for runtime, result in results.items():
+        print(f"{runtime:<8}" + "".join(f"{result[column]:>16.2f}" for column in columns))
+
+    if len(results) == 2:
+        print(f"\nScore differences over {args.batch} symbols (onnx vs native):")
+        for name in args.models.split(","):
+            native = np.array(results["native"]["scores"][name])
+            onnx = np.array(results["onnx"]["scores"][name])
+            print(f"  {name:<8} max abs {np.abs(native - onnx).max():.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.schedules import crontab
 import os
 
 # Initialize Celery
@@ -6,7 +7,7 @@ celery_app = Celery(
     "backtest_worker",
     broker=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
     backend=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
-    include=["backtest_tasks"]
+    include=["backtest_tasks", "report_tasks", "coach_tasks"]
 )
 
 # Celery configuration
@@ -17,4 +18,14 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     result_expires=3600,
+    # PDF/CSV rendering runs on its own queue and worker pool
+    task_routes={"report_tasks.*": {"queue": "reports"}},
+    worker_prefetch_multiplier=1,
+    # Daily AI coach summaries, ahead of the US market open
+    beat_schedule={
+        "precompute-coach-summaries": {
+            "task": "coach_tasks.precompute_coach_summaries",
+            "schedule": crontab(hour=int(os.getenv("COACH_PRECOMPUTE_HOUR", "12")), minute=0),
+        },
+    },
 )
\ No newline at end of file
@@ -0,0 +1,234 @@
+"""
+Precomputed AI coach summaries, one per risk-profile bucket
+
+Users are grouped by (risk tolerance, preferred sectors, trade frequency). For
+each bucket the scheduled coach_tasks job stores the top matching signals in a
+Redis sorted set (by confidence) next to the coach message, and the market
+outlook is stored once per day. When new signals are inserted they are merged
+into every bucket they match, so /coach/daily-summary stays a cache read
+between runs.
+
+Bucket fields are checked against the values the risk-profile quiz offers, and
+the index of requested buckets expires and is capped, so callers cannot grow
+Redis, per-insert work or the daily OpenAI calls without limit.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import redis
+except ImportError:  # Without Redis every summary is computed on request
+    redis = None
+
+COACH_CACHE_TTL = int(os.getenv("COACH_CACHE_TTL", str(36 * 3600)))
+# Fallback text (OpenAI down) is only kept briefly so the next request retries the model
+COACH_FALLBACK_TTL = int(os.getenv("COACH_FALLBACK_TTL", "300"))
+OUTLOOK_CACHE_TTL = 2 * 24 * 3600
+BUCKET_SIGNAL_LIMIT = 20
+# Most buckets kept in the index the daily job and signal inserts walk
+MAX_COACH_BUCKETS = int(os.getenv("MAX_COACH_BUCKETS", "2000"))
+BUCKET_INDEX_KEY = "coach:bucket_index"
+
+# Signal risk levels each tolerance accepts
+RISK_LEVELS = {
+    'conservative': ['low'],
+    'moderate': ['low', 'medium'],
+    'aggressive': ['low', 'medium', 'high']
+}
+
+TRADE_FREQUENCIES = ('low', 'medium', 'high')
+
+# Sectors offered by the risk-profile quiz (src/components/onboarding/RiskProfileQuiz.tsx)
+SECTORS = (
+    'Technology', 'Healthcare', 'Finance', 'Energy', 'Consumer',
+    'Industrial', 'Materials', 'Utilities', 'Real Estate', 'Telecommunications'
+)
+_SECTORS_BY_NAME = {sector.lower(): sector for sector in SECTORS}
+
+def normalize_sectors(preferred_sectors: Optional[Iterable[str]]) -> List[str]:
+    """Known sectors in canonical spelling, sorted and deduplicated; ValueError on any other"""
+    sectors = set()
+    for sector in preferred_sectors or []:
+        if not sector or not sector.strip():
+            continue
+        canonical = _SECTORS_BY_NAME.get(sector.strip().lower())
+        if canonical is None:
+            raise ValueError(f"Unknown sector: {sector}")
+        sectors.add(canonical)
+    return sorted(sectors)
+
+def bucket_key(risk_tolerance: str, preferred_sectors: Optional[Iterable[str]], trade_frequency: str) -> str:
+    """Bucket for a profile; sector order, case and duplicates do not matter
+
+    Raises ValueError for a risk tolerance, trade frequency or sector outside
+    the known values, so a key never contains the "|" or "," separators.
+    """
+    if risk_tolerance not in RISK_LEVELS:
+        raise ValueError(f"Unknown risk tolerance: {risk_tolerance}")
+    if trade_frequency not in TRADE_FREQUENCIES:
+        raise ValueError(f"Unknown trade frequency: {trade_frequency}")
+    return f"{risk_tolerance}|{','.join(normalize_sectors(preferred_sectors))}|{trade_frequency}"
+
+def parse_bucket(bucket: str) -> Dict[str, Any]:
+    parts = bucket.split("|")
+    if len(parts) != 3:
+        raise ValueError(f"Malformed coach bucket: {bucket!r}")
+    risk_tolerance, sectors, trade_frequency = parts
+    return {
+        "risk_tolerance": risk_tolerance,
+        "preferred_sectors": sectors.split(",") if sectors else [],
+        "trade_frequency": trade_frequency
+    }
+
+def is_valid_bucket(bucket: str) -> bool:
+    """True for keys bucket_key could have built (older or foreign index entries are not)"""
+    try:
+        profile = parse_bucket(bucket)
+        return bucket_key(profile["risk_tolerance"], profile["preferred_sectors"], profile["trade_frequency"]) == bucket
+    except ValueError:
+        return False
+
+def matches_bucket(signal: Dict[str, Any], bucket: str) -> bool:
+    profile = parse_bucket(bucket)
+    if signal.get("is_active") is False:
+        return False
+    if signal.get("risk_level") not in RISK_LEVELS.get(profile["risk_tolerance"], ['medium']):
+        return False
+    return not profile["preferred_sectors"] or signal.get("sector") in profile["preferred_sectors"]
+
+def filter_signals(signals: List[Dict[str, Any]], bucket: str, limit: int = BUCKET_SIGNAL_LIMIT) -> List[Dict[str, Any]]:
+    """Top signals for a bucket by confidence"""
+    matching = [signal for signal in signals if matches_bucket(signal, bucket)]
+    return sorted(matching, key=lambda s: s.get("confidence") or 0, reverse=True)[:limit]
+
+
+class CoachCache:
+    def __init__(self, redis_url: Optional[str] = None, client=None, ttl: int = COACH_CACHE_TTL,
+                 limit: int = BUCKET_SIGNAL_LIMIT, max_buckets: int = MAX_COACH_BUCKETS):
+        self.ttl = ttl
+        self.limit = limit
+        self.max_buckets = max_buckets
+        self.client = client
+        if self.client is None and redis is not None and redis_url:
+            self.client = redis.Redis.from_url(redis_url)
+
+    def buckets(self) -> List[str]:
+        """Buckets written within the cache TTL (by requests or the scheduled job)"""
+        if self.client is None:
+            return []
+        try:
+            members = self.client.zrangebyscore(BUCKET_INDEX_KEY, time.time() - self.ttl, "+inf")
+        except Exception as e:
+            print(f"Coach bucket list read failed: {e}")
+            return []
+        return sorted(bucket for bucket in (_text(b) for b in members) if is_valid_bucket(bucket))
+
+    def get_summary(self, bucket: str) -> Optional[Dict[str, Any]]:
+        """{'signals', 'coach_message', 'total_signals_count', 'generated_at'} or None"""
+        if self.client is None:
+            return None
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.get(f"coach:bucket:{bucket}")
+            pipe.zrevrange(f"coach:bucket:{bucket}:signals", 0, self.limit - 1)
+            pipe.get("coach:total_signals")
+            meta, members, total = pipe.execute()
+        except Exception as e:
+            print(f"Coach summary read failed: {e}")
+            return None
+        if meta is None:
+            return None
+
+        summary = json.loads(meta)
+        summary["signals"] = [json.loads(member) for member in members]
+        summary["total_signals_count"] = int(total or 0)
+        return summary
+
+    def set_summary(self, bucket: str, signals: List[Dict[str, Any]], coach_message: str, ttl: Optional[int] = None):
+        if self.client is None:
+            return
+        ttl = ttl or self.ttl
+        signals_key = f"coach:bucket:{bucket}:signals"
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            pipe.delete(signals_key)
+            if signals:
+                pipe.zadd(signals_key, {_member(s): float(s.get("confidence") or 0) for s in signals[:self.limit]})
+                pipe.expire(signals_key, ttl)
+            pipe.set(f"coach:bucket:{bucket}", json.dumps({
+                "coach_message": coach_message,
+                "generated_at": datetime.utcnow().isoformat()
+            }), ex=ttl)
+            # Index scored by last write: stale buckets age out and the newest MAX_COACH_BUCKETS are kept
+            now = time.time()
+            pipe.zadd(BUCKET_INDEX_KEY, {bucket: now})
+            pipe.zremrangebyscore(BUCKET_INDEX_KEY, "-inf", now - self.ttl)
+            pipe.zremrangebyrank(BUCKET_INDEX_KEY, 0, -(self.max_buckets + 1))
+            pipe.expire(BUCKET_INDEX_KEY, self.ttl)
+            pipe.execute()
+        except Exception as e:
+            print(f"Coach summary write failed: {e}")
+
+    def set_total(self, count: int):
+        if self.client is None:
+            return
+        try:
+            self.client.set("coach:total_signals", count, ex=self.ttl)
+        except Exception as e:
+            print(f"Coach total write failed: {e}")
+
+    def add_signals(self, signals: List[Dict[str, Any]]) -> int:
+        """Merge newly inserted signals into every cached bucket they match; returns buckets touched"""
+        if self.client is None or not signals:
+            return 0
+        touched = 0
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for bucket in self.buckets():
+                matching = [s for s in signals if matches_bucket(s, bucket)]
+                if not matching:
+                    continue
+                signals_key = f"coach:bucket:{bucket}:signals"
+                pipe.zadd(signals_key, {_member(s): float(s.get("confidence") or 0) for s in matching})
+                pipe.zremrangebyrank(signals_key, 0, -(self.limit + 1))  # Keep the top `limit`
+                pipe.expire(signals_key, self.ttl)
+                touched += 1
+            pipe.execute()
+            if self.client.exists("coach:total_signals"):
+                self.client.incrby("coach:total_signals", len(signals))
+        except Exception as e:
+            print(f"Coach incremental update failed: {e}")
+            return 0
+        return touched
+
+    def get_outlook(self, day: str) -> Optional[str]:
+        if self.client is None:
+            return None
+        try:
+            outlook = self.client.get(f"coach:outlook:{day}")
+            return _text(outlook) if outlook is not None else None
+        except Exception as e:
+            print(f"Market outlook read failed: {e}")
+            return None
+
+    def set_outlook(self, day: str, outlook: str, ttl: int = OUTLOOK_CACHE_TTL):
+        if self.client is None:
+            return
+        try:
+            self.client.set(f"coach:outlook:{day}", outlook, ex=ttl)
+        except Exception as e:
+            print(f"Market outlook write failed: {e}")
+
+
+def _member(signal: Dict[str, Any]) -> str:
+    return json.dumps(signal, sort_keys=True, default=str)
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+coach_cache = CoachCache(redis_url=os.getenv("REDIS_URL", "redis://localhost:6379/0"))
@@ -0,0 +1,98 @@
+"""
+Scheduled AI coach precompute
+
+Once a day (COACH_PRECOMPUTE_HOUR UTC, via Celery beat) every risk-profile
+bucket in user_preferences, plus any bucket requested since the last run,
+gets its matching signals (its own query, so no bucket is starved by the
+row cap on a global query) and coach message rebuilt, and today's market
+outlook is generated once for everyone.
+"""
+
+from celery.signals import worker_process_shutdown, worker_shutdown
+from celery_app import celery_app
+from datetime import datetime
+import asyncio
+import os
+
+import ai_coach
+from ai_coach import supabase, compute_bucket_summary, get_total_signals, refresh_market_outlook
+from coach_cache import coach_cache, bucket_key
+
+COACH_CONCURRENCY = int(os.getenv("COACH_CONCURRENCY", "5"))
+PROFILE_PAGE_SIZE = 1000  # PostgREST's default row cap
+
+# One event loop per worker process, reused by every run, so the module-level
+# AsyncOpenAI client (whose connection pool is bound to the loop that first
+# used it) keeps working after the first day instead of silently falling back
+_loop = None
+
+def run_async(coro):
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop.run_until_complete(coro)
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_event_loop(**kwargs):
+    """Close the OpenAI client on its own loop before the loop ends"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+    try:
+        if ai_coach.openai_client is not None:
+            _loop.run_until_complete(ai_coach.openai_client.close())
+    finally:
+        _loop.close()
+        _loop = None
+
+@celery_app.task(name="coach_tasks.precompute_coach_summaries")
+def precompute_coach_summaries():
+    """Rebuild every bucket summary and today's market outlook"""
+    return run_async(precompute())
+
+async def precompute() -> dict:
+    started = datetime.utcnow()
+
+    profiles = await asyncio.to_thread(load_profiles)
+    buckets = set()
+    for p in profiles:
+        try:
+            buckets.add(bucket_key(p.get("risk_tolerance") or "moderate", p.get("preferred_sectors"),
+                                   p.get("trade_frequency") or "medium"))
+        except ValueError as e:
+            print(f"Skipping coach profile: {e}")
+    buckets.update(coach_cache.buckets())
+
+    total_signals = await get_total_signals()
+    coach_cache.set_total(total_signals)
+
+    semaphore = asyncio.Semaphore(COACH_CONCURRENCY)
+
+    async def build(bucket: str):
+        async with semaphore:
+            await compute_bucket_summary(bucket, total_signals)
+
+    await asyncio.gather(*[build(bucket) for bucket in sorted(buckets)])
+    await refresh_market_outlook(started.date().isoformat())
+
+    return {
+        "profiles": len(profiles),
+        "buckets": len(buckets),
+        "signals": total_signals,
+        "seconds": (datetime.utcnow() - started).total_seconds()
+    }
+
+def load_profiles() -> list:
+    """Every user's bucket fields, a page at a time"""
+    profiles = []
+    start = 0
+    while True:
+        page = supabase.table("user_preferences").select(
+            "risk_tolerance, trade_frequency, preferred_sectors"
+        ).order("user_id").range(start, start + PROFILE_PAGE_SIZE - 1).execute().data or []
+        profiles.extend(page)
+        if len(page) < PROFILE_PAGE_SIZE:
+            return profiles
+        start += PROFILE_PAGE_SIZE
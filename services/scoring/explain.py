@@ -1,10 +1,15 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict, Any
-import openai
+from typing import List, Dict, Any, Optional
+from openai import AsyncOpenAI
+import asyncio
+import hashlib
+import json
 import os
 from datetime import datetime
 
+from cache_utils import SingleFlight, TTLCache
+
 router = APIRouter()
 
 class ExplainRequest(BaseModel):
@@ -17,49 +22,145 @@ class ExplainResponse(BaseModel):
     explanation: str
     bullets: List[str]
     generated_at: datetime
+    source: str = "llm"  # "llm", or "template" while the model explanation is still being generated
+    pending: bool = False
+
+EXPLAIN_CACHE_TTL = int(os.getenv("EXPLAIN_CACHE_TTL", "3600"))
+EXPLAIN_CACHE_SIZE = int(os.getenv("EXPLAIN_CACHE_SIZE", "10000"))
+# How long a request waits for the model before falling back to the template
+EXPLAIN_WAIT_SECONDS = float(os.getenv("EXPLAIN_WAIT_SECONDS", "0"))
+EXPLAIN_TIMEOUT = float(os.getenv("EXPLAIN_TIMEOUT", "20"))
+
+TOP_RULES = 3
+
+class ExplanationCache:
+    """Model explanations by signal key; identical concurrent requests share one model call"""
+
+    def __init__(self, client=None, ttl: int = EXPLAIN_CACHE_TTL, max_entries: int = EXPLAIN_CACHE_SIZE,
+                 wait_seconds: float = EXPLAIN_WAIT_SECONDS):
+        self._client = client
+        self.ttl = ttl
+        self.wait_seconds = wait_seconds
+        self._cache = TTLCache(max_entries=max_entries)
+        self._flight = SingleFlight()
+        self._tasks: set = set()
+
+    @property
+    def client(self) -> Optional[AsyncOpenAI]:
+        if self._client is None and os.getenv("OPENAI_API_KEY"):
+            self._client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=EXPLAIN_TIMEOUT)
+        return self._client
+
+    async def explain(self, request: ExplainRequest) -> ExplainResponse:
+        key = explanation_key(request.symbol, request.action, request.rule_matches)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        if self.client is None:
+            return template_explanation(request)
+
+        # Generation runs in the background so it finishes (and is cached) even when this request stops waiting
+        task = asyncio.ensure_future(self._flight.do(key, lambda: self._generate(key, request)))
+        self._tasks.add(task)
+        task.add_done_callback(self._finished)
+
+        if self.wait_seconds > 0:
+            try:
+                response = await asyncio.wait_for(asyncio.shield(task), self.wait_seconds)
+                if response is not None:
+                    return response
+            except asyncio.TimeoutError:
+                pass
+
+        fallback = template_explanation(request)
+        fallback.pending = not task.done()
+        return fallback
+
+    async def _generate(self, key: str, request: ExplainRequest) -> Optional[ExplainResponse]:
+        try:
+            completion = await self.client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "You are a trading signal explainer. Provide clear, concise explanations for retail traders."},
+                    {"role": "user", "content": build_prompt(request)}
+                ],
+                max_tokens=200,
+                temperature=0.3
+            )
+        except Exception as e:
+            print(f"Explanation generation failed for {request.symbol}: {e}")
+            return None
+
+        explanation = completion.choices[0].message.content
+        response = ExplainResponse(
+            symbol=request.symbol,
+            explanation=explanation,
+            bullets=parse_bullets(explanation),
+            generated_at=datetime.now()
+        )
+        self._cache.set(key, response, self.ttl)
+        return response
 
-# Initialize OpenAI
-openai.api_key = os.getenv("OPENAI_API_KEY")
+    def _finished(self, task: asyncio.Future):
+        self._tasks.discard(task)
+        if not task.cancelled():
+            task.exception()  # Failures are logged in _generate; mark them retrieved
+
+explanation_cache = ExplanationCache()
 
 @router.post("/explain", response_model=ExplainResponse)
 async def explain_signal(request: ExplainRequest):
-    """Generate GPT-4o explanation for signal"""
+    """Generate GPT-4o explanation for signal (template text until the model result is cached)"""
     try:
-        # Format rules for prompt
-        rules_text = format_rules(request.rule_matches)
-        
-        # Create GPT prompt
-        prompt = f"""Explain why signal {request.action} for {request.symbol} using these rules: {rules_text}.
+        return await explanation_cache.explain(request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Explanation failed: {str(e)}")
+
+def explanation_key(symbol: str, action: str, rule_matches: List[Dict[str, Any]]) -> str:
+    """Stable hash of what the explanation depends on: symbol, action and the top rules"""
+    rules = sorted(
+        [str(rule.get('name', '')).strip().lower(), str(rule.get('value', '')).strip().lower()]
+        for rule in rule_matches[:TOP_RULES]
+    )
+    canonical = json.dumps([symbol.strip().upper(), action.strip().upper(), rules], separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def build_prompt(request: ExplainRequest) -> str:
+    rules_text = format_rules(request.rule_matches)
+    return f"""Explain why signal {request.action} for {request.symbol} using these rules: {rules_text}.
 
 Provide exactly 3 bullet points explaining the reasoning in simple terms for retail traders.
 Format as:
 • Point 1
-• Point 2  
+• Point 2
 • Point 3"""
 
-        # Call GPT-4o
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a trading signal explainer. Provide clear, concise explanations for retail traders."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=200,
-            temperature=0.3
-        )
-        
-        explanation = response.choices[0].message.content
-        bullets = parse_bullets(explanation)
-        
-        return ExplainResponse(
-            symbol=request.symbol,
-            explanation=explanation,
-            bullets=bullets,
-            generated_at=datetime.now()
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Explanation failed: {str(e)}")
+def template_explanation(request: ExplainRequest) -> ExplainResponse:
+    """Deterministic explanation built from the rules alone"""
+    action = request.action.upper()
+    bullets = []
+    for rule in request.rule_matches[:TOP_RULES]:
+        name = rule.get('name', 'Technical indicator')
+        value = rule.get('value', '')
+        detail = f" ({value})" if value != '' else ""
+        bullets.append(f"{name}{detail} supports a {action} signal for {request.symbol}")
+
+    generic = [
+        f"Technical indicators for {request.symbol} currently point toward a {action}",
+        "Signal strength is based on several indicators agreeing, not a single reading",
+        "Size positions to your risk tolerance and use a stop loss"
+    ]
+    bullets.extend(generic[len(bullets):])
+    bullets = bullets[:TOP_RULES]
+
+    return ExplainResponse(
+        symbol=request.symbol,
+        explanation="\n".join(f"• {bullet}" for bullet in bullets),
+        bullets=bullets,
+        generated_at=datetime.now(),
+        source="template"
+    )
 
 def format_rules(rule_matches: List[Dict[str, Any]]) -> str:
     """Format rule matches for GPT prompt"""
@@ -89,4 +190,4 @@ def parse_bullets(explanation: str) -> List[str]:
         sentences = explanation.split('.')[:3]
         bullets = [s.strip() for s in sentences if s.strip()]
     
-    return bullets[:3]  # Max 3 bullets
\ No newline at end of file
+    return bullets[:3]  # Max 3 bullets
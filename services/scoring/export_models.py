@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Export the scoring models to MODEL_DIR so services load them instead of training at startup
+
+    python export_models.py [model_dir] [--onnx]
+
+--onnx also writes ONNX graphs for MODEL_RUNTIME=onnx and checks them against the originals.
+"""
+
+import sys
+import time
+
+from models.base import MODEL_DIR
+from models.ensemble import EnsembleModel
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    model_dir = args[0] if args else MODEL_DIR
+    started = time.perf_counter()
+    
+    model = EnsembleModel(runtime="native")
+    for name, path in model.export(model_dir).items():
+        print(f"[OK] {name}: {path}")
+    
+    if "--onnx" in sys.argv:
+        for name, result in model.export_onnx(model_dir).items():
+            print(f"[OK] {name} ONNX: {result['path']} (max abs error {result['max_abs_error']:.2e})")
+    
+    print(f"Exported in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Rolling per-symbol feature store - fixed-size NumPy ring buffers with an optional Redis copy
+
+Each buffer writes every row twice, at slot i and i + capacity, so the last n
+rows are always one contiguous slice. The store copies that slice out under its
+lock, so a window handed to a caller is never overwritten by a later update
+(the buffer holds exactly one sequence, so the next append would). With a Redis
+URL configured, rows are also pushed to a capped Redis list so a restarted pod
+rebuilds its buffers from there.
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    import redis
+except ImportError:  # Persistence is optional
+    redis = None
+
+# LSTM inputs, in tensor column order
+LSTM_FEATURES = ["price_change_percent", "volume_ratio", "rsi", "macd", "volatility"]
+
+
+def lstm_features(market_data: Dict) -> np.ndarray:
+    """Feature vector for one market data snapshot"""
+    return np.array([
+        market_data.get('price_change_percent', 0) / 100,
+        market_data.get('volume_ratio', 1.0),
+        market_data.get('rsi', 50) / 100,
+        market_data.get('macd', 0),
+        market_data.get('volatility', 0.2)
+    ], dtype=np.float32)
+
+
+class RingBuffer:
+    __slots__ = ("capacity", "width", "count", "last_ts", "_data", "_pos")
+
+    def __init__(self, capacity: int, width: int):
+        self.capacity = capacity
+        self.width = width
+        self.count = 0
+        self.last_ts: Optional[float] = None
+        self._data = np.zeros((2 * capacity, width), dtype=np.float32)
+        self._pos = 0
+
+    def append(self, row: np.ndarray):
+        self._data[self._pos] = row
+        self._data[self._pos + self.capacity] = row
+        self._pos = (self._pos + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def window(self, n: Optional[int] = None) -> np.ndarray:
+        """Last n rows, oldest first, as a read-only view (valid until the next append wraps over it)"""
+        n = self.count if n is None else min(n, self.count)
+        end = self._pos + self.capacity
+        view = self._data[end - n:end]
+        view.flags.writeable = False
+        return view
+
+
+class FeatureStore:
+    def __init__(self, capacity: int = 20, width: int = len(LSTM_FEATURES),
+                 redis_url: Optional[str] = None, ttl: int = 7 * 24 * 3600):
+        self.capacity = capacity
+        self.width = width
+        self.ttl = ttl
+        self._buffers: Dict[str, RingBuffer] = {}
+        self._lock = threading.Lock()
+
+        self.redis_client = None
+        if redis_url and redis is not None:
+            self.redis_client = redis.Redis.from_url(redis_url)
+
+    def update(self, symbol: str, features: np.ndarray, ts: Optional[float] = None) -> bool:
+        """Append a feature vector; a ts not newer than the last one is ignored"""
+        row = np.asarray(features, dtype=np.float32)
+        with self._lock:
+            buffer = self._buffer(symbol)
+            if ts is not None and buffer.last_ts is not None and ts <= buffer.last_ts:
+                return False
+            buffer.append(row)
+            if ts is not None:
+                buffer.last_ts = ts
+        self._persist(symbol, row, ts)
+        return True
+
+    def window(self, symbol: str, n: Optional[int] = None) -> np.ndarray:
+        """Up to n most recent rows for a symbol (a copy, safe to hold across updates)"""
+        with self._lock:
+            return self._buffer(symbol).window(n).copy()
+
+    def sequence(self, symbol: str, length: Optional[int] = None) -> np.ndarray:
+        """(length, width) history; short histories are padded with their oldest row"""
+        length = length or self.capacity
+        rows = self.window(symbol, length)
+        if len(rows) == length:
+            return rows
+        if len(rows) == 0:
+            return np.zeros((length, self.width), dtype=np.float32)
+        return np.concatenate([np.repeat(rows[:1], length - len(rows), axis=0), rows])
+
+    def sequences(self, symbols: Iterable[str], length: Optional[int] = None) -> np.ndarray:
+        """(n_symbols, length, width) batch"""
+        return np.stack([self.sequence(symbol, length) for symbol in symbols])
+
+    def history_length(self, symbol: str) -> int:
+        with self._lock:
+            return self._buffer(symbol).count
+
+    def symbols(self) -> List[str]:
+        return list(self._buffers)
+
+    def _buffer(self, symbol: str) -> RingBuffer:
+        buffer = self._buffers.get(symbol)
+        if buffer is None:
+            buffer = RingBuffer(self.capacity, self.width)
+            self._restore(symbol, buffer)
+            self._buffers[symbol] = buffer
+        return buffer
+
+    def _persist(self, symbol: str, row: np.ndarray, ts: Optional[float]):
+        if self.redis_client is None:
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.rpush(f"features:{symbol}", row.tobytes())
+            pipe.ltrim(f"features:{symbol}", -self.capacity, -1)
+            pipe.expire(f"features:{symbol}", self.ttl)
+            if ts is not None:
+                pipe.set(f"features:{symbol}:ts", ts, ex=self.ttl)
+            pipe.execute()
+        except Exception as e:
+            print(f"Feature store Redis write failed: {e}")
+
+    def _restore(self, symbol: str, buffer: RingBuffer):
+        if self.redis_client is None:
+            return
+        try:
+            rows = self.redis_client.lrange(f"features:{symbol}", -self.capacity, -1)
+            last_ts = self.redis_client.get(f"features:{symbol}:ts")
+        except Exception as e:
+            print(f"Feature store Redis read failed: {e}")
+            return
+        for payload in rows:
+            row = np.frombuffer(payload, dtype=np.float32)
+            if row.shape == (self.width,):
+                buffer.append(row)
+        if last_ts is not None:
+            buffer.last_ts = float(last_ts)
+
+
+feature_store = FeatureStore(
+    capacity=int(os.getenv("FEATURE_STORE_LENGTH", "20")),
+    redis_url=os.getenv("FEATURE_STORE_REDIS_URL")
+)
@@ -0,0 +1,133 @@
+"""
+Shared indicator series cache - bounded in-process LRU with an optional Redis tier
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import redis
+except ImportError:  # Redis tier is optional
+    redis = None
+
+
+def frame_fingerprint(data: pd.DataFrame) -> str:
+    """Stable hash of an OHLCV frame (values and index)"""
+    hashed = pd.util.hash_pandas_object(data, index=True).values
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+class IndicatorCache:
+    def __init__(self, max_entries: int = 512, redis_url: Optional[str] = None, ttl: int = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.redis_client = None
+        if redis_url and redis is not None:
+            self.redis_client = redis.Redis.from_url(redis_url)
+
+    def make_key(self, symbol: str, indicator: str, params: Dict[str, Any], fingerprint: str) -> str:
+        """Cache key from symbol, indicator name, parameters and data fingerprint"""
+        params_key = json.dumps(params, sort_keys=True, default=str)
+        return f"indicator:{symbol}:{indicator}:{params_key}:{fingerprint}"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            values = self._entries.get(key)
+            if values is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return values
+
+        values = self._redis_get(key)
+        if values is not None:
+            self.redis_hits += 1
+            self._store_local(key, values)
+            return values
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, values: np.ndarray):
+        values = np.asarray(values)
+        values.flags.writeable = False  # Shared between requests
+        self._store_local(key, values)
+        self._redis_set(key, values)
+
+    def get_or_compute(self, key: str, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        values = self.get(key)
+        if values is None:
+            values = np.asarray(compute())
+            self.set(key, values)
+        return values
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.redis_hits) / lookups, 4) if lookups else 0.0,
+            "redis_enabled": self.redis_client is not None
+        }
+
+    def _store_local(self, key: str, values: np.ndarray):
+        with self._lock:
+            self._entries[key] = values
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _redis_get(self, key: str) -> Optional[np.ndarray]:
+        if self.redis_client is None:
+            return None
+        try:
+            payload = self.redis_client.get(key)
+            if payload is None:
+                return None
+            values = np.load(io.BytesIO(payload), allow_pickle=False)
+            values.flags.writeable = False
+            return values
+        except Exception as e:
+            print(f"Indicator cache Redis read failed: {e}")
+            return None
+
+    def _redis_set(self, key: str, values: np.ndarray):
+        if self.redis_client is None:
+            return
+        try:
+            buffer = io.BytesIO()
+            np.save(buffer, values, allow_pickle=False)
+            self.redis_client.setex(key, self.ttl, buffer.getvalue())
+        except Exception as e:
+            print(f"Indicator cache Redis write failed: {e}")
+
+
+indicator_cache = IndicatorCache(
+    max_entries=int(os.getenv("INDICATOR_CACHE_SIZE", "512")),
+    redis_url=os.getenv("INDICATOR_CACHE_REDIS_URL"),
+    ttl=int(os.getenv("INDICATOR_CACHE_TTL", "3600"))
+)
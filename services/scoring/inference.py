@@ -0,0 +1,148 @@
+"""
+Non-blocking model inference - a bounded executor with a request-coalescing micro-batcher
+
+Single /score requests are queued and collected for up to INFERENCE_MAX_WAIT_MS
+(or until INFERENCE_MAX_BATCH requests are waiting), then scored together with
+one EnsembleModel.predict_batch call on the inference pool. The event loop only
+awaits futures, so a slow TensorFlow call no longer stalls /health or other
+requests.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import Gauge, Histogram
+
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "64"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "1000"))
+
+QUEUE_DEPTH = Gauge('scoring_inference_queue_depth', 'Score requests waiting for a batch')
+BATCH_SIZE = Histogram('scoring_inference_batch_size', 'Requests per inference batch',
+                       buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024))
+BATCH_SECONDS = Histogram('scoring_inference_batch_seconds', 'Inference time per batch')
+MODEL_LOAD_SECONDS = Gauge('scoring_model_load_seconds', 'Time to load each model artifact', ['model'])
+STARTUP_SECONDS = Gauge('scoring_startup_seconds', 'Time from process start until models are ready')
+
+PredictBatch = Callable[[List[str], List[Dict[str, Any]]], Tuple[Any, Any, Dict[str, Any]]]
+
+
+class MicroBatcher:
+    def __init__(self, predict_batch: PredictBatch, max_batch: int = INFERENCE_MAX_BATCH,
+                 max_wait_ms: float = INFERENCE_MAX_WAIT_MS, workers: int = INFERENCE_WORKERS,
+                 max_queue: int = INFERENCE_MAX_QUEUE):
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.workers = workers
+        self.max_queue = max_queue
+
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._running: set = set()
+
+    async def start(self):
+        """Create the pool and the collector on the running loop"""
+        if self._collector is not None:
+            return
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._collector = asyncio.create_task(self._collect())
+
+    async def stop(self):
+        """Finish queued and running batches, then shut the pool down"""
+        if self._collector is None:
+            return
+        while not self._queue.empty():
+            await asyncio.sleep(self.max_wait)
+        self._collector.cancel()
+        try:
+            await self._collector
+        except asyncio.CancelledError:
+            pass
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        self.executor.shutdown(wait=True)
+        self._collector = None
+
+    async def submit(self, symbol: str, market_data: Dict[str, Any]) -> Tuple[float, float, Dict[str, float]]:
+        """Score one symbol as part of the next batch; same result shape as EnsembleModel.predict"""
+        if self._collector is None:
+            raise RuntimeError("Inference batcher is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((symbol, market_data, future))  # Waits when the queue is full
+        QUEUE_DEPTH.set(self._queue.qsize())
+        return await future
+
+    async def run(self, func: Callable, *args):
+        """Run an already-batched call (e.g. /score/batch) on the inference pool"""
+        if self.executor is None:
+            return func(*args)
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _collect(self):
+        while True:
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = time.monotonic() + self.max_wait
+
+                while len(batch) < self.max_batch:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Stopping: requests already taken off the queue still get scored
+                if batch:
+                    await self._dispatch(batch)
+                raise
+
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch):
+        QUEUE_DEPTH.set(self._queue.qsize())
+        BATCH_SIZE.observe(len(batch))
+
+        # Wait for a free worker before dispatching, so batches keep growing under load
+        await self._slots.acquire()
+        task = asyncio.create_task(self._run_batch(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch):
+        symbols = [item[0] for item in batch]
+        market_data_list = [item[1] for item in batch]
+        started = time.perf_counter()
+        try:
+            scores, confidences, individual = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.predict_batch, symbols, market_data_list
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+            BATCH_SECONDS.observe(time.perf_counter() - started)
+
+        for i, (_, _, future) in enumerate(batch):
+            if not future.done():
+                future.set_result((
+                    float(scores[i]),
+                    float(confidences[i]),
+                    {name: float(values[i]) for name, values in individual.items()}
+                ))
@@ -0,0 +1,176 @@
+"""
+Market data snapshots - pluggable providers behind a per-symbol TTL cache
+
+/score, /score/batch and anything else that needs a symbol's current market
+data go through `market_data_service.snapshot()`. Snapshots are cached per (symbol,
+timeframe) for SNAPSHOT_TTL seconds, and concurrent misses for the same key
+share one upstream fetch, so a burst of AAPL requests costs a single call.
+
+MARKET_DATA_PROVIDER picks the source:
+    mock     random snapshots (default, what the service used before)
+    fixture  JSON files in MARKET_DATA_FIXTURE_DIR, one per symbol
+    http     GET {MARKET_DATA_URL}/snapshot/{symbol} on a pooled httpx client
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+from prometheus_client import Counter, Histogram
+
+from cache_utils import SingleFlight, TTLCache
+
+# Seconds a snapshot is reused, by timeframe
+SNAPSHOT_TTL = {
+    "1m": 1,
+    "5m": 5,
+    "15m": 15,
+    "1h": 30,
+    "4h": 60,
+    "1d": 60,
+}
+DEFAULT_SNAPSHOT_TTL = float(os.getenv("MARKET_DATA_TTL", "1"))
+
+MARKET_DATA_PROVIDER = os.getenv("MARKET_DATA_PROVIDER", "mock")
+MARKET_DATA_URL = os.getenv("MARKET_DATA_URL", "")
+MARKET_DATA_API_KEY = os.getenv("MARKET_DATA_API_KEY")
+MARKET_DATA_FIXTURE_DIR = os.getenv("MARKET_DATA_FIXTURE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "market_fixtures"))
+MARKET_DATA_TIMEOUT = float(os.getenv("MARKET_DATA_TIMEOUT", "5"))
+MARKET_DATA_MAX_CONNECTIONS = int(os.getenv("MARKET_DATA_MAX_CONNECTIONS", "50"))
+
+SNAPSHOT_REQUESTS = Counter('scoring_market_data_requests', 'Market data snapshot lookups', ['outcome'])
+FETCH_SECONDS = Histogram('scoring_market_data_fetch_seconds', 'Upstream market data fetch time')
+
+
+class MockMarketDataProvider:
+    """Random snapshots for local development"""
+
+    async def fetch(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        return generate_mock_market_data(symbol)
+
+    async def close(self):
+        pass
+
+
+class FixtureMarketDataProvider:
+    """Snapshots read from {directory}/{SYMBOL}.json (optionally keyed by timeframe)"""
+
+    def __init__(self, directory: str = MARKET_DATA_FIXTURE_DIR):
+        self.directory = directory
+
+    async def fetch(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        path = os.path.join(self.directory, f"{symbol.upper()}.json")
+        if not os.path.exists(path):
+            raise KeyError(f"No market data fixture for {symbol}")
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data.get(timeframe), dict):
+            return dict(data[timeframe])
+        return data
+
+    async def close(self):
+        pass
+
+
+class HTTPMarketDataProvider:
+    """Market data API client; one pooled connection set shared by all requests"""
+
+    def __init__(self, base_url: str = MARKET_DATA_URL, api_key: Optional[str] = MARKET_DATA_API_KEY,
+                 timeout: float = MARKET_DATA_TIMEOUT, max_connections: int = MARKET_DATA_MAX_CONNECTIONS,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport
+        )
+
+    async def fetch(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        response = await self.client.get(f"/snapshot/{symbol.upper()}", params={"timeframe": timeframe})
+        response.raise_for_status()
+        return response.json()
+
+    async def close(self):
+        await self.client.aclose()
+
+
+PROVIDERS = {
+    "mock": MockMarketDataProvider,
+    "fixture": FixtureMarketDataProvider,
+    "http": HTTPMarketDataProvider,
+}
+
+
+class MarketDataService:
+    def __init__(self, provider=None, ttls: Optional[Dict[str, float]] = None, max_entries: int = 4096):
+        self.provider = provider or PROVIDERS[MARKET_DATA_PROVIDER]()
+        self.ttls = SNAPSHOT_TTL if ttls is None else ttls
+        self._cache = TTLCache(max_entries=max_entries)
+        self._flight = SingleFlight()
+
+    async def snapshot(self, symbol: str, timeframe: str = "1d") -> Dict[str, Any]:
+        """Current snapshot for a symbol; callers get their own copy"""
+        key = (symbol.upper(), timeframe)
+        cached = self._cache.get(key)
+        if cached is not None:
+            SNAPSHOT_REQUESTS.labels(outcome="hit").inc()
+            return dict(cached)
+
+        SNAPSHOT_REQUESTS.labels(outcome="coalesced" if self._flight.pending(key) else "miss").inc()
+        snapshot = await self._flight.do(key, lambda: self._fetch(key))
+        return dict(snapshot)
+
+    async def snapshots(self, symbols: List[str], timeframe: str = "1d") -> List[Dict[str, Any]]:
+        return list(await asyncio.gather(*[self.snapshot(symbol, timeframe) for symbol in symbols]))
+
+    def invalidate(self, symbol: str, timeframe: Optional[str] = None):
+        timeframes = [timeframe] if timeframe else list(self.ttls)
+        for tf in timeframes:
+            self._cache.delete((symbol.upper(), tf))
+
+    async def close(self):
+        await self.provider.close()
+
+    async def _fetch(self, key) -> Dict[str, Any]:
+        symbol, timeframe = key
+        started = time.perf_counter()
+        try:
+            snapshot = await self.provider.fetch(symbol, timeframe)
+        finally:
+            FETCH_SECONDS.observe(time.perf_counter() - started)
+
+        # Fetch time stamps the snapshot, so a cached copy is not fed to the LSTM feature store twice
+        now = time.time()
+        snapshot.setdefault("timestamp", now)
+        snapshot.setdefault("as_of", datetime.fromtimestamp(now, tz=timezone.utc).isoformat())
+        self._cache.set(key, snapshot, self.ttls.get(timeframe, DEFAULT_SNAPSHOT_TTL))
+        return snapshot
+
+
+def generate_mock_market_data(symbol: str) -> dict:
+    """Generate mock market data for testing"""
+    return {
+        "current_price": np.random.uniform(50, 200),
+        "price_change": np.random.uniform(-10, 10),
+        "price_change_percent": np.random.uniform(-5, 5),
+        "volume": np.random.randint(500000, 5000000),
+        "volume_ratio": np.random.uniform(0.5, 3.0),
+        "rsi": np.random.uniform(20, 80),
+        "macd": np.random.uniform(-2, 2),
+        "bb_position": np.random.uniform(0, 1),
+        "atr": np.random.uniform(0.5, 2.0),
+        "ma_signal": np.random.choice([-1, 0, 1]),
+        "volatility": np.random.uniform(0.1, 0.5),
+        "momentum": np.random.uniform(-0.1, 0.1),
+        "sector_performance": np.random.uniform(-3, 3)
+    }
+
+
+market_data_service = MarketDataService()
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts"))
+# "native" runs XGBoost/TensorFlow; "onnx" runs exported graphs on ONNX Runtime
+MODEL_RUNTIME = os.getenv("MODEL_RUNTIME", "native")
+RUNTIMES = ("native", "onnx")
+
+class ModelLoadError(RuntimeError):
+    pass
+
+class LazyModel(ABC):
+    """Model whose weights are loaded from MODEL_DIR on first use instead of at import"""
+    artifact_name: str = ""
+    onnx_artifact_name: str = ""
+    
+    def __init__(self, model_dir: Optional[str] = None, runtime: Optional[str] = None):
+        self.model_dir = model_dir or MODEL_DIR
+        self.runtime = runtime or MODEL_RUNTIME
+        if self.runtime not in RUNTIMES:
+            raise ValueError(f"Unknown model runtime: {self.runtime}")
+        self.load_seconds: Optional[float] = None
+        self.load_error: Optional[str] = None
+        self._model: Any = None
+        self._attempted = False
+        self._lock = threading.Lock()
+    
+    @property
+    def artifact_path(self) -> str:
+        name = self.onnx_artifact_name if self.runtime == "onnx" else self.artifact_name
+        return os.path.join(self.model_dir, name)
+    
+    @property
+    def loaded(self) -> bool:
+        """True once the model loaded successfully (not merely after a failed attempt)"""
+        return self._attempted and self.load_error is None
+    
+    @property
+    def model(self):
+        """The underlying model, or None if loading failed (load_error says why)"""
+        if not self._attempted:
+            self.load()
+        return self._model
+    
+    def load(self) -> float:
+        """Load the artifact once; returns the seconds spent loading"""
+        with self._lock:
+            if self._attempted:
+                return self.load_seconds
+            started = time.perf_counter()
+            try:
+                if os.path.exists(self.artifact_path):
+                    self._model = self._load_artifact(self.artifact_path)
+                elif self.runtime == "onnx":
+                    raise FileNotFoundError(f"{self.artifact_path} missing; run export_models.py --onnx")
+                else:
+                    # No exported artifact: train the mock model and keep it for the next start
+                    print(f"No artifact at {self.artifact_path}; training mock {self.name} model")
+                    self._model = self._train_mock_model()
+                    self._save_quietly()
+            except Exception as e:
+                print(f"Failed to load {self.name} model: {e}")
+                self._model = None
+                self.load_error = f"{type(e).__name__}: {e}"
+            self.load_seconds = time.perf_counter() - started
+            self._attempted = True
+            return self.load_seconds
+    
+    def save(self, model_dir: Optional[str] = None) -> str:
+        """Write the loaded native model to its artifact file"""
+        if self.runtime != "native":
+            raise RuntimeError("Only native models can be saved")
+        path = os.path.join(model_dir or self.model_dir, self.artifact_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._save_artifact(self.model, path)
+        return path
+    
+    def export_onnx(self, model_dir: Optional[str] = None) -> Dict[str, Any]:
+        """Convert the loaded native model to ONNX and check it against the original"""
+        if self.runtime != "native" or self.model is None:
+            raise RuntimeError(f"A loaded native {self.name} model is required for export")
+        path = os.path.join(model_dir or self.model_dir, self.onnx_artifact_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._export_onnx(self.model, path)
+        return {"path": path, "max_abs_error": self._verify_onnx(path)}
+    
+    def _save_quietly(self):
+        try:
+            os.makedirs(self.model_dir, exist_ok=True)
+            self._save_artifact(self._model, self.artifact_path)
+        except Exception as e:
+            print(f"Could not save {self.name} artifact: {e}")
+    
+    @abstractmethod
+    def _load_artifact(self, path: str):
+        ...
+    
+    @abstractmethod
+    def _save_artifact(self, model, path: str):
+        ...
+    
+    @abstractmethod
+    def _train_mock_model(self):
+        ...
+    
+    @abstractmethod
+    def _export_onnx(self, model, path: str):
+        ...
+    
+    @abstractmethod
+    def _verify_onnx(self, path: str) -> float:
+        ...
@@ -1,65 +1,180 @@
+import json
+import os
+import threading
+import time
 import numpy as np
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Tuple
+from .base import ModelLoadError
 from .rule_based import RuleBasedModel
 from .xgboost_model import XGBoostModel
 from .lstm_model import LSTMModel
 
+# Column order of the (n_symbols, n_models) score matrix
+MODEL_NAMES = ('rule_based', 'xgboost', 'lstm')
+DEFAULT_WEIGHTS = {'rule_based': 0.3, 'xgboost': 0.4, 'lstm': 0.3}
+ENSEMBLE_WEIGHTS_PATH = os.getenv("ENSEMBLE_WEIGHTS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ensemble_weights.json"))
+
+# Largest prediction difference accepted between an ONNX export and its original
+# (xgboost predicts on the 0-100 score scale, the LSTM on 0-1)
+ONNX_TOLERANCE = {'xgboost': 1e-2, 'lstm': 1e-4}
+
+class EnsembleWeights:
+    """Weight vector read from a JSON file and reloaded when the file changes"""
+    
+    def __init__(self, path: str = ENSEMBLE_WEIGHTS_PATH, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.vector = self._normalize(DEFAULT_WEIGHTS)
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+    
+    def current(self) -> np.ndarray:
+        """Weights in MODEL_NAMES order; checks the file at most every check_interval seconds"""
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self.reload()
+        return self.vector
+    
+    def reload(self) -> bool:
+        """Re-read the file if it changed; a missing or invalid file keeps the current weights"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                return False
+            if mtime == self._mtime:
+                return False
+            try:
+                with open(self.path) as f:
+                    self.vector = self._normalize(json.load(f))
+                self._mtime = mtime
+                return True
+            except Exception as e:
+                print(f"Ignoring invalid ensemble weights in {self.path}: {e}")
+                self._mtime = mtime
+                return False
+    
+    def as_dict(self) -> Dict[str, float]:
+        return {name: float(weight) for name, weight in zip(MODEL_NAMES, self.current())}
+    
+    @staticmethod
+    def _normalize(weights: Dict[str, float]) -> np.ndarray:
+        vector = np.array([float(weights[name]) for name in MODEL_NAMES])
+        if (vector < 0).any() or vector.sum() <= 0:
+            raise ValueError("weights must be non-negative with a positive sum")
+        vector = vector / vector.sum()
+        # Read-only: a reload swaps the array instead of mutating it under a running batch
+        vector.flags.writeable = False
+        return vector
+
 class EnsembleModel:
-    def __init__(self):
+    def __init__(self, runtime: str = None, weights: EnsembleWeights = None):
         self.rule_model = RuleBasedModel()
-        self.xgb_model = XGBoostModel()
-        self.lstm_model = LSTMModel()
+        self.xgb_model = XGBoostModel(runtime=runtime)
+        self.lstm_model = LSTMModel(runtime=runtime)
+        self.warmed_up = False
         
-        # Model weights (sum to 1.0)
-        self.weights = {
-            'rule_based': 0.3,
-            'xgboost': 0.4,
-            'lstm': 0.3
+        # Model weights (normalized to sum to 1.0), hot-reloaded from ENSEMBLE_WEIGHTS_PATH
+        self.weight_config = weights or EnsembleWeights()
+    
+    @property
+    def weights(self) -> Dict[str, float]:
+        return self.weight_config.as_dict()
+    
+    @property
+    def ready(self) -> bool:
+        """Warmed up with every model loaded (never while a model is on its random fallback)"""
+        return self.warmed_up and not self.load_errors
+    
+    @property
+    def load_errors(self) -> Dict[str, str]:
+        """Models whose load was attempted and failed, with the reason"""
+        return {
+            name: model.load_error
+            for name, model in (('xgboost', self.xgb_model), ('lstm', self.lstm_model))
+            if model.load_error is not None
+        }
+    
+    def warm_up(self) -> Dict[str, float]:
+        """Load every model and run one batch through it; returns load seconds per model
+
+        Raises ModelLoadError (and stays not ready) if any model failed to load.
+        """
+        load_seconds = {
+            'xgboost': self.xgb_model.load(),
+            'lstm': self.lstm_model.load()
         }
+        if self.load_errors:
+            raise ModelLoadError("; ".join(f"{name}: {error}" for name, error in self.load_errors.items()))
+        # First calls trace graphs and allocate buffers; pay that before serving traffic
+        # (no symbol, so nothing is written to the feature store)
+        self.xgb_model.predict_batch([{}])
+        self.lstm_model.predict_batch([{}])
+        self.warmed_up = True
+        return load_seconds
+    
+    def export(self, model_dir: str = None) -> Dict[str, str]:
+        """Write the serialized artifacts that lazy loading reads"""
+        return {
+            'xgboost': self.xgb_model.save(model_dir),
+            'lstm': self.lstm_model.save(model_dir)
+        }
+    
+    def export_onnx(self, model_dir: str = None) -> Dict[str, Dict[str, Any]]:
+        """Write ONNX artifacts for the onnx runtime; fails if an export drifts past ONNX_TOLERANCE"""
+        exported = {
+            'xgboost': self.xgb_model.export_onnx(model_dir),
+            'lstm': self.lstm_model.export_onnx(model_dir)
+        }
+        for name, result in exported.items():
+            if result['max_abs_error'] > ONNX_TOLERANCE[name]:
+                raise ValueError(f"{name} ONNX export differs by {result['max_abs_error']:.2e}")
+        return exported
     
     def predict(self, symbol: str, market_data: Dict[str, Any]) -> Tuple[float, float, Dict[str, float]]:
         """
         Generate ensemble prediction
         Returns: (ensemble_score, confidence, individual_scores)
         """
-        # Get individual model predictions
-        rule_score = self.rule_model.predict(symbol, market_data)
-        xgb_score = self.xgb_model.predict(symbol, market_data)
-        lstm_score = self.lstm_model.predict(symbol, market_data)
-        
-        individual_scores = {
-            'rule_based': rule_score,
-            'xgboost': xgb_score,
-            'lstm': lstm_score
-        }
-        
-        # Calculate weighted ensemble score
-        ensemble_score = (
-            rule_score * self.weights['rule_based'] +
-            xgb_score * self.weights['xgboost'] +
-            lstm_score * self.weights['lstm']
+        ensemble_scores, confidences, individual_scores = self.predict_batch([symbol], [market_data])
+        return (
+            float(ensemble_scores[0]),
+            float(confidences[0]),
+            {name: float(scores[0]) for name, scores in individual_scores.items()}
         )
-        
-        # Calculate confidence based on agreement between models
-        confidence = self._calculate_confidence(individual_scores)
-        
-        return ensemble_score, confidence, individual_scores
     
-    def _calculate_confidence(self, scores: Dict[str, float]) -> float:
-        """Calculate confidence based on model agreement"""
-        score_values = list(scores.values())
-        
-        # Calculate standard deviation (lower = higher agreement = higher confidence)
-        std_dev = np.std(score_values)
-        
-        # Convert to confidence score (0-100)
-        # Lower std_dev = higher confidence
+    def predict_batch(self, symbols: List[str], market_data_list: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Ensemble prediction for many symbols with one call per model
+        Returns: (ensemble_scores, confidences, individual_scores) as arrays aligned with symbols
+        """
+        score_matrix = self.score_matrix(symbols, market_data_list)
+        ensemble_scores, confidences = self.combine(score_matrix)
+        individual_scores = {name: score_matrix[:, i] for i, name in enumerate(MODEL_NAMES)}
+        return ensemble_scores, confidences, individual_scores
+    
+    def score_matrix(self, symbols: List[str], market_data_list: List[Dict[str, Any]]) -> np.ndarray:
+        """(n_symbols, n_models) scores, columns in MODEL_NAMES order"""
+        return np.column_stack([
+            self.rule_model.predict_batch(market_data_list),
+            self.xgb_model.predict_batch(market_data_list),
+            self.lstm_model.predict_batch(market_data_list, symbols)
+        ]).astype(float)
+    
+    def combine(self, score_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Weighted ensemble score and agreement confidence for each row"""
+        return score_matrix @ self.weight_config.current(), self._calculate_confidence(score_matrix)
+    
+    def _calculate_confidence(self, score_matrix: np.ndarray) -> np.ndarray:
+        """Confidence based on model agreement, per row of the score matrix"""
+        # Lower std_dev = higher agreement = higher confidence (0-100)
         max_std = 30  # Maximum expected standard deviation
-        confidence = max(0, min(100, 100 - (std_dev / max_std) * 100))
+        confidence = np.clip(100 - (score_matrix.std(axis=1) / max_std) * 100, 0, 100)
         
         # Boost confidence for extreme scores (very high or very low)
-        avg_score = np.mean(score_values)
-        if avg_score > 80 or avg_score < 20:
-            confidence = min(100, confidence * 1.2)
-            
-        return confidence
\ No newline at end of file
+        avg_score = score_matrix.mean(axis=1)
+        extreme = (avg_score > 80) | (avg_score < 20)
+        return np.where(extreme, np.minimum(100, confidence * 1.2), confidence)
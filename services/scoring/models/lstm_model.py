@@ -1,61 +1,92 @@
 import numpy as np
-import tensorflow as tf
 from typing import Dict, Any, List
+from .base import LazyModel
+from .onnx_runtime import OnnxModel
+from feature_store import FeatureStore, feature_store, lstm_features
 
-class LSTMModel:
-    def __init__(self):
+class LSTMModel(LazyModel):
+    artifact_name = "lstm.keras"
+    onnx_artifact_name = "lstm.onnx"
+    
+    def __init__(self, model_dir: str = None, store: FeatureStore = feature_store, runtime: str = None):
+        super().__init__(model_dir, runtime)
         self.name = "lstm"
-        self.model = None
         self.sequence_length = 20
-        self._initialize_mock_model()
+        self.store = store
+    
+    def _load_artifact(self, path: str):
+        if self.runtime == "onnx":
+            return OnnxModel(path)
+        import tensorflow as tf  # Imported on first use; TensorFlow alone takes seconds
+        return tf.keras.models.load_model(path, compile=False)
+    
+    def _save_artifact(self, model, path: str):
+        model.save(path)
     
-    def _initialize_mock_model(self):
-        """Initialize with mock LSTM model"""
-        # In production, load pre-trained LSTM model
-        self.model = tf.keras.Sequential([
+    def _train_mock_model(self):
+        """Mock LSTM model, used until a real artifact is exported"""
+        import tensorflow as tf
+        model = tf.keras.Sequential([
             tf.keras.layers.LSTM(50, return_sequences=True, input_shape=(self.sequence_length, 5)),
             tf.keras.layers.LSTM(50, return_sequences=False),
             tf.keras.layers.Dense(25),
             tf.keras.layers.Dense(1, activation='sigmoid')
         ])
-        self.model.compile(optimizer='adam', loss='mse')
+        model.compile(optimizer='adam', loss='mse')
         
         # Mock training
         X_mock = np.random.random((100, self.sequence_length, 5))
         y_mock = np.random.random((100, 1))
-        self.model.fit(X_mock, y_mock, epochs=1, verbose=0)
+        model.fit(X_mock, y_mock, epochs=1, verbose=0)
+        return model
+    
+    def _export_onnx(self, model, path: str):
+        import tensorflow as tf
+        import tf2onnx
+        
+        spec = (tf.TensorSpec((None, self.sequence_length, 5), tf.float32, name='input'),)
+        tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=path)
+    
+    def _verify_onnx(self, path: str) -> float:
+        X = np.random.default_rng(0).random((64, self.sequence_length, 5)).astype(np.float32)
+        expected = np.asarray(self.model(X, training=False))
+        return float(np.abs(OnnxModel(path).predict(X) - expected).max())
     
     def predict(self, symbol: str, market_data: Dict[str, Any]) -> float:
         """LSTM prediction using time series data"""
-        sequence = self._create_sequence(market_data)
+        sequence = self._create_sequence(market_data, symbol)
         
-        if self.model is None or len(sequence) < self.sequence_length:
+        if self.model is None:
             return np.random.uniform(25, 75)  # Fallback
             
         try:
-            # Reshape for LSTM input
-            X = np.array(sequence).reshape(1, self.sequence_length, -1)
+            X = sequence[np.newaxis]  # (1, sequence_length, 5)
             prediction = self.model.predict(X, verbose=0)[0][0]
             return max(0, min(100, prediction * 100))
         except:
             return np.random.uniform(35, 65)  # Fallback on error
     
-    def _create_sequence(self, market_data: Dict[str, Any]) -> List[List[float]]:
-        """Create time series sequence from market data"""
-        # Mock historical sequence - in production, fetch from database
-        base_features = [
-            market_data.get('price_change_percent', 0) / 100,
-            market_data.get('volume_ratio', 1.0),
-            market_data.get('rsi', 50) / 100,
-            market_data.get('macd', 0),
-            market_data.get('volatility', 0.2)
-        ]
+    def predict_batch(self, market_data_list: List[Dict[str, Any]], symbols: List[str] = None) -> np.ndarray:
+        """Single batched forward pass over the sequences of many symbols"""
+        symbols = symbols or [None] * len(market_data_list)
+        X = np.stack([self._create_sequence(m, symbol) for m, symbol in zip(market_data_list, symbols)])
         
-        # Generate mock sequence
-        sequence = []
-        for i in range(self.sequence_length):
-            # Add some noise to simulate historical data
-            noise = np.random.normal(0, 0.1, len(base_features))
-            sequence.append([f + n for f, n in zip(base_features, noise)])
+        if self.model is None:
+            return np.random.uniform(25, 75, len(X))  # Fallback
             
-        return sequence
\ No newline at end of file
+        try:
+            # Direct call avoids the per-call overhead of model.predict
+            predictions = np.asarray(self.model(X, training=False))[:, 0]
+            return np.clip(predictions * 100, 0, 100)
+        except:
+            return np.random.uniform(35, 65, len(X))  # Fallback on error
+    
+    def _create_sequence(self, market_data: Dict[str, Any], symbol: str = None) -> np.ndarray:
+        """(sequence_length, 5) history ending with this snapshot"""
+        features = lstm_features(market_data)
+        if symbol is None:
+            # No symbol to keep history under: repeat the snapshot
+            return np.repeat(features[np.newaxis], self.sequence_length, axis=0)
+        
+        self.store.update(symbol, features, ts=market_data.get('timestamp'))
+        return self.store.sequence(symbol, self.sequence_length)
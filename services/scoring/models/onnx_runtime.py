@@ -0,0 +1,26 @@
+import os
+import numpy as np
+
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "1"))
+
+class OnnxModel:
+    """ONNX Runtime session with the call shapes the native models expose"""
+    
+    def __init__(self, path: str, flatten: bool = False):
+        import onnxruntime as ort  # Only the runtime; no TensorFlow or XGBoost needed
+        
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = ONNX_THREADS
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.flatten = flatten
+    
+    def run(self, X) -> np.ndarray:
+        output = self.session.run(None, {self.input_name: np.asarray(X, dtype=np.float32)})[0]
+        return output.reshape(-1) if self.flatten else output
+    
+    def predict(self, X, verbose=0) -> np.ndarray:
+        return self.run(X)
+    
+    def __call__(self, X, training=False) -> np.ndarray:
+        return self.run(X)
@@ -1,5 +1,5 @@
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 class RuleBasedModel:
     def __init__(self):
@@ -40,4 +40,22 @@ class RuleBasedModel:
         ma_signal = market_data.get('ma_signal', 0)  # 1=bullish, -1=bearish, 0=neutral
         score += ma_signal * 12
         
-        return max(0, min(100, score))
\ No newline at end of file
+        return max(0, min(100, score))
+    
+    def predict_batch(self, market_data_list: List[Dict[str, Any]]) -> np.ndarray:
+        """Vectorized rule scoring over many symbols; same rules as predict"""
+        price_change = np.array([m.get('price_change_percent', 0) for m in market_data_list], dtype=float)
+        volume_ratio = np.array([m.get('volume_ratio', 1.0) for m in market_data_list], dtype=float)
+        rsi = np.array([m.get('rsi', 50) for m in market_data_list], dtype=float)
+        ma_signal = np.array([m.get('ma_signal', 0) for m in market_data_list], dtype=float)
+        
+        score = np.full(len(market_data_list), 50.0)
+        score += np.select(
+            [price_change > 5, price_change > 2, price_change < -5, price_change < -2],
+            [20, 10, -20, -10], 0
+        )
+        score += np.select([volume_ratio > 2.0, volume_ratio > 1.5, volume_ratio < 0.5], [15, 8, -10], 0)
+        score += np.select([(rsi >= 30) & (rsi <= 70), (rsi < 20) | (rsi > 80)], [10, -15], 0)
+        score += ma_signal * 12
+        
+        return np.clip(score, 0, 100)
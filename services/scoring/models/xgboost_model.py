@@ -1,17 +1,32 @@
 import numpy as np
-import xgboost as xgb
-from typing import Dict, Any
+from typing import Dict, Any, List
+from .base import LazyModel
+from .onnx_runtime import OnnxModel
 
-class XGBoostModel:
-    def __init__(self):
+class XGBoostModel(LazyModel):
+    artifact_name = "xgboost.ubj"
+    onnx_artifact_name = "xgboost.onnx"
+    n_features = 10
+    
+    def __init__(self, model_dir: str = None, runtime: str = None):
+        super().__init__(model_dir, runtime)
         self.name = "xgboost"
-        self.model = None
-        self._initialize_mock_model()
     
-    def _initialize_mock_model(self):
-        """Initialize with mock trained model"""
-        # In production, load pre-trained model
-        self.model = xgb.XGBRegressor(
+    def _load_artifact(self, path: str):
+        if self.runtime == "onnx":
+            return OnnxModel(path, flatten=True)
+        import xgboost as xgb
+        model = xgb.XGBRegressor()
+        model.load_model(path)
+        return model
+    
+    def _save_artifact(self, model, path: str):
+        model.save_model(path)
+    
+    def _train_mock_model(self):
+        """Mock trained model, used until a real artifact is exported"""
+        import xgboost as xgb
+        model = xgb.XGBRegressor(
             n_estimators=100,
             max_depth=6,
             learning_rate=0.1,
@@ -20,7 +35,20 @@ class XGBoostModel:
         # Mock training data
         X_mock = np.random.random((1000, 10))
         y_mock = np.random.random(1000) * 100
-        self.model.fit(X_mock, y_mock)
+        model.fit(X_mock, y_mock)
+        return model
+    
+    def _export_onnx(self, model, path: str):
+        from onnxmltools import convert_xgboost
+        from onnxmltools.convert.common.data_types import FloatTensorType
+        
+        onnx_model = convert_xgboost(model, initial_types=[('input', FloatTensorType([None, self.n_features]))])
+        with open(path, 'wb') as f:
+            f.write(onnx_model.SerializeToString())
+    
+    def _verify_onnx(self, path: str) -> float:
+        X = np.random.default_rng(0).random((256, self.n_features)).astype(np.float32)
+        return float(np.abs(OnnxModel(path, flatten=True).predict(X) - self.model.predict(X)).max())
     
     def predict(self, symbol: str, market_data: Dict[str, Any]) -> float:
         """XGBoost prediction using market features"""
@@ -35,6 +63,18 @@ class XGBoostModel:
         except:
             return np.random.uniform(30, 70)  # Fallback on error
     
+    def predict_batch(self, market_data_list: List[Dict[str, Any]]) -> np.ndarray:
+        """One XGBoost predict over the feature matrix of many symbols"""
+        X = np.array([self._extract_features(m) for m in market_data_list], dtype=float)
+        
+        if self.model is None:
+            return np.random.uniform(20, 80, len(X))  # Fallback
+            
+        try:
+            return np.clip(self.model.predict(X), 0, 100)
+        except:
+            return np.random.uniform(30, 70, len(X))  # Fallback on error
+    
     def _extract_features(self, market_data: Dict[str, Any]) -> list:
         """Extract features for XGBoost model"""
         return [
@@ -0,0 +1,263 @@
+"""
+Local columnar OHLCV store - memory-mapped NumPy columns partitioned by symbol/year
+
+Layout: <root>/<SYMBOL>/<YEAR>/{ts,Open,High,Low,Close,Volume}.npy plus a
+<root>/<SYMBOL>/coverage.json listing the [start, end) ranges already fetched.
+Reads memory-map only the partitions a date range touches; a range inside one
+year is returned as views over the mapped files. Missing ranges go to a
+pluggable fetcher and are merged into the partitions.
+
+Writes go to a uniquely named temp file that replaces the target, under a
+per-symbol file lock, so worker processes sharing the store never publish a
+torn file or lose each other's updates.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads in one process are serialized
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+# Ranges ending this close to today only count as covered up to the last bar fetched,
+# since the provider may not have published the most recent sessions yet
+RECENT_WINDOW = pd.Timedelta(days=7)
+
+# Tickers, share classes (BRK.B), indices (^GSPC), futures and FX (ES=F, EURUSD=X)
+SYMBOL_PATTERN = re.compile(r"[A-Z0-9.\-^=]{1,15}")
+
+Fetcher = Callable[[str, pd.Timestamp, pd.Timestamp], pd.DataFrame]
+
+
+class FetchError(RuntimeError):
+    """The fetcher failed for a range the store does not hold yet"""
+
+
+class NoDataError(LookupError):
+    """Neither the store nor the fetcher has bars for the requested range"""
+
+
+def validate_symbol(symbol: str) -> str:
+    """Upper-cased symbol; ValueError if it is not a ticker, so it can never name a path outside the store"""
+    normalized = symbol.upper()
+    if not SYMBOL_PATTERN.fullmatch(normalized) or not normalized.strip("."):
+        raise ValueError(f"Invalid symbol: {symbol!r}")
+    return normalized
+
+
+def yfinance_fetcher(symbol: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    """Default fetcher backed by yfinance"""
+    import yfinance as yf
+
+    data = yf.Ticker(symbol).history(start=start.strftime("%Y-%m-%d"), end=end.strftime("%Y-%m-%d"))
+    return data[FIELDS] if not data.empty else pd.DataFrame(columns=FIELDS)
+
+
+class OHLCVStore:
+    def __init__(self, root: str, fetcher: Optional[Fetcher] = yfinance_fetcher):
+        self.root = root
+        self.fetcher = fetcher
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Picklable so worker processes can read partitions themselves
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def load(self, symbol: str, start, end) -> pd.DataFrame:
+        """Read [start, end), fetching only the ranges not yet stored"""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+
+        if self.fetcher is not None:
+            for gap_start, gap_end in self.missing_ranges(symbol, start, end):
+                try:
+                    fetched = self.fetcher(symbol, gap_start, gap_end)
+                except Exception as e:
+                    raise FetchError(f"Fetching {symbol} {gap_start:%Y-%m-%d} to {gap_end:%Y-%m-%d} failed: {e}") from e
+                if fetched is None or fetched.empty:
+                    # Failed or empty fetches are not recorded, so the range is retried next time
+                    continue
+                self.write(symbol, fetched, coverage=(gap_start, covered_until(fetched, gap_end)))
+
+        return self.read(symbol, start, end)
+
+    def read(self, symbol: str, start, end) -> pd.DataFrame:
+        """Read [start, end) from local partitions only"""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        lo, hi = start.value, end.value
+
+        chunks = []
+        if os.path.isdir(self._symbol_dir(symbol)):
+            # Shared lock: every column of a partition is mapped from the same write
+            with self._file_lock(symbol, shared=True):
+                for year in range(start.year, end.year + 1):
+                    columns = self._open_partition(symbol, year)
+                    if columns is None:
+                        continue
+                    ts = columns["ts"]
+                    left, right = np.searchsorted(ts, lo, side="left"), np.searchsorted(ts, hi, side="left")
+                    if right > left:
+                        chunks.append({name: column[left:right] for name, column in columns.items()})
+
+        if not chunks:
+            return pd.DataFrame(columns=FIELDS, index=pd.DatetimeIndex([]), dtype=float)
+
+        if len(chunks) == 1:
+            columns = chunks[0]  # Views over the memory-mapped files
+        else:
+            columns = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+        index = pd.DatetimeIndex(columns["ts"].view("datetime64[ns]"))
+        return pd.DataFrame({name: columns[name] for name in FIELDS}, index=index, copy=False)
+
+    def write(self, symbol: str, data: pd.DataFrame, coverage: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None):
+        """Merge rows into the symbol's year partitions and record coverage"""
+        os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+        with self._lock, self._file_lock(symbol):
+            if data is not None and not data.empty:
+                frame = data[FIELDS].astype(float)
+                index = frame.index
+                if getattr(index, "tz", None) is not None:
+                    index = index.tz_localize(None)
+                ts = index.values.astype("datetime64[ns]").view("i8")
+                years = index.year
+
+                for year in np.unique(years):
+                    mask = years == year
+                    self._merge_partition(symbol, int(year), ts[mask], frame.values[mask])
+
+            if coverage is not None:
+                self._add_coverage(symbol, *coverage)
+
+    def missing_ranges(self, symbol: str, start, end) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Sub-ranges of [start, end) not yet covered by a previous fetch"""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        gaps = []
+        cursor = start
+
+        for covered_start, covered_end in self._coverage(symbol):
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, validate_symbol(symbol))
+
+    @contextmanager
+    def _file_lock(self, symbol: str, shared: bool = False):
+        """Cross-process lock on the symbol directory (a no-op without fcntl)"""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self._symbol_dir(symbol), ".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _open_partition(self, symbol: str, year: int) -> Optional[dict]:
+        partition = os.path.join(self._symbol_dir(symbol), str(year))
+        if not os.path.exists(os.path.join(partition, "ts.npy")):
+            return None
+        return {
+            name: np.load(os.path.join(partition, f"{name}.npy"), mmap_mode="r")
+            for name in ["ts"] + FIELDS
+        }
+
+    def _merge_partition(self, symbol: str, year: int, ts: np.ndarray, values: np.ndarray):
+        existing = self._open_partition(symbol, year)
+        if existing is not None:
+            keep = ~np.isin(existing["ts"], ts)  # New rows replace stored ones
+            ts = np.concatenate([existing["ts"][keep], ts])
+            values = np.concatenate([np.column_stack([existing[name][keep] for name in FIELDS]), values])
+
+        order = np.argsort(ts, kind="stable")
+        partition = os.path.join(self._symbol_dir(symbol), str(year))
+        os.makedirs(partition, exist_ok=True)
+
+        columns = {"ts": ts[order]}
+        columns.update({name: np.ascontiguousarray(values[order, i]) for i, name in enumerate(FIELDS)})
+        for name, column in columns.items():
+            with _atomic_file(os.path.join(partition, f"{name}.npy"), "wb") as f:
+                np.save(f, column)
+
+    def _coverage(self, symbol: str) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        path = os.path.join(self._symbol_dir(symbol), "coverage.json")
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in json.load(f)]
+
+    def _add_coverage(self, symbol: str, start: pd.Timestamp, end: pd.Timestamp):
+        # Today's bars may still change, so coverage stops at the start of today
+        end = min(pd.Timestamp(end), pd.Timestamp.now().normalize())
+        if end <= start:
+            return
+
+        ranges = sorted(self._coverage(symbol) + [(pd.Timestamp(start), end)])
+        merged = [ranges[0]]
+        for range_start, range_end in ranges[1:]:
+            if range_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+            else:
+                merged.append((range_start, range_end))
+
+        path = os.path.join(self._symbol_dir(symbol), "coverage.json")
+        with _atomic_file(path, "w") as f:
+            json.dump([[s.isoformat(), e.isoformat()] for s, e in merged], f)
+
+
+def covered_until(fetched: pd.DataFrame, gap_end: pd.Timestamp) -> pd.Timestamp:
+    """End of the range a successful fetch proves complete
+
+    Older gaps are complete once any bars come back; the days without bars are
+    non-trading days. Recent gaps only count up to the day after the last bar.
+    """
+    gap_end = pd.Timestamp(gap_end)
+    if gap_end <= pd.Timestamp.now().normalize() - RECENT_WINDOW:
+        return gap_end
+    last_bar = fetched.index.max()
+    if getattr(last_bar, "tz", None) is not None:
+        last_bar = last_bar.tz_localize(None)
+    return min(gap_end, last_bar.normalize() + pd.Timedelta(days=1))
+
+@contextmanager
+def _atomic_file(path: str, mode: str):
+    """Write to a unique temp file in the same directory, then replace path with it"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+ohlcv_store = OHLCVStore(
+    root=os.getenv("OHLCV_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ohlcv"))
+)
@@ -0,0 +1,232 @@
+"""
+Parameter sweep / grid optimization for the rule-builder backtester
+
+Price data is loaded once per sweep and every distinct indicator series in the
+grid is computed once up front; grid points then only evaluate operators and
+returns. Large grids are chunked across one process pool shared by every sweep
+(so concurrent sweeps queue for SWEEP_MAX_WORKERS processes instead of each
+forking its own), and ranked results are streamed back as NDJSON as chunks
+complete.
+"""
+
+import asyncio
+import itertools
+import json
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from indicator_cache import frame_fingerprint
+from strategy_engine import BacktestResult, Strategy, StrategyEngine, strategy_engine
+
+router = APIRouter()
+
+SWEEP_MAX_WORKERS = int(os.getenv("SWEEP_MAX_WORKERS", str(os.cpu_count() or 1)))
+SWEEP_INLINE_POINTS = int(os.getenv("SWEEP_INLINE_POINTS", "32"))
+# Largest grid a single request may run; server-side so clients cannot raise it
+SWEEP_MAX_POINTS = int(os.getenv("SWEEP_MAX_POINTS", "1000"))
+
+class SweepRequest(BaseModel):
+    strategy: Strategy
+    symbol: str = "AAPL"
+    start_date: str = "2023-01-01"
+    end_date: str = "2024-01-01"
+    commission: float = 0.0
+    slippage: float = 0.0
+    # Keys are "<condition_id>.value" for thresholds or "<condition_id>.<parameter>"
+    parameter_grid: Dict[str, List[Any]]
+    rank_by: str = "sharpe_ratio"
+    top_n: int = 10
+
+def grid_size(parameter_grid: Dict[str, List[Any]]) -> int:
+    """Number of points in the grid, without expanding it"""
+    return math.prod(len(values) for values in parameter_grid.values())
+
+def expand_grid(parameter_grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of the grid as a list of parameter assignments"""
+    keys = sorted(parameter_grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(parameter_grid[k] for k in keys))]
+
+def apply_point(strategy: Strategy, point: Dict[str, Any]) -> Strategy:
+    """Copy of the strategy with one grid point's values applied"""
+    variant = strategy.model_copy(deep=True)
+    conditions = {}
+    for condition in variant.conditions:
+        conditions.setdefault(condition.id, condition)
+
+    for key, value in point.items():
+        condition_id, _, field = key.partition('.')
+        condition = conditions.get(condition_id)
+        if condition is None or not field:
+            raise ValueError(f"Unknown grid key: {key}")
+
+        if field == 'value':
+            condition.value = float(value)
+        else:
+            condition.parameters[field] = value
+
+    return variant
+
+def precompute_series(engine: StrategyEngine, strategy: Strategy, points: List[Dict[str, Any]],
+                      data: pd.DataFrame, symbol: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """Compute each distinct indicator series used anywhere in the grid once"""
+    table: Dict[str, np.ndarray] = {}
+    cache_scope = (symbol, frame_fingerprint(data)) if symbol else None
+
+    for point in points:
+        for condition in apply_point(strategy, point).conditions:
+            if condition.indicator not in engine.indicators or engine.series_key(condition) in table:
+                continue
+            try:
+                engine.indicator_series(condition, data, table, cache_scope)
+            except Exception as e:
+                # Left out of the table; evaluation reports it and treats it as False
+                print(f"Error precomputing {condition.indicator}: {e}")
+
+    return table
+
+def rank_results(rows: List[Dict[str, Any]], rank_by: str, top_n: int) -> List[Dict[str, Any]]:
+    """Best rows first; NaN metrics rank last"""
+    def score(row):
+        value = row["result"][rank_by]
+        return -math.inf if value is None or math.isnan(value) else value
+
+    return sorted(rows, key=score, reverse=True)[:top_n]
+
+def finite(value: Any) -> Any:
+    """Copy with NaN and +/-inf floats replaced by None, since JSON has no literal for them"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [finite(item) for item in value]
+    return value
+
+def ndjson_line(event: Dict[str, Any]) -> str:
+    """One strict-JSON stream line; ranking has already used the raw values, so inf still sorts first"""
+    return json.dumps(finite(event), allow_nan=False) + "\n"
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def sweep_pool() -> ProcessPoolExecutor:
+    """Process pool shared by every sweep and portfolio backtest, started on first use (and again if a worker died)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or getattr(_pool, "_broken", False):
+            _pool = ProcessPoolExecutor(max_workers=max(1, SWEEP_MAX_WORKERS))
+        return _pool
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+# Engine without cache or store, one per process (indicator series come from the sweep)
+_worker_state: Dict[str, Any] = {}
+
+def _worker_engine() -> StrategyEngine:
+    if "engine" not in _worker_state:
+        _worker_state["engine"] = StrategyEngine(cache=None, store=None)
+    return _worker_state["engine"]
+
+def _run_points(strategy: Strategy, points: List[Dict[str, Any]], data: pd.DataFrame,
+                series: Dict[str, np.ndarray], start_date: str, end_date: str,
+                commission: float = 0.0, slippage: float = 0.0) -> List[Dict[str, Any]]:
+    engine = _worker_engine()
+
+    rows = []
+    for point in points:
+        variant = apply_point(strategy, point)
+        result = engine.backtest_on_data(variant, data, start_date, end_date, memo=series,
+                                         commission=commission, slippage=slippage)
+        rows.append({"parameters": point, "result": result.model_dump()})
+    return rows
+
+async def _stream_sweep(request: SweepRequest, points: List[Dict[str, Any]], data: pd.DataFrame,
+                        series: Dict[str, np.ndarray]):
+    loop = asyncio.get_running_loop()
+
+    if len(points) <= SWEEP_INLINE_POINTS:
+        futures = [loop.run_in_executor(None, _run_points, request.strategy, points, data, series,
+                                        request.start_date, request.end_date, request.commission, request.slippage)]
+    else:
+        workers = max(1, min(SWEEP_MAX_WORKERS, len(points)))
+        chunk_size = max(1, math.ceil(len(points) / (workers * 4)))
+        executor = sweep_pool()
+        futures = [
+            loop.run_in_executor(executor, _run_points, request.strategy, points[i:i + chunk_size], data, series,
+                                 request.start_date, request.end_date, request.commission, request.slippage)
+            for i in range(0, len(points), chunk_size)
+        ]
+
+    try:
+        leaderboard: List[Dict[str, Any]] = []
+        completed = 0
+
+        for future in asyncio.as_completed(futures):
+            rows = await future
+            completed += len(rows)
+            leaderboard = rank_results(leaderboard + rows, request.rank_by, request.top_n)
+            yield ndjson_line({"type": "progress", "completed": completed, "total": len(points),
+                               "top": leaderboard})
+
+        yield ndjson_line({"type": "complete", "total": len(points), "results": leaderboard})
+
+    except Exception as e:
+        yield ndjson_line({"type": "error", "detail": f"Sweep failed: {str(e)}"})
+
+    finally:
+        # Client went away or the sweep failed: drop this sweep's chunks that have not started
+        for future in futures:
+            future.cancel()
+
+@router.post("/backtest/sweep")
+async def sweep_strategy(request: SweepRequest):
+    """Backtest a grid of strategy parameters, streaming ranked results as NDJSON"""
+    if request.rank_by not in BacktestResult.model_fields or request.rank_by in ("start_date", "end_date"):
+        raise HTTPException(status_code=400, detail=f"Cannot rank by: {request.rank_by}")
+
+    # Size the grid before expanding it so an oversized one is rejected without being built
+    size = grid_size(request.parameter_grid)
+    if not request.parameter_grid or size == 0:
+        raise HTTPException(status_code=400, detail="Parameter grid is empty")
+    if size > SWEEP_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"Grid has {size} points, limit is {SWEEP_MAX_POINTS}")
+
+    points = expand_grid(request.parameter_grid)
+
+    try:
+        apply_point(request.strategy, points[0])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    loop = asyncio.get_running_loop()
+    try:
+        data = await loop.run_in_executor(
+            None, strategy_engine.data_store.load, request.symbol, request.start_date, request.end_date
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Failed to load data for {request.symbol}: {str(e)}")
+
+    if data.empty:
+        raise HTTPException(status_code=404, detail=f"No data available for {request.symbol}")
+
+    series = await loop.run_in_executor(
+        None, precompute_series, strategy_engine, request.strategy, points, data, request.symbol
+    )
+
+    return StreamingResponse(_stream_sweep(request, points, data, series), media_type="application/x-ndjson")
@@ -0,0 +1,226 @@
+"""
+Multi-symbol portfolio backtests over a (time x symbol) price matrix
+
+Symbols are loaded into a panel with (field, symbol) columns and the strategy
+is evaluated on the whole matrix in one pass. Large universes are split into
+chunks of PORTFOLIO_CHUNK_SIZE symbols that run on the process pool shared with
+parameter sweeps, each reading its own symbols from the OHLCV store.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from ohlcv_store import OHLCVStore
+from parameter_sweep import sweep_pool
+from strategy_engine import Strategy, StrategyEngine, strategy_engine
+
+router = APIRouter()
+
+PORTFOLIO_CHUNK_SIZE = int(os.getenv("PORTFOLIO_CHUNK_SIZE", "100"))
+# Largest universe a single request may backtest
+PORTFOLIO_MAX_SYMBOLS = int(os.getenv("PORTFOLIO_MAX_SYMBOLS", "1000"))
+ALLOCATIONS = ("equal", "signal")
+
+class PortfolioBacktestRequest(BaseModel):
+    strategy: Strategy
+    symbols: List[str]
+    start_date: str = "2023-01-01"
+    end_date: str = "2024-01-01"
+    allocation: str = "equal"  # "equal" or "signal"
+
+class SymbolBacktestMetrics(BaseModel):
+    symbol: str
+    total_return: float
+    sharpe_ratio: float
+    max_drawdown: float
+    total_trades: int
+
+class PortfolioBacktestResult(BaseModel):
+    allocation: str
+    total_return: float
+    sharpe_ratio: float
+    max_drawdown: float
+    total_trades: int
+    symbols: List[SymbolBacktestMetrics]
+    missing_symbols: List[str]
+    start_date: str
+    end_date: str
+
+def load_panel(store: OHLCVStore, symbols: List[str], start_date: str, end_date: str) -> Tuple[pd.DataFrame, List[str]]:
+    """Load symbols into one frame with (field, symbol) columns, aligned on the union of dates"""
+    frames = {}
+    missing = []
+
+    for symbol in symbols:
+        try:
+            data = store.load(symbol, start_date, end_date)
+        except Exception as e:
+            print(f"Failed to load {symbol}: {e}")
+            data = None
+
+        if data is None or data.empty:
+            missing.append(symbol)
+        else:
+            frames[symbol] = data
+
+    if not frames:
+        return pd.DataFrame(), missing
+
+    panel = pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1)
+    return panel.ffill(), missing
+
+def price_returns(close: np.ndarray) -> np.ndarray:
+    """Bar-to-bar returns along the time axis; the first bar and gaps are 0"""
+    returns = np.zeros_like(close, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = close[1:] / close[:-1] - 1
+    returns[~np.isfinite(returns)] = 0.0
+    return returns
+
+def performance_metrics(strategy_returns: np.ndarray) -> Dict[str, np.ndarray]:
+    """Total return, Sharpe ratio and max drawdown (percent) for each column of a return matrix"""
+    equity = np.cumprod(1 + strategy_returns, axis=0)
+    total_return = (equity[-1] / equity[0] - 1) * 100
+
+    if len(strategy_returns) > 1:
+        std = strategy_returns.std(axis=0, ddof=1)
+    else:
+        std = np.zeros(strategy_returns.shape[1:])
+    mean = strategy_returns.mean(axis=0)
+    sharpe_ratio = np.where(std > 0, mean / np.where(std > 0, std, 1) * np.sqrt(252), 0.0)
+
+    peak = np.maximum.accumulate(equity, axis=0)
+    max_drawdown = ((equity - peak) / peak * 100).min(axis=0)
+
+    return {'total_return': total_return, 'sharpe_ratio': sharpe_ratio, 'max_drawdown': max_drawdown}
+
+def evaluate_chunk(strategy: Strategy, store: OHLCVStore, symbols: List[str], start_date: str, end_date: str) -> Dict[str, Any]:
+    """Positions and price returns for one chunk of the universe"""
+    panel, missing = load_panel(store, symbols, start_date, end_date)
+    if panel.empty:
+        return {'index': pd.DatetimeIndex([]), 'symbols': [], 'positions': np.zeros((0, 0), dtype=bool),
+                'returns': np.zeros((0, 0)), 'missing': missing}
+
+    signals = StrategyEngine(cache=None, store=store).evaluate_strategy(strategy, panel)
+    close = panel['Close']
+
+    # Enter position on the bar after the signal
+    positions = np.zeros(signals.shape, dtype=bool)
+    positions[1:] = signals.values[:-1]
+
+    return {
+        'index': panel.index,
+        'symbols': list(close.columns),
+        'positions': positions,
+        'returns': price_returns(close.to_numpy(dtype=float)),
+        'missing': missing
+    }
+
+def _combine_chunks(chunks: List[Dict[str, Any]]) -> Tuple[List[str], np.ndarray, np.ndarray, List[str]]:
+    index = chunks[0]['index']
+    for chunk in chunks[1:]:
+        index = index.union(chunk['index'])
+
+    symbols, positions, returns, missing = [], [], [], []
+    for chunk in chunks:
+        missing.extend(chunk['missing'])
+        if not chunk['symbols']:
+            continue
+        symbols.extend(chunk['symbols'])
+        positions.append(pd.DataFrame(chunk['positions'], index=chunk['index']).reindex(index, fill_value=False).to_numpy(dtype=bool))
+        returns.append(pd.DataFrame(chunk['returns'], index=chunk['index']).reindex(index, fill_value=0.0).to_numpy(dtype=float))
+
+    if not symbols:
+        return [], np.zeros((0, 0), dtype=bool), np.zeros((0, 0)), missing
+    return symbols, np.hstack(positions), np.hstack(returns), missing
+
+def backtest_portfolio(strategy: Strategy, symbols: List[str], start_date: str, end_date: str,
+                       allocation: str = "equal", store: OHLCVStore = None) -> PortfolioBacktestResult:
+    """Backtest one strategy across a universe with equal or signal-weighted allocation"""
+    if allocation not in ALLOCATIONS:
+        raise ValueError(f"Unknown allocation: {allocation}")
+
+    store = store or strategy_engine.data_store
+    symbols = list(dict.fromkeys(symbols))
+    chunks = [symbols[i:i + PORTFOLIO_CHUNK_SIZE] for i in range(0, len(symbols), PORTFOLIO_CHUNK_SIZE)]
+
+    if len(chunks) == 1:
+        results = [evaluate_chunk(strategy, store, chunks[0], start_date, end_date)]
+    else:
+        # Concurrent requests queue for the same worker processes instead of each starting its own
+        results = list(sweep_pool().map(
+            evaluate_chunk,
+            [strategy] * len(chunks), [store] * len(chunks), chunks,
+            [start_date] * len(chunks), [end_date] * len(chunks)
+        ))
+
+    loaded, positions, returns, missing = _combine_chunks(results)
+    if not loaded:
+        raise ValueError("No data available for any symbol")
+
+    strategy_returns = positions * returns
+    per_symbol = performance_metrics(strategy_returns)
+
+    previous = np.zeros_like(positions)
+    previous[1:] = positions[:-1]
+    trades = (positions & ~previous).sum(axis=0)
+
+    if allocation == "equal":
+        # Capital split evenly across the universe; idle slices stay in cash
+        portfolio_returns = strategy_returns.mean(axis=1)
+    else:
+        # Capital split across the symbols currently signalled
+        held = positions.sum(axis=1)
+        portfolio_returns = np.where(held > 0, strategy_returns.sum(axis=1) / np.maximum(held, 1), 0.0)
+
+    aggregate = performance_metrics(portfolio_returns[:, None])
+
+    return PortfolioBacktestResult(
+        allocation=allocation,
+        total_return=round(float(aggregate['total_return'][0]), 2),
+        sharpe_ratio=round(float(aggregate['sharpe_ratio'][0]), 2),
+        max_drawdown=round(float(aggregate['max_drawdown'][0]), 2),
+        total_trades=int(trades.sum()),
+        symbols=[
+            SymbolBacktestMetrics(
+                symbol=symbol,
+                total_return=round(float(per_symbol['total_return'][i]), 2),
+                sharpe_ratio=round(float(per_symbol['sharpe_ratio'][i]), 2),
+                max_drawdown=round(float(per_symbol['max_drawdown'][i]), 2),
+                total_trades=int(trades[i])
+            )
+            for i, symbol in enumerate(loaded)
+        ],
+        missing_symbols=missing,
+        start_date=start_date,
+        end_date=end_date
+    )
+
+@router.post("/backtest/portfolio", response_model=PortfolioBacktestResult)
+async def backtest_portfolio_route(request: PortfolioBacktestRequest):
+    """Backtest a strategy across a list of symbols"""
+    if not request.symbols:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    symbol_count = len(set(request.symbols))
+    if symbol_count > PORTFOLIO_MAX_SYMBOLS:
+        raise HTTPException(status_code=400,
+                            detail=f"Request has {symbol_count} symbols, limit is {PORTFOLIO_MAX_SYMBOLS}")
+    if request.allocation not in ALLOCATIONS:
+        raise HTTPException(status_code=400, detail=f"Allocation must be one of: {', '.join(ALLOCATIONS)}")
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, backtest_portfolio, request.strategy, request.symbols,
+            request.start_date, request.end_date, request.allocation
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Portfolio backtest failed: {str(e)}")
@@ -0,0 +1,182 @@
+"""
+Backtest progress over Redis pub/sub - published by Celery workers, streamed to clients as SSE
+
+Each event is a self-contained JSON object on `backtest:progress:<task_id>`.
+The latest event is also kept under `backtest:progress:last:<task_id>` so a
+client that subscribes late starts from the current state instead of waiting
+for the next chunk. A stream ends at a terminal event or after
+STREAM_MAX_SECONDS, whichever comes first; clients reconnect to resume.
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Dict, Optional
+
+import numpy as np
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:  # Progress streaming is disabled without Redis
+    redis = None
+    aioredis = None
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+PROGRESS_CHUNKS = int(os.getenv("BACKTEST_PROGRESS_CHUNKS", "20"))
+PROGRESS_EQUITY_POINTS = int(os.getenv("BACKTEST_PROGRESS_EQUITY_POINTS", "200"))
+PROGRESS_TTL = int(os.getenv("BACKTEST_PROGRESS_TTL", "3600"))
+STREAM_MAX_SECONDS = float(os.getenv("BACKTEST_STREAM_MAX_SECONDS", "900"))
+KEEPALIVE_SECONDS = 15
+
+TERMINAL_EVENTS = ("complete", "error")
+
+def progress_channel(task_id: str) -> str:
+    return f"backtest:progress:{task_id}"
+
+def progress_key(task_id: str) -> str:
+    return f"backtest:progress:last:{task_id}"
+
+def downsample(values: np.ndarray, max_points: int = PROGRESS_EQUITY_POINTS) -> list:
+    """At most max_points evenly spaced values, always keeping the last one"""
+    values = np.asarray(values, dtype=float)
+    if len(values) <= max_points:
+        return [round(float(v), 2) for v in values]
+    idx = np.linspace(0, len(values) - 1, max_points).round().astype(int)
+    return [round(float(v), 2) for v in values[idx]]
+
+def running_metrics(portfolio_values: np.ndarray, periods_per_year: int = 252) -> Dict[str, float]:
+    """Return, Sharpe ratio and max drawdown of the equity curve so far"""
+    values = np.asarray(portfolio_values, dtype=float)
+    if len(values) < 2:
+        return {'total_return': 0.0, 'sharpe_ratio': 0.0, 'max_drawdown': 0.0}
+
+    returns = np.diff(values) / values[:-1]
+    std = returns.std()
+    peak = np.maximum.accumulate(values)
+    return {
+        'total_return': round(float((values[-1] / values[0] - 1) * 100), 2),
+        'sharpe_ratio': round(float(returns.mean() / std * np.sqrt(periods_per_year)), 2) if std > 0 else 0.0,
+        'max_drawdown': round(float(((peak - values) / peak * 100).max()), 2)
+    }
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """One Server-Sent Events frame, named after the event type"""
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n"
+
+
+_sync_client = None
+
+def sync_client():
+    """Shared blocking Redis client, so each publisher reuses one connection pool"""
+    global _sync_client
+    if _sync_client is None and redis is not None:
+        _sync_client = redis.Redis.from_url(REDIS_URL)
+    return _sync_client
+
+
+class ProgressPublisher:
+    """Worker-side publisher; Redis failures are logged and never fail the backtest"""
+
+    def __init__(self, task_id: str, client=None, redis_url: Optional[str] = REDIS_URL):
+        self.task_id = task_id
+        self.client = client
+        if self.client is None and redis is not None and redis_url:
+            self.client = sync_client() if redis_url == REDIS_URL else redis.Redis.from_url(redis_url)
+
+    def publish(self, event: Dict[str, Any]):
+        if self.client is None or not self.task_id:
+            return
+        payload = json.dumps({'task_id': self.task_id, **event})
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.publish(progress_channel(self.task_id), payload)
+            pipe.setex(progress_key(self.task_id), PROGRESS_TTL, payload)
+            pipe.execute()
+        except Exception as e:
+            print(f"Progress publish failed: {e}")
+
+    def stage(self, status: str):
+        self.publish({'type': 'stage', 'status': status})
+
+    def bars(self, partial_values: np.ndarray, total_bars: int, periods_per_year: int = 252):
+        """Bars processed so far, with the equity curve and metrics up to the last one
+
+        Called by the backtest as each chunk of bars is processed.
+        """
+        values = np.asarray(partial_values, dtype=float)
+        if total_bars <= 0:
+            return
+        self.publish({
+            'type': 'progress',
+            'bars_processed': len(values),
+            'total_bars': total_bars,
+            'percent': round(len(values) / total_bars * 100, 1),
+            'equity': downsample(values),
+            'metrics': running_metrics(values, periods_per_year)
+        })
+
+    def complete(self, result: Dict[str, Any]):
+        self.publish({'type': 'complete', 'result': result})
+
+    def error(self, message: str):
+        self.publish({'type': 'error', 'error': message})
+
+
+_async_client = None
+
+def async_client():
+    """Shared asyncio Redis client for the API process"""
+    global _async_client
+    if _async_client is None and aioredis is not None:
+        _async_client = aioredis.Redis.from_url(REDIS_URL)
+    return _async_client
+
+async def last_event(task_id: str, client=None) -> Optional[Dict[str, Any]]:
+    """Latest progress event for a task, or None if it never published or its state expired"""
+    client = client or async_client()
+    if client is None:
+        return None
+    last = await client.get(progress_key(task_id))
+    return json.loads(last) if last is not None else None
+
+async def subscribe(task_id: str, client=None, keepalive: float = KEEPALIVE_SECONDS,
+                    max_seconds: float = STREAM_MAX_SECONDS) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """Yield progress events until a terminal one; None is yielded as a keepalive tick
+
+    After max_seconds a 'timeout' event is yielded and the stream ends.
+    """
+    client = client or async_client()
+    if client is None:
+        raise RuntimeError("Redis is not available for progress streaming")
+    deadline = asyncio.get_running_loop().time() + max_seconds
+
+    pubsub = client.pubsub()
+    await pubsub.subscribe(progress_channel(task_id))
+    try:
+        # Subscribe before reading the last state so no event falls in between
+        last = await client.get(progress_key(task_id))
+        if last is not None:
+            event = json.loads(last)
+            yield event
+            if event.get('type') in TERMINAL_EVENTS:
+                return
+
+        while True:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                yield {'type': 'timeout', 'task_id': task_id,
+                       'message': f"Stream closed after {max_seconds:.0f}s; reconnect to resume"}
+                return
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=min(keepalive, remaining))
+            if message is None:
+                yield None
+                continue
+
+            event = json.loads(message['data'])
+            yield event
+            if event.get('type') in TERMINAL_EVENTS:
+                return
+    finally:
+        await pubsub.unsubscribe(progress_channel(task_id))
+        await pubsub.aclose()
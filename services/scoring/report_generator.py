@@ -4,15 +4,26 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 import pandas as pd
-import os
+import hashlib
+import json
+from io import BytesIO
 from datetime import datetime
 
-def generate_pdf_report(symbol: str, backtest_data: dict, metrics: dict) -> str:
-    """Generate PDF backtest report"""
-    filename = f"backtest_{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    filepath = os.path.join("/tmp", filename)
-    
-    doc = SimpleDocTemplate(filepath, pagesize=letter)
+def report_hash(symbol: str, backtest_data: dict, metrics: dict) -> str:
+    """Hash of everything the PDF shows except its generation time"""
+    canonical = json.dumps({
+        'symbol': symbol,
+        'period_days': int(backtest_data['period_days']),
+        'start_date': str(backtest_data['dates'][0])[:10],
+        'end_date': str(backtest_data['dates'][-1])[:10],
+        'metrics': metrics
+    }, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def generate_pdf_report(symbol: str, backtest_data: dict, metrics: dict) -> bytes:
+    """Render the PDF backtest report in memory"""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
     styles = getSampleStyleSheet()
     story = []
     
@@ -60,8 +71,8 @@ def generate_pdf_report(symbol: str, backtest_data: dict, metrics: dict) -> str:
     details = [
         f"Symbol: {symbol}",
         f"Period: {backtest_data['period_days']} days",
-        f"Start Date: {backtest_data['dates'][0][:10]}",
-        f"End Date: {backtest_data['dates'][-1][:10]}",
+        f"Start Date: {str(backtest_data['dates'][0])[:10]}",
+        f"End Date: {str(backtest_data['dates'][-1])[:10]}",
         f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
     ]
     
@@ -69,13 +80,10 @@ def generate_pdf_report(symbol: str, backtest_data: dict, metrics: dict) -> str:
         story.append(Paragraph(detail, styles['Normal']))
     
     doc.build(story)
-    return filepath
+    return buffer.getvalue()
 
-def generate_csv_report(symbol: str, backtest_data: dict, metrics: dict) -> str:
-    """Generate CSV backtest report"""
-    filename = f"backtest_{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    filepath = os.path.join("/tmp", filename)
-    
+def generate_csv_report(symbol: str, backtest_data: dict, metrics: dict) -> bytes:
+    """Render the CSV backtest report in memory"""
     # Create DataFrame with backtest data
     df = pd.DataFrame({
         'Date': backtest_data['dates'],
@@ -84,18 +92,19 @@ def generate_csv_report(symbol: str, backtest_data: dict, metrics: dict) -> str:
         'Portfolio_Value': backtest_data['portfolio_values']
     })
     
-    # Add metrics as header comments
-    with open(filepath, 'w') as f:
-        f.write(f"# Backtest Report for {symbol}\n")
-        f.write(f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"# Total Return: {metrics['total_return']}%\n")
-        f.write(f"# Accuracy: {metrics['accuracy']}%\n")
-        f.write(f"# Sharpe Ratio: {metrics['sharpe_ratio']}\n")
-        f.write(f"# Max Drawdown: {metrics['max_drawdown']}%\n")
-        f.write(f"# Win Rate: {metrics['win_rate']}%\n")
-        f.write("#\n")
-    
-    # Append DataFrame
-    df.to_csv(filepath, mode='a', index=False)
+    # Metrics as header comments, then the data rows
+    buffer = BytesIO()
+    header = (
+        f"# Backtest Report for {symbol}\n"
+        f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        f"# Total Return: {metrics['total_return']}%\n"
+        f"# Accuracy: {metrics['accuracy']}%\n"
+        f"# Sharpe Ratio: {metrics['sharpe_ratio']}\n"
+        f"# Max Drawdown: {metrics['max_drawdown']}%\n"
+        f"# Win Rate: {metrics['win_rate']}%\n"
+        "#\n"
+    )
+    buffer.write(header.encode())
+    df.to_csv(buffer, index=False, encoding='utf-8')
     
-    return filepath
\ No newline at end of file
+    return buffer.getvalue()
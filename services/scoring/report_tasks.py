@@ -0,0 +1,87 @@
+"""
+Report rendering on its own Celery queue
+
+Backtest workers hand off the stored columnar artifact and metrics; the
+"reports" queue renders the CSV and PDF in memory and uploads them directly.
+A PDF is rendered once per report hash and reused from its stored URL.
+Failed downloads, renders and uploads are retried with backoff; once retries
+run out the backtest row and cached result are marked report_status "failed".
+"""
+
+from celery_app import celery_app
+from datetime import datetime
+import os
+
+from backtest_artifacts import decode_backtest
+from report_generator import generate_pdf_report, generate_csv_report, report_hash
+from result_cache import result_cache
+from storage import supabase, upload_bytes_to_storage, download_from_storage
+
+PDF_CACHE_TTL = int(os.getenv("REPORT_PDF_CACHE_TTL", str(7 * 24 * 3600)))
+REPORT_MAX_RETRIES = int(os.getenv("REPORT_MAX_RETRIES", "3"))
+
+@celery_app.task(bind=True, name="report_tasks.render_reports", acks_late=True,
+                 autoretry_for=(Exception,), max_retries=REPORT_MAX_RETRIES,
+                 retry_backoff=True, retry_backoff_max=300, retry_jitter=True)
+def render_reports(self, backtest_id, symbol: str, artifact_path: str, metrics: dict, stamp: str,
+                   request_hash: str = None, backtest_task_id: str = None):
+    """Render and upload the CSV and PDF reports for a stored backtest"""
+    try:
+        backtest_data = decode_backtest(download_from_storage(artifact_path))
+        
+        csv_url = upload_bytes_to_storage(
+            generate_csv_report(symbol, backtest_data, metrics),
+            f"backtests/{symbol}_{stamp}.csv",
+            "text/csv"
+        )
+        if not csv_url:
+            raise RuntimeError(f"Failed to upload CSV report for {symbol}")
+        pdf_url = cached_pdf_report(symbol, backtest_data, metrics)
+        if not pdf_url:
+            raise RuntimeError(f"Failed to upload PDF report for {symbol}")
+    except Exception as e:
+        attempt = self.request.retries + 1
+        print(f"Report rendering for backtest {backtest_id} failed (attempt {attempt}): {e}")
+        if self.request.retries >= self.max_retries:
+            record_reports(backtest_id, request_hash, backtest_task_id,
+                           {"report_status": "failed", "report_error": str(e)})
+        raise
+    
+    record_reports(backtest_id, request_hash, backtest_task_id,
+                   {"pdf_url": pdf_url, "csv_url": csv_url, "report_status": "completed", "report_error": None})
+    
+    return {'backtest_id': backtest_id, 'pdf_url': pdf_url, 'csv_url': csv_url,
+            'completed_at': datetime.now().isoformat()}
+
+def record_reports(backtest_id, request_hash: str, backtest_task_id: str, fields: dict):
+    """Write report URLs or failure state to the backtest row and the cached result"""
+    if backtest_id:
+        supabase.table("backtests").update(fields).eq("id", backtest_id).execute()
+    
+    if request_hash:
+        cached = result_cache.get(request_hash)
+        if cached:
+            cached["result"].update(fields)
+            result_cache.set(request_hash, backtest_task_id or cached["task_id"], cached["result"])
+
+def cached_pdf_report(symbol: str, backtest_data: dict, metrics: dict) -> str:
+    """URL of the PDF for these metrics, rendering and uploading it only on a miss"""
+    key = report_hash(symbol, backtest_data, metrics)
+    client = result_cache.client
+    
+    if client is not None:
+        try:
+            url = client.get(f"report:pdf:{key}")
+            if url:
+                return url.decode() if isinstance(url, bytes) else url
+        except Exception as e:
+            print(f"PDF cache read failed: {e}")
+    
+    url = upload_bytes_to_storage(generate_pdf_report(symbol, backtest_data, metrics),
+                                  f"reports/{symbol}_{key[:16]}.pdf", "application/pdf")
+    if url and client is not None:
+        try:
+            client.setex(f"report:pdf:{key}", PDF_CACHE_TTL, url)
+        except Exception as e:
+            print(f"PDF cache write failed: {e}")
+    return url
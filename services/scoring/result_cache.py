@@ -0,0 +1,109 @@
+"""
+Content-addressed backtest result cache with in-flight coalescing
+
+A backtest request hashes to a key over its inputs and the current market data
+version. Completed results are kept in Redis under that key for
+RESULT_CACHE_TTL seconds, and concurrent identical requests share one Celery
+task through a SET NX claim. The data version is the last closed bar for the
+timeframe plus a per-symbol counter, so a new bar or a data correction moves
+requests onto a fresh key and old entries simply expire.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+try:
+    import redis
+except ImportError:  # Without Redis every request runs its own backtest
+    redis = None
+
+RESULT_CACHE_TTL = int(os.getenv("BACKTEST_RESULT_CACHE_TTL", str(6 * 3600)))
+INFLIGHT_TTL = int(os.getenv("BACKTEST_INFLIGHT_TTL", "900"))
+
+def market_data_version(client, symbol: str, bar_seconds: int, now: Optional[float] = None) -> str:
+    """Last closed bar bucket plus the symbol's correction counter"""
+    now = time.time() if now is None else now
+    counter = 0
+    if client is not None:
+        try:
+            counter = int(client.get(f"market:version:{symbol.upper()}") or 0)
+        except Exception as e:
+            print(f"Market data version read failed: {e}")
+    return f"{int(now // bar_seconds)}:{counter}"
+
+def request_hash(symbol: str, timeframe: str, period_days: int, data_version: str) -> str:
+    """Stable hash of everything a backtest's result depends on"""
+    canonical = json.dumps({
+        "symbol": symbol.upper(),
+        "timeframe": timeframe,
+        "period_days": period_days,
+        "data_version": data_version
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, redis_url: Optional[str] = None, client=None, ttl: int = RESULT_CACHE_TTL):
+        self.ttl = ttl
+        self.client = client
+        if self.client is None and redis is not None and redis_url:
+            self.client = redis.Redis.from_url(redis_url)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached {'task_id', 'result'} for a finished backtest"""
+        if self.client is None:
+            return None
+        try:
+            payload = self.client.get(f"backtest:result:{key}")
+            return json.loads(payload) if payload is not None else None
+        except Exception as e:
+            print(f"Backtest result cache read failed: {e}")
+            return None
+
+    def set(self, key: str, task_id: str, result: Dict[str, Any]):
+        if self.client is None:
+            return
+        try:
+            self.client.setex(f"backtest:result:{key}", self.ttl, json.dumps({"task_id": task_id, "result": result}))
+        except Exception as e:
+            print(f"Backtest result cache write failed: {e}")
+
+    def claim(self, key: str, task_id: str) -> Optional[str]:
+        """Register task_id as the run for key; returns the task already running it, if any"""
+        if self.client is None:
+            return None
+        try:
+            if self.client.set(f"backtest:inflight:{key}", task_id, nx=True, ex=INFLIGHT_TTL):
+                return None
+            running = self.client.get(f"backtest:inflight:{key}")
+            return running.decode() if isinstance(running, bytes) else running
+        except Exception as e:
+            print(f"Backtest in-flight claim failed: {e}")
+            return None
+
+    def release(self, key: str):
+        if self.client is None:
+            return
+        try:
+            self.client.delete(f"backtest:inflight:{key}")
+        except Exception as e:
+            print(f"Backtest in-flight release failed: {e}")
+
+    def bump_market_data(self, symbol: str) -> Optional[int]:
+        """Invalidate cached results for a symbol after corrected or backfilled data lands"""
+        if self.client is None:
+            return None
+        try:
+            return int(self.client.incr(f"market:version:{symbol.upper()}"))
+        except Exception as e:
+            print(f"Market data version bump failed: {e}")
+            return None
+
+    def data_version(self, symbol: str, bar_seconds: int) -> str:
+        return market_data_version(self.client, symbol, bar_seconds)
+
+
+result_cache = ResultCache(redis_url=os.getenv("REDIS_URL", "redis://localhost:6379/0"))
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 class ScoreRequest(BaseModel):
@@ -17,6 +17,15 @@ class ScoreResponse(BaseModel):
     metadata: Dict[str, Any]
     timestamp: datetime
 
+class BatchScoreRequest(BaseModel):
+    symbols: List[str]
+    timeframe: str = "1d"
+
+class BatchScoreResponse(BaseModel):
+    results: List[ScoreResponse]
+    count: int
+    elapsed_ms: float
+
 class SignalCreate(BaseModel):
     symbol: str
     company_name: str
@@ -0,0 +1,173 @@
+"""
+Write-behind buffer for signal rows - /score enqueues, a background task bulk-inserts
+
+Rows are flushed when SIGNAL_BATCH_SIZE are waiting or SIGNAL_FLUSH_SECONDS have
+passed. The queue is bounded and enqueue never waits: while a stalled database
+keeps it full, new rows go straight to the spill file, so neither memory nor
+/score latency grows with the outage. A batch that still fails after
+SIGNAL_MAX_RETRIES is appended to the same JSONL spill file, which is replayed
+on the next start. Replay first claims the file by renaming it, so a crash
+mid-replay leaves a claimed file the next start picks up, and a truncated or
+corrupt line is counted as dropped instead of stopping startup.
+"""
+
+import asyncio
+import glob
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+SIGNAL_BATCH_SIZE = int(os.getenv("SIGNAL_BATCH_SIZE", "200"))
+SIGNAL_FLUSH_SECONDS = float(os.getenv("SIGNAL_FLUSH_SECONDS", "1.0"))
+SIGNAL_MAX_QUEUE = int(os.getenv("SIGNAL_MAX_QUEUE", "10000"))
+SIGNAL_MAX_RETRIES = int(os.getenv("SIGNAL_MAX_RETRIES", "3"))
+SIGNAL_SPILL_PATH = os.getenv("SIGNAL_SPILL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "signals_spill.jsonl"))
+
+PENDING_SIGNALS = Gauge('scoring_signal_writer_pending', 'Signal rows waiting to be inserted')
+SIGNALS_WRITTEN = Counter('scoring_signal_writer_rows', 'Signal rows handled by the writer', ['outcome'])
+
+Insert = Callable[[List[Dict[str, Any]]], Any]
+
+
+class SignalWriter:
+    def __init__(self, insert: Insert, batch_size: int = SIGNAL_BATCH_SIZE,
+                 flush_seconds: float = SIGNAL_FLUSH_SECONDS, max_queue: int = SIGNAL_MAX_QUEUE,
+                 max_retries: int = SIGNAL_MAX_RETRIES, spill_path: str = SIGNAL_SPILL_PATH,
+                 retry_delay: float = 0.5):
+        self.insert = insert
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.spill_path = spill_path
+        self.retry_delay = retry_delay
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._file_lock = threading.Lock()  # Spill appends run in threads
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+        await self._replay_spill()
+
+    async def stop(self):
+        """Flush everything queued, then stop the background task"""
+        if self._task is None:
+            return
+        await self._queue.put(None)  # Sentinel: drain and exit
+        await self._task
+        self._task = None
+
+    async def enqueue(self, row: Dict[str, Any]):
+        """Queue one row without waiting; spills it when the buffer is full"""
+        if self._task is None:
+            # Not started (e.g. scripts and tests): write through
+            await self._write([row])
+            return
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            await self._spill([row])
+            return
+        PENDING_SIGNALS.set(self._queue.qsize())
+
+    async def enqueue_many(self, rows: List[Dict[str, Any]]):
+        for row in rows:
+            await self.enqueue(row)
+
+    async def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            stopping = timed_out = False
+            try:
+                row = await asyncio.wait_for(self._queue.get(), timeout)
+                stopping = row is None
+                if not stopping:
+                    batch.append(row)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_seconds
+            except asyncio.TimeoutError:
+                timed_out = True
+
+            if batch and (stopping or timed_out or len(batch) >= self.batch_size):
+                PENDING_SIGNALS.set(self._queue.qsize())
+                await self._write(batch)
+                batch, deadline = [], None
+
+            if stopping:
+                return
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries):
+            try:
+                await loop.run_in_executor(None, self.insert, batch)
+                SIGNALS_WRITTEN.labels(outcome="inserted").inc(len(batch))
+                return
+            except Exception as e:
+                print(f"Signal insert failed (attempt {attempt + 1}/{self.max_retries}): {e}")
+                if attempt + 1 < self.max_retries:
+                    await asyncio.sleep(self.retry_delay * 2 ** attempt)
+
+        await self._spill(batch)
+
+    async def _spill(self, batch: List[Dict[str, Any]]):
+        await asyncio.to_thread(self._append_spill, batch)
+
+    def _append_spill(self, batch: List[Dict[str, Any]]):
+        try:
+            payload = "".join(json.dumps(row, default=str) + "\n" for row in batch)
+            with self._file_lock:
+                os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+                with open(self.spill_path, "a") as f:
+                    f.write(payload)
+            SIGNALS_WRITTEN.labels(outcome="spilled").inc(len(batch))
+        except Exception as e:
+            print(f"Signal spill failed, dropping {len(batch)} rows: {e}")
+            SIGNALS_WRITTEN.labels(outcome="dropped").inc(len(batch))
+
+    async def _replay_spill(self):
+        """Re-queue rows spilled by an earlier run, including claims a crashed replay left behind"""
+        rows, dropped = await asyncio.to_thread(self._claim_spill)
+        if dropped:
+            print(f"Dropped {dropped} unreadable spilled signal rows")
+            SIGNALS_WRITTEN.labels(outcome="dropped").inc(dropped)
+        if not rows:
+            return
+
+        print(f"Replaying {len(rows)} spilled signal rows")
+        await self.enqueue_many(rows)
+
+    def _claim_spill(self) -> Tuple[List[Dict[str, Any]], int]:
+        """Read and delete the spill file and any leftover claims; returns (rows, unreadable lines)"""
+        claim_path = f"{self.spill_path}.replay.{os.getpid()}"
+        # Claims from earlier runs first ("<spill>.replay" and "<spill>.replay.<pid>"), then the live file
+        sources = sorted(glob.glob(glob.escape(f"{self.spill_path}.replay") + "*")) + [self.spill_path]
+
+        rows: List[Dict[str, Any]] = []
+        dropped = 0
+        with self._file_lock:
+            for source in sources:
+                try:
+                    os.replace(source, claim_path)
+                except FileNotFoundError:
+                    continue  # Gone, or claimed by another worker first
+                with open(claim_path) as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            rows.append(json.loads(line))
+                        except ValueError:
+                            dropped += 1  # e.g. the last line of a spill cut short by a crash
+                os.remove(claim_path)
+        return rows, dropped
@@ -27,6 +27,8 @@ def start_celery_worker():
         subprocess.Popen([
             sys.executable, "-m", "celery", 
             "-A", "celery_app", "worker", 
+            "-Q", "celery,reports",
+            "-B",  # Embedded beat for the daily coach precompute
             "--loglevel=info"
         ])
         print("✓ Celery worker started")
@@ -0,0 +1,27 @@
+"""
+Supabase client and storage helpers shared by the backtest and report workers
+"""
+
+from supabase import create_client
+import os
+
+# Supabase client
+supabase_url = os.getenv("SUPABASE_URL")
+supabase_key = os.getenv("SUPABASE_ANON_KEY")
+supabase = create_client(supabase_url, supabase_key)
+
+def public_url(storage_path: str) -> str:
+    return supabase.storage.from_("reports").get_public_url(storage_path)
+
+def upload_bytes_to_storage(payload: bytes, storage_path: str, content_type: str = "application/octet-stream") -> str:
+    """Upload an in-memory payload to Supabase Storage"""
+    try:
+        supabase.storage.from_("reports").upload(storage_path, payload, {"content-type": content_type, "upsert": "true"})
+        return public_url(storage_path)
+    except Exception as e:
+        print(f"Upload failed: {e}")
+        return ""
+
+def download_from_storage(storage_path: str) -> bytes:
+    """Download a stored payload into memory"""
+    return supabase.storage.from_("reports").download(storage_path)
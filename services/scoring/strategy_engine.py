@@ -3,12 +3,16 @@ from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import pandas as pd
 import numpy as np
+import json
 from datetime import datetime, timedelta
-import yfinance as yf
+from indicator_cache import indicator_cache, frame_fingerprint
+from ohlcv_store import ohlcv_store, FetchError, NoDataError
+from trade_kernel import trade_ledger, trade_statistics
 
 router = APIRouter()
 
 class StrategyCondition(BaseModel):
+    id: Optional[str] = None
     indicator: str
     operator: str
     value: float
@@ -28,6 +32,8 @@ class BacktestRequest(BaseModel):
     symbol: str = "AAPL"
     start_date: str = "2023-01-01"
     end_date: str = "2024-01-01"
+    commission: float = 0.0  # Fraction of price per side
+    slippage: float = 0.0  # Fraction of price per side
 
 class BacktestResult(BaseModel):
     total_return: float
@@ -40,7 +46,9 @@ class BacktestResult(BaseModel):
     end_date: str
 
 class StrategyEngine:
-    def __init__(self):
+    def __init__(self, cache=indicator_cache, store=ohlcv_store):
+        self.indicator_cache = cache
+        self.data_store = store
         self.indicators = {
             'sma': self.calculate_sma,
             'ema': self.calculate_ema,
@@ -95,11 +103,19 @@ class StrategyEngine:
     def get_price(self, data: pd.DataFrame) -> pd.Series:
         return data['Close']
 
-    def cross_above(self, current: float, previous: float, threshold: float) -> bool:
-        return current > threshold and previous <= threshold
+    # Written with `&` so the same operator works on scalars and NumPy arrays
+    def cross_above(self, current, previous, threshold):
+        return (current > threshold) & (previous <= threshold)
 
-    def cross_below(self, current: float, previous: float, threshold: float) -> bool:
-        return current < threshold and previous >= threshold
+    def cross_below(self, current, previous, threshold):
+        return (current < threshold) & (previous >= threshold)
+
+    def _primary_series(self, indicator_values):
+        """Pick the series used for comparisons from multi-series indicators"""
+        if isinstance(indicator_values, dict):
+            # For indicators like MACD, BB that return multiple series
+            return indicator_values.get('macd', indicator_values.get('middle', list(indicator_values.values())[0]))
+        return indicator_values
 
     def evaluate_condition(self, condition: StrategyCondition, data: pd.DataFrame, index: int) -> bool:
         if index < 1:  # Need at least 2 data points for cross operations
@@ -110,11 +126,7 @@ class StrategyEngine:
             return False
 
         try:
-            indicator_values = indicator_func(data, **condition.parameters)
-            
-            if isinstance(indicator_values, dict):
-                # For indicators like MACD, BB that return multiple series
-                indicator_values = indicator_values.get('macd', indicator_values.get('middle', list(indicator_values.values())[0]))
+            indicator_values = self._primary_series(indicator_func(data, **condition.parameters))
 
             current_value = indicator_values.iloc[index]
             
@@ -137,7 +149,115 @@ class StrategyEngine:
             print(f"Error evaluating condition: {e}")
             return False
 
-    def evaluate_strategy(self, strategy: Strategy, data: pd.DataFrame) -> pd.Series:
+    def series_key(self, condition: StrategyCondition) -> str:
+        """Memo key identifying an indicator series by name and parameters"""
+        return f"{condition.indicator}:{json.dumps(condition.parameters, sort_keys=True, default=str)}"
+
+    def indicator_series(self, condition: StrategyCondition, data: pd.DataFrame, memo: Optional[Dict[str, Any]] = None,
+                         cache_scope: Optional[tuple] = None) -> np.ndarray:
+        """Compute the comparison series for a condition once for the whole frame
+
+        cache_scope is (symbol, data fingerprint); when given, series are shared
+        across requests through the indicator cache.
+        """
+        indicator_func = self.indicators[condition.indicator]
+        key = self.series_key(condition)
+
+        if memo is not None and key in memo:
+            return memo[key]
+
+        def compute():
+            return np.asarray(self._primary_series(indicator_func(data, **condition.parameters)), dtype=float)
+
+        if cache_scope is not None and self.indicator_cache is not None:
+            symbol, fingerprint = cache_scope
+            cache_key = self.indicator_cache.make_key(symbol, condition.indicator, condition.parameters, fingerprint)
+            values = self.indicator_cache.get_or_compute(cache_key, compute)
+        else:
+            values = compute()
+
+        if memo is not None:
+            memo[key] = values
+        return values
+
+    def evaluate_condition_vectorized(self, condition: StrategyCondition, data: pd.DataFrame, memo: Optional[Dict[str, Any]] = None,
+                                      cache_scope: Optional[tuple] = None) -> np.ndarray:
+        """Evaluate a condition on every bar at once, returning a boolean array
+
+        For a single-symbol frame the mask has shape (bars,); for a panel with
+        (field, symbol) columns it has shape (bars, symbols).
+        """
+        mask = np.zeros(self._signal_shape(data), dtype=bool)
+
+        operator_func = self.operators.get(condition.operator)
+        if condition.indicator not in self.indicators or not operator_func:
+            return mask
+
+        try:
+            current = self.indicator_series(condition, data, memo, cache_scope)
+            valid = ~np.isnan(current)
+
+            with np.errstate(invalid='ignore'):
+                if condition.operator in ['cross_above', 'cross_below']:
+                    previous = np.empty_like(current)
+                    previous[0] = np.nan
+                    previous[1:] = current[:-1]
+                    valid &= ~np.isnan(previous)
+                    result = operator_func(current, previous, condition.value)
+                else:
+                    result = operator_func(current, condition.value)
+
+            mask = valid & np.asarray(result, dtype=bool)
+            mask[:1] = False  # Need at least 2 data points for cross operations
+            return mask
+
+        except Exception as e:
+            print(f"Error evaluating condition: {e}")
+            return np.zeros(self._signal_shape(data), dtype=bool)
+
+    def _signal_shape(self, data: pd.DataFrame) -> tuple:
+        return np.shape(data['Close'])
+
+    def evaluate_strategy(self, strategy: Strategy, data: pd.DataFrame, vectorized: bool = True,
+                          symbol: Optional[str] = None, memo: Optional[Dict[str, Any]] = None):
+        """Boolean entry signals: a Series for one symbol, a DataFrame for a (field, symbol) panel"""
+        if not vectorized:
+            return self._evaluate_strategy_loop(strategy, data)
+
+        cache_scope = (symbol, frame_fingerprint(data)) if symbol else None
+
+        conditions_by_id = {}
+        for condition in strategy.conditions:
+            conditions_by_id.setdefault(condition.id, condition)
+
+        memo = {} if memo is None else memo
+        masks: Dict[Any, np.ndarray] = {}
+        signals = np.zeros(self._signal_shape(data), dtype=bool)
+
+        for group in strategy.logic.groups:
+            condition_results = []
+
+            for condition_id in group['conditions']:
+                condition = conditions_by_id.get(condition_id)
+                if condition:
+                    if condition_id not in masks:
+                        masks[condition_id] = self.evaluate_condition_vectorized(condition, data, memo, cache_scope)
+                    condition_results.append(masks[condition_id])
+
+            if condition_results:
+                if group['operator'] == 'AND':
+                    group_result = np.logical_and.reduce(condition_results)
+                else:  # OR
+                    group_result = np.logical_or.reduce(condition_results)
+                signals |= group_result  # OR between groups
+
+        signals[:1] = False
+        if signals.ndim == 2:
+            return pd.DataFrame(signals, index=data.index, columns=data['Close'].columns)
+        return pd.Series(signals, index=data.index)
+
+    def _evaluate_strategy_loop(self, strategy: Strategy, data: pd.DataFrame) -> pd.Series:
+        """Reference bar-by-bar evaluation, kept for parity checks"""
         signals = pd.Series(False, index=data.index)
         
         for i in range(1, len(data)):
@@ -165,107 +285,75 @@ class StrategyEngine:
         
         return signals
 
-    def backtest_strategy(self, strategy: Strategy, symbol: str, start_date: str, end_date: str) -> BacktestResult:
-        try:
-            # Fetch data
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(start=start_date, end=end_date)
-            
-            if data.empty:
-                raise ValueError(f"No data available for {symbol}")
+    def backtest_strategy(self, strategy: Strategy, symbol: str, start_date: str, end_date: str,
+                          commission: float = 0.0, slippage: float = 0.0) -> BacktestResult:
+        """Backtest on stored data; ValueError for a bad symbol or date, FetchError or NoDataError without bars"""
+        # Read from the local store; only missing ranges hit the fetcher
+        data = self.data_store.load(symbol, start_date, end_date)
 
-            # Generate signals
-            signals = self.evaluate_strategy(strategy, data)
-            
-            # Calculate returns
-            returns = self.calculate_returns(data, signals)
-            
-            # Calculate metrics
-            total_return = (returns['portfolio_value'].iloc[-1] / returns['portfolio_value'].iloc[0] - 1) * 100
-            
-            daily_returns = returns['daily_return'].dropna()
-            sharpe_ratio = (daily_returns.mean() / daily_returns.std()) * np.sqrt(252) if daily_returns.std() > 0 else 0
-            
-            # Calculate drawdown
-            peak = returns['portfolio_value'].expanding().max()
-            drawdown = (returns['portfolio_value'] - peak) / peak * 100
-            max_drawdown = drawdown.min()
-            
-            # Trade statistics
-            trades = self.analyze_trades(signals, data)
-            win_rate = trades['win_rate'] if trades['total_trades'] > 0 else 0
-            profit_factor = trades['profit_factor'] if trades['total_trades'] > 0 else 0
-            
-            return BacktestResult(
-                total_return=round(total_return, 2),
-                sharpe_ratio=round(sharpe_ratio, 2),
-                max_drawdown=round(max_drawdown, 2),
-                win_rate=round(win_rate, 2),
-                total_trades=trades['total_trades'],
-                profit_factor=round(profit_factor, 2),
-                start_date=start_date,
-                end_date=end_date
-            )
-            
-        except Exception as e:
-            print(f"Backtest error: {e}")
-            # Return mock results for demo
-            return BacktestResult(
-                total_return=round(np.random.uniform(-5, 20), 2),
-                sharpe_ratio=round(np.random.uniform(0, 2), 2),
-                max_drawdown=round(np.random.uniform(-15, -2), 2),
-                win_rate=round(np.random.uniform(0.4, 0.7), 2),
-                total_trades=np.random.randint(10, 100),
-                profit_factor=round(np.random.uniform(0.8, 2.5), 2),
-                start_date=start_date,
-                end_date=end_date
-            )
-
-    def calculate_returns(self, data: pd.DataFrame, signals: pd.Series) -> pd.DataFrame:
-        returns = pd.DataFrame(index=data.index)
-        returns['price'] = data['Close']
-        returns['signal'] = signals
-        returns['position'] = signals.shift(1).fillna(False)  # Enter position next day
-        
-        # Calculate daily returns
-        returns['price_return'] = returns['price'].pct_change()
-        returns['strategy_return'] = returns['price_return'] * returns['position']
-        
-        # Calculate cumulative returns
-        returns['portfolio_value'] = (1 + returns['strategy_return']).cumprod() * 10000  # Start with $10,000
-        returns['daily_return'] = returns['strategy_return']
-        
-        return returns
+        if data.empty:
+            raise NoDataError(f"No data available for {symbol}")
 
-    def analyze_trades(self, signals: pd.Series, data: pd.DataFrame) -> Dict[str, float]:
-        positions = signals.shift(1).fillna(False)
-        entries = positions & ~positions.shift(1).fillna(False)
-        exits = ~positions & positions.shift(1).fillna(False)
-        
-        entry_prices = data['Close'][entries].values
-        exit_prices = data['Close'][exits].values
+        return self.backtest_on_data(strategy, data, start_date, end_date, symbol=symbol,
+                                     commission=commission, slippage=slippage)
+
+    def backtest_on_data(self, strategy: Strategy, data: pd.DataFrame, start_date: str, end_date: str,
+                         symbol: Optional[str] = None, memo: Optional[Dict[str, Any]] = None,
+                         commission: float = 0.0, slippage: float = 0.0) -> BacktestResult:
+        """Backtest on an already loaded OHLCV frame"""
+        # Generate signals
+        signals = self.evaluate_strategy(strategy, data, symbol=symbol, memo=memo)
         
-        # Match entries with exits
-        min_trades = min(len(entry_prices), len(exit_prices))
-        if min_trades == 0:
-            return {'total_trades': 0, 'win_rate': 0, 'profit_factor': 0}
+        # Calculate returns
+        returns = self.calculate_returns(data, signals, commission, slippage)
+        portfolio_value = returns['portfolio_value'].to_numpy()
+        daily_returns = returns['daily_return'].to_numpy()
         
-        trade_returns = (exit_prices[:min_trades] - entry_prices[:min_trades]) / entry_prices[:min_trades]
+        # Calculate metrics
+        total_return = (portfolio_value[-1] / portfolio_value[0] - 1) * 100
         
-        winning_trades = trade_returns[trade_returns > 0]
-        losing_trades = trade_returns[trade_returns < 0]
+        std = daily_returns.std(ddof=1) if len(daily_returns) > 1 else 0
+        sharpe_ratio = (daily_returns.mean() / std) * np.sqrt(252) if std > 0 else 0
         
-        win_rate = len(winning_trades) / len(trade_returns) if len(trade_returns) > 0 else 0
+        # Calculate drawdown
+        peak = np.maximum.accumulate(portfolio_value)
+        max_drawdown = ((portfolio_value - peak) / peak * 100).min()
         
-        gross_profit = winning_trades.sum() if len(winning_trades) > 0 else 0
-        gross_loss = abs(losing_trades.sum()) if len(losing_trades) > 0 else 0
-        profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf')
+        # Trade statistics
+        trades = self.analyze_trades(signals, data, commission, slippage)
         
-        return {
-            'total_trades': len(trade_returns),
-            'win_rate': win_rate,
-            'profit_factor': profit_factor
-        }
+        return BacktestResult(
+            total_return=round(total_return, 2),
+            sharpe_ratio=round(sharpe_ratio, 2),
+            max_drawdown=round(max_drawdown, 2),
+            win_rate=round(trades['win_rate'], 2),
+            total_trades=trades['total_trades'],
+            profit_factor=round(trades['profit_factor'], 2),
+            start_date=start_date,
+            end_date=end_date
+        )
+
+    def calculate_returns(self, data: pd.DataFrame, signals: pd.Series, commission: float = 0.0, slippage: float = 0.0) -> pd.DataFrame:
+        close = data['Close'].to_numpy(dtype=float)
+        holdings = signals.to_numpy(dtype=bool)
+
+        price_return = np.zeros_like(close)
+        price_return[1:] = close[1:] / close[:-1] - 1
+
+        position = np.zeros_like(close)
+        position[1:] = holdings[:-1]  # Enter position next day
+        strategy_return = price_return * position
+
+        # Costs are charged on the bar where the position changes
+        turnover = np.abs(np.diff(holdings.astype(float), prepend=0.0))
+        strategy_return -= turnover * (commission + slippage)
+
+        portfolio_value = np.cumprod(1 + strategy_return) * 10000  # Start with $10,000
+        return pd.DataFrame({'portfolio_value': portfolio_value, 'daily_return': strategy_return}, index=data.index)
+
+    def analyze_trades(self, signals: pd.Series, data: pd.DataFrame, commission: float = 0.0, slippage: float = 0.0) -> Dict[str, float]:
+        trades = trade_ledger(signals.to_numpy(dtype=bool), data['Close'].to_numpy(dtype=float), commission, slippage)
+        return trade_statistics(trades)
 
 strategy_engine = StrategyEngine()
 
@@ -277,12 +365,25 @@ async def backtest_strategy(request: BacktestRequest):
             request.strategy,
             request.symbol,
             request.start_date,
-            request.end_date
+            request.end_date,
+            request.commission,
+            request.slippage
         )
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except NoDataError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except FetchError as e:
+        raise HTTPException(status_code=502, detail=f"Failed to load data for {request.symbol}: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Backtest failed: {str(e)}")
 
+@router.get("/indicator-cache/stats")
+async def get_indicator_cache_stats():
+    """Indicator cache hit/miss counters for sizing"""
+    return strategy_engine.indicator_cache.stats()
+
 @router.post("/validate")
 async def validate_strategy(strategy: Strategy):
     """Validate strategy conditions"""
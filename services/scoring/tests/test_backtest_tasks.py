@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("celery")
+pytest.importorskip("supabase")
+
+# storage builds its Supabase client at import; nothing is called on it here
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backtest import router
+from backtest_artifacts import encode_backtest, decode_backtest, summarize_backtest, COLUMNS
+from backtest_tasks import generate_mock_backtest, calculate_max_drawdown, calculate_metrics, bars_per_day
+
+app = FastAPI()
+app.include_router(router, prefix="/api")
+client = TestClient(app)
+
+
+class TestBacktestTasks:
+    def test_artifact_round_trip(self):
+        data = generate_mock_backtest("AAPL", 5, "1h")
+        decoded = decode_backtest(encode_backtest(data))
+
+        for name in COLUMNS:
+            np.testing.assert_array_equal(decoded[name], np.asarray(data[name]))
+        assert decoded["dates"].dtype == np.dtype("datetime64[ns]")
+        assert (decoded["period_days"], decoded["timeframe"]) == (5, "1h")
+
+        summary = summarize_backtest(data, "https://storage.test/a.npz")
+        assert summary["bars"] == len(data["dates"]) and summary["timeframe"] == "1h"
+
+    def test_max_drawdown_on_known_curve(self):
+        # Peak 120 falls to 90 (-25%) before the later, shallower dip from 150 to 135 (-10%)
+        assert calculate_max_drawdown([100, 120, 90, 110, 150, 135]) == pytest.approx(25.0)
+        assert calculate_max_drawdown([100, 101, 102]) == 0.0
+
+    @pytest.mark.parametrize("timeframe, per_day", [("1d", 1), ("4h", 1), ("1h", 6), ("15m", 26), ("1m", 390)])
+    def test_bar_counts_per_timeframe(self, timeframe, per_day):
+        assert bars_per_day(timeframe) == per_day
+        data = generate_mock_backtest("AAPL", 3, timeframe)
+        assert len(data["dates"]) == len(data["prices"]) == len(data["portfolio_values"]) == 3 * per_day
+
+    def test_portfolio_is_fully_invested_after_buy_until_sell(self):
+        data = generate_mock_backtest("AAPL", 120, "1d")
+        prices, values, signals = data["prices"], data["portfolio_values"], data["signals"]
+
+        invested = signals[0] == "BUY"  # Position held after each bar's close
+        for i in range(1, len(prices)):
+            expected = prices[i] / prices[i - 1] if invested else 1.0
+            assert values[i] / values[i - 1] == pytest.approx(expected)
+            if signals[i] != "HOLD":
+                invested = signals[i] == "BUY"
+
+        assert values[0] == 10000.0
+        assert calculate_metrics(data)["total_trades"] == int(np.count_nonzero(signals != "HOLD"))
+
+    def test_rejects_unknown_timeframe(self):
+        response = client.post("/api/backtest", json={"symbol": "AAPL", "timeframe": "2w", "period_days": 30})
+        assert response.status_code == 400
+        assert "Unsupported timeframe" in response.json()["detail"]
+
+    def test_failed_enqueue_releases_the_claim(self, monkeypatch):
+        import backtest
+        calls = []
+
+        class FakeCache:
+            def data_version(self, symbol, bar_seconds):
+                return 1
+
+            def get(self, key):
+                return None
+
+            def claim(self, key, task_id):
+                return None
+
+            def release(self, key):
+                calls.append("release")
+
+        class FakePublisher:
+            def __init__(self, task_id):
+                pass
+
+            def stage(self, status):
+                calls.append(status)
+
+            def error(self, message):
+                calls.append("error")
+
+        def fail(*args, **kwargs):
+            calls.append("enqueue")
+            raise ConnectionError("broker down")
+
+        monkeypatch.setattr(backtest, "result_cache", FakeCache())
+        monkeypatch.setattr(backtest, "ProgressPublisher", FakePublisher)
+        monkeypatch.setattr(backtest, "find_backtest_record", lambda key: None)
+        monkeypatch.setattr(backtest.run_backtest, "apply_async", fail)
+
+        response = client.post("/api/backtest", json={"symbol": "AAPL", "timeframe": "1d", "period_days": 30})
+        assert response.status_code == 500
+        assert calls == ["Queued", "enqueue", "release", "error"]  # Queued lands before the worker can start
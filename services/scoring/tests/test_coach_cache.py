@@ -0,0 +1,199 @@
+import json
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coach_cache
+from coach_cache import CoachCache, bucket_key, filter_signals, matches_bucket, parse_bucket
+
+
+class FakeRedis:
+    """The subset of redis-py the coach cache uses"""
+
+    def __init__(self):
+        self.values = {}
+        self.zsets = {}
+        self.sets = {}
+        self.ttls = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = str(value).encode()
+        self.ttls[key] = ex
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def incrby(self, key, amount):
+        self.values[key] = str(int(self.values.get(key, 0)) + amount).encode()
+
+    def delete(self, key):
+        self.values.pop(key, None)
+        self.zsets.pop(key, None)
+
+    def expire(self, key, ttl):
+        self.ttls[key] = ttl
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member.encode())
+
+    def smembers(self, key):
+        return self.sets.get(key, set())
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zrangebyscore(self, key, low, high):
+        low, high = float(low), float(high)
+        return [member.encode() for member, score in self._ranked(key) if low <= score <= high]
+
+    def zremrangebyscore(self, key, low, high):
+        low, high = float(low), float(high)
+        for member, score in self._ranked(key):
+            if low <= score <= high:
+                del self.zsets[key][member]
+
+    def _ranked(self, key):
+        return sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+
+    def zrevrange(self, key, start, end):
+        ranked = [member.encode() for member, _ in reversed(self._ranked(key))]
+        return ranked[start:end + 1]
+
+    def zremrangebyrank(self, key, start, end):
+        ranked = self._ranked(key)
+        end = len(ranked) + end if end < 0 else end
+        for member, _ in ranked[start:end + 1]:
+            del self.zsets[key][member]
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+def signal(symbol, confidence, risk_level="low", sector="Technology"):
+    return {"symbol": symbol, "confidence": confidence, "risk_level": risk_level, "sector": sector}
+
+
+class TestCoachCache:
+    def test_bucket_key_normalizes_sectors(self):
+        assert bucket_key("moderate", ["Technology", "Energy", "Energy"], "low") == \
+            bucket_key("moderate", [" Energy", "Technology"], "low") == "moderate|Energy,Technology|low"
+        assert bucket_key("aggressive", None, "high") == "aggressive||high"
+        assert bucket_key("moderate", ["real estate", "ENERGY"], "low") == "moderate|Energy,Real Estate|low"
+
+    def test_bucket_key_rejects_unknown_fields(self):
+        for args in [("reckless", [], "low"), ("moderate", [], "hourly"),
+                     ("moderate", ["Crypto"], "low"), ("moderate", ["Energy|x"], "low"),
+                     ("moderate|Energy|low", [], "low")]:
+            with pytest.raises(ValueError):
+                bucket_key(*args)
+
+        with pytest.raises(ValueError):
+            parse_bucket("moderate|Energy|low|extra")
+
+    def test_bucket_filtering_matches_tolerance_and_sectors(self):
+        signals = [
+            signal("AAPL", 0.9, "low", "Technology"),
+            signal("XOM", 0.8, "medium", "Energy"),
+            signal("TSLA", 0.95, "high", "Technology"),
+            signal("MSFT", 0.7, "medium", "Technology"),
+        ]
+        assert [s["symbol"] for s in filter_signals(signals, "conservative||low")] == ["AAPL"]
+        assert [s["symbol"] for s in filter_signals(signals, "moderate|Technology|medium")] == ["AAPL", "MSFT"]
+        assert [s["symbol"] for s in filter_signals(signals, "aggressive||high")] == ["TSLA", "AAPL", "XOM", "MSFT"]
+        assert not matches_bucket(dict(signal("AAPL", 0.9), is_active=False), "aggressive||high")
+
+    def test_summary_round_trip(self):
+        cache = CoachCache(client=FakeRedis())
+        bucket = "moderate||medium"
+        assert cache.get_summary(bucket) is None
+
+        cache.set_total(12)
+        cache.set_summary(bucket, [signal("AAPL", 0.7), signal("MSFT", 0.9)], "Two good setups today.")
+
+        summary = cache.get_summary(bucket)
+        assert [s["symbol"] for s in summary["signals"]] == ["MSFT", "AAPL"]
+        assert summary["coach_message"] == "Two good setups today."
+        assert summary["total_signals_count"] == 12
+        assert cache.buckets() == [bucket]
+
+    def test_new_signals_merge_into_matching_buckets(self):
+        cache = CoachCache(client=FakeRedis(), limit=3)
+        cache.set_total(3)
+        cache.set_summary("conservative||low", [signal("AAPL", 0.6), signal("MSFT", 0.7), signal("KO", 0.8)], "msg")
+        cache.set_summary("aggressive|Energy|high", [], "msg")
+
+        touched = cache.add_signals([signal("NVDA", 0.95), signal("TSLA", 0.5, "high")])
+
+        assert touched == 1
+        conservative = cache.get_summary("conservative||low")
+        assert [s["symbol"] for s in conservative["signals"]] == ["NVDA", "KO", "MSFT"]
+        assert conservative["total_signals_count"] == 5
+        assert cache.get_summary("aggressive|Energy|high")["signals"] == []
+
+    def test_bucket_index_expires_and_is_capped(self, monkeypatch):
+        client = FakeRedis()
+        cache = CoachCache(client=client, ttl=3600, max_buckets=2)
+        clock = [1000.0]
+        monkeypatch.setattr(coach_cache.time, "time", lambda: clock[0])
+
+        for bucket in ["conservative||low", "moderate||low", "aggressive||low"]:
+            clock[0] += 1
+            cache.set_summary(bucket, [], "msg")
+        assert cache.buckets() == ["aggressive||low", "moderate||low"]
+
+        clock[0] += 3601
+        assert cache.buckets() == []
+
+    def test_bucket_index_skips_malformed_entries(self):
+        client = FakeRedis()
+        cache = CoachCache(client=client)
+        cache.set_summary("moderate||medium", [], "msg")
+        client.zadd(coach_cache.BUCKET_INDEX_KEY, {"moderate|a|b|c": 1e12, "reckless||low": 1e12})
+
+        assert cache.buckets() == ["moderate||medium"]
+        assert cache.add_signals([signal("AAPL", 0.7)]) == 1
+
+    def test_outlook_is_stored_per_day(self):
+        cache = CoachCache(client=FakeRedis())
+        cache.set_outlook("2025-11-03", "Volatility is elevated ahead of earnings.")
+        assert cache.get_outlook("2025-11-03") == "Volatility is elevated ahead of earnings."
+        assert cache.get_outlook("2025-11-04") is None
+
+    def test_fallback_text_gets_a_short_ttl(self):
+        client = FakeRedis()
+        cache = CoachCache(client=client, ttl=3600)
+        cache.set_summary("moderate||medium", [signal("AAPL", 0.7)], "generated")
+        cache.set_summary("conservative||low", [signal("KO", 0.7)], "fallback", ttl=60)
+        cache.set_outlook("2025-11-03", "fallback outlook", ttl=60)
+
+        assert client.ttls["coach:bucket:moderate||medium"] == 3600
+        assert client.ttls["coach:bucket:moderate||medium:signals"] == 3600
+        assert client.ttls["coach:bucket:conservative||low"] == 60
+        assert client.ttls["coach:bucket:conservative||low:signals"] == 60
+        assert client.ttls["coach:outlook:2025-11-03"] == 60
+
+    def test_disabled_without_redis(self):
+        cache = CoachCache(redis_url=None)
+        cache.set_summary("moderate||medium", [signal("AAPL", 0.7)], "msg")
+        assert cache.get_summary("moderate||medium") is None
+        assert cache.add_signals([signal("AAPL", 0.7)]) == 0
@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("celery")
+pytest.importorskip("openai")
+pytest.importorskip("supabase")
+
+# ai_coach builds its Supabase client at import; nothing is called on it here
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+
+import ai_coach
+import coach_tasks
+
+
+class FakeOpenAI:
+    def __init__(self):
+        self.closed_on = None
+
+    async def close(self):
+        self.closed_on = asyncio.get_running_loop()
+
+
+class TestCoachTasks:
+    def test_runs_share_one_loop_and_close_the_client_on_it(self, monkeypatch):
+        client = FakeOpenAI()
+        monkeypatch.setattr(ai_coach, "openai_client", client)
+
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        first = coach_tasks.run_async(current_loop())
+        second = coach_tasks.run_async(current_loop())
+        assert first is second and not first.is_closed()
+
+        coach_tasks.close_event_loop()
+        assert client.closed_on is first
+        assert first.is_closed()
+        assert coach_tasks.run_async(current_loop()) is not first
+        coach_tasks.close_event_loop()
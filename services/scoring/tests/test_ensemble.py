@@ -0,0 +1,64 @@
+import pytest
+import sys
+import os
+import json
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.ensemble import EnsembleModel, EnsembleWeights, MODEL_NAMES
+
+
+def write_weights(path, weights):
+    with open(path, "w") as f:
+        json.dump(weights, f)
+
+
+class TestEnsemble:
+    def test_confidence_is_vectorized_per_row(self):
+        model = EnsembleModel()
+        scores = np.array([
+            [50.0, 50.0, 50.0],   # Full agreement
+            [20.0, 50.0, 80.0],   # std 24.49 -> 18.35
+            [90.0, 85.0, 95.0],   # Extreme average gets the 1.2 boost
+            [0.0, 100.0, 0.0]     # Disagreement clips to 0
+        ])
+        expected = [100.0, 100 - np.std([20, 50, 80]) / 30 * 100,
+                    min(100, (100 - np.std([90, 85, 95]) / 30 * 100) * 1.2), 0.0]
+        np.testing.assert_allclose(model._calculate_confidence(scores), expected)
+
+    def test_combine_uses_configured_weights(self, tmp_path):
+        path = tmp_path / "weights.json"
+        write_weights(path, {"rule_based": 1, "xgboost": 2, "lstm": 1})
+        model = EnsembleModel(weights=EnsembleWeights(str(path)))
+
+        scores = np.array([[40.0, 80.0, 60.0], [10.0, 10.0, 10.0]])
+        ensemble_scores, _ = model.combine(scores)
+        np.testing.assert_allclose(ensemble_scores, [65.0, 10.0])
+        assert model.weights == {"rule_based": 0.25, "xgboost": 0.5, "lstm": 0.25}
+
+    def test_weights_hot_reload_and_ignore_invalid_files(self, tmp_path):
+        path = tmp_path / "weights.json"
+        write_weights(path, {"rule_based": 0.3, "xgboost": 0.4, "lstm": 0.3})
+        weights = EnsembleWeights(str(path), check_interval=0)
+
+        write_weights(path, {"rule_based": 0, "xgboost": 1, "lstm": 0})
+        os.utime(path, ns=(1, 10 ** 18))
+        np.testing.assert_allclose(weights.current(), [0, 1, 0])
+
+        write_weights(path, {"rule_based": -1, "xgboost": 1, "lstm": 0})
+        os.utime(path, ns=(1, 2 * 10 ** 18))
+        np.testing.assert_allclose(weights.current(), [0, 1, 0])
+
+    def test_single_and_batch_predictions_share_a_path(self, tmp_path):
+        model = EnsembleModel()
+        model.xgb_model.model_dir = model.lstm_model.model_dir = str(tmp_path)
+        market_data = {"price_change_percent": 3, "volume_ratio": 2.5, "rsi": 55, "ma_signal": 1}
+
+        score, confidence, individual = model.predict(None, market_data)
+        assert list(individual) == list(MODEL_NAMES)
+        assert individual["rule_based"] == 50 + 10 + 15 + 10 + 12
+        weights = model.weight_config.current()
+        assert score == pytest.approx(sum(individual[name] * w for name, w in zip(MODEL_NAMES, weights)))
+        assert 0 <= confidence <= 100
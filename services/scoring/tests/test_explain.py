@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("openai")
+
+from explain import ExplainRequest, ExplanationCache, explanation_key, template_explanation
+
+
+class FakeCompletions:
+    def __init__(self, delay=0.02, fail=False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("rate limited")
+        text = "• Momentum is strong\n• Volume confirms the move\n• RSI has room to run"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+def fake_client(**kwargs):
+    completions = FakeCompletions(**kwargs)
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions)), completions
+
+
+RULES = [
+    {"name": "RSI Oversold", "value": "RSI at 28.0", "weight": 0.3},
+    {"name": "High Volume", "value": "2.1x average", "weight": 0.25},
+]
+
+
+class TestExplanationCache:
+    def test_key_ignores_case_order_and_extra_rules(self):
+        key = explanation_key("aapl", "buy", RULES)
+        assert key == explanation_key("AAPL", "BUY", list(reversed(RULES)))
+        top = RULES + [{"name": "Price Momentum", "value": "3.2% up"}]
+        assert explanation_key("AAPL", "BUY", top + [{"name": "Strong Signal", "value": 1}]) == \
+            explanation_key("AAPL", "BUY", top + [{"name": "Other", "value": 2}])
+        assert key != explanation_key("AAPL", "SELL", RULES)
+        assert key != explanation_key("MSFT", "BUY", RULES)
+
+    def test_template_served_while_pending_then_cached_result(self):
+        client, completions = fake_client()
+        cache = ExplanationCache(client=client)
+        request = ExplainRequest(symbol="AAPL", action="BUY", rule_matches=RULES)
+
+        async def run():
+            first = await asyncio.gather(*[cache.explain(request) for _ in range(10)])
+            await asyncio.sleep(0.05)
+            second = await cache.explain(request)
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert completions.calls == 1
+        assert all(r.source == "template" and r.pending for r in first)
+        assert first[0].bullets == template_explanation(request).bullets
+        assert second.source == "llm"
+        assert second.bullets[0] == "Momentum is strong"
+
+    def test_waits_for_model_within_budget(self):
+        client, completions = fake_client(delay=0.01)
+        cache = ExplanationCache(client=client, wait_seconds=1.0)
+        request = ExplainRequest(symbol="AAPL", rule_matches=RULES)
+
+        response = asyncio.run(cache.explain(request))
+        assert response.source == "llm"
+        assert completions.calls == 1
+
+    def test_failed_generation_falls_back_and_retries_later(self):
+        client, completions = fake_client(fail=True)
+        cache = ExplanationCache(client=client, wait_seconds=1.0)
+        request = ExplainRequest(symbol="AAPL", rule_matches=RULES)
+
+        async def run():
+            failed = await cache.explain(request)
+            completions.fail = False
+            return failed, await cache.explain(request)
+
+        failed, recovered = asyncio.run(run())
+        assert failed.source == "template" and not failed.pending
+        assert recovered.source == "llm"
+        assert completions.calls == 2
+
+    def test_template_is_deterministic_and_padded(self):
+        request = ExplainRequest(symbol="TSLA", action="sell", rule_matches=RULES[:1])
+        first, second = template_explanation(request), template_explanation(request)
+        assert first.bullets == second.bullets
+        assert len(first.bullets) == 3
+        assert first.bullets[0] == "RSI Oversold (RSI at 28.0) supports a SELL signal for TSLA"
@@ -0,0 +1,114 @@
+import pytest
+import sys
+import os
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feature_store import FeatureStore, RingBuffer, lstm_features
+from models.lstm_model import LSTMModel
+
+
+class FakeRedis:
+    def __init__(self):
+        self.lists = {}
+        self.values = {}
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+    def ltrim(self, key, start, end):
+        self.lists[key] = self.lists[key][start:]
+
+    def expire(self, key, ttl):
+        pass
+
+    def set(self, key, value, ex=None):
+        self.values[key] = str(value).encode()
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def lrange(self, key, start, end):
+        return self.lists.get(key, [])[start:]
+
+    def execute(self):
+        pass
+
+
+class TestFeatureStore:
+    def test_ring_buffer_windows_are_ordered_views(self):
+        buffer = RingBuffer(capacity=4, width=2)
+        for i in range(7):
+            buffer.append([i, -i])
+
+        window = buffer.window()
+        np.testing.assert_array_equal(window[:, 0], [3, 4, 5, 6])
+        np.testing.assert_array_equal(buffer.window(2)[:, 0], [5, 6])
+        assert np.shares_memory(window, buffer._data)
+        assert not window.flags.writeable
+
+    def test_sequences_pad_short_history_and_dedupe_timestamps(self):
+        store = FeatureStore(capacity=5, width=2)
+        assert store.update("AAPL", [1, 1], ts=100)
+        assert store.update("AAPL", [2, 2], ts=101)
+        assert not store.update("AAPL", [9, 9], ts=101)
+
+        np.testing.assert_array_equal(store.sequence("AAPL")[:, 0], [1, 1, 1, 1, 2])
+        assert store.sequences(["AAPL", "MSFT"]).shape == (2, 5, 2)
+        assert not store.sequence("MSFT").any()
+
+    def test_restart_rebuilds_from_redis(self):
+        redis = FakeRedis()
+        first = FeatureStore(capacity=3, width=2)
+        first.redis_client = redis
+        for i in range(5):
+            first.update("AAPL", [i, i], ts=i)
+
+        restarted = FeatureStore(capacity=3, width=2)
+        restarted.redis_client = redis
+        np.testing.assert_array_equal(restarted.window("AAPL"), first.window("AAPL"))
+        assert not restarted.update("AAPL", [0, 0], ts=4)
+
+    def test_lstm_sequence_comes_from_store(self):
+        store = FeatureStore(capacity=20)
+        model = LSTMModel(store=store)
+        snapshots = [{"rsi": 30 + i, "volume_ratio": 1.0 + i / 10} for i in range(25)]
+        for snapshot in snapshots[:-1]:
+            model._create_sequence(snapshot, "AAPL")
+
+        sequence = model._create_sequence(snapshots[-1], "AAPL")
+        assert sequence.shape == (20, 5)
+        np.testing.assert_array_equal(sequence[-1], lstm_features(snapshots[-1]))
+        np.testing.assert_allclose(sequence[:, 2], np.arange(35, 55) / 100)
+
+    def test_sequence_is_not_overwritten_by_later_updates(self):
+        store = FeatureStore(capacity=3, width=1)
+        for i in range(3):
+            store.update("AAPL", [i])
+        sequence = store.sequence("AAPL")
+        store.update("AAPL", [99])
+
+        np.testing.assert_array_equal(sequence[:, 0], [0, 1, 2])
+        assert sequence.flags.writeable
+
+    def test_duplicate_symbol_in_one_batch_keeps_each_sequence(self):
+        store = FeatureStore(capacity=20)
+        model = LSTMModel(store=store)
+        for i in range(20):
+            model._create_sequence({"rsi": i}, "AAPL")
+
+        seen = []
+        def fake_lstm(X, training=False):
+            seen.append(np.array(X))
+            return np.zeros((len(X), 1))
+        model._model, model._attempted = fake_lstm, True
+
+        model.predict_batch([{"rsi": 50}, {"rsi": 60}], ["AAPL", "AAPL"])
+        X = seen[0]
+        np.testing.assert_allclose(X[0, :, 2], np.append(np.arange(1, 20), 50) / 100)
+        np.testing.assert_allclose(X[1, :, 2], np.append(np.arange(2, 20), [50, 60]) / 100)
@@ -0,0 +1,56 @@
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicator_cache import IndicatorCache, frame_fingerprint
+from strategy_engine import StrategyEngine
+from test_strategy_engine import make_ohlcv, make_strategy
+
+
+class TestIndicatorCache:
+    def test_lru_eviction_and_counters(self):
+        """Oldest entries are evicted and lookups are counted"""
+        cache = IndicatorCache(max_entries=2)
+        cache.set("a", np.arange(3.0))
+        cache.set("b", np.arange(3.0))
+        assert cache.get("a") is not None  # "a" becomes most recent
+        cache.set("c", np.arange(3.0))
+
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["evictions"] == 1
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+
+    def test_cached_arrays_are_read_only(self):
+        cache = IndicatorCache()
+        values = cache.get_or_compute("k", lambda: np.ones(4))
+        assert not values.flags.writeable
+
+    def test_fingerprint_tracks_data(self):
+        data = make_ohlcv()
+        changed = data.copy()
+        changed.iloc[-1, changed.columns.get_loc("Close")] += 1
+
+        assert frame_fingerprint(data) == frame_fingerprint(data.copy())
+        assert frame_fingerprint(data) != frame_fingerprint(changed)
+
+    def test_repeated_backtests_reuse_series(self):
+        """A second evaluation of the same symbol and data is served from cache"""
+        engine = StrategyEngine(cache=IndicatorCache())
+        data = make_ohlcv()
+        strategy = make_strategy()
+
+        first = engine.evaluate_strategy(strategy, data, symbol="AAPL")
+        misses = engine.indicator_cache.stats()["misses"]
+        second = engine.evaluate_strategy(strategy, data, symbol="AAPL")
+
+        assert (first.values == second.values).all()
+        assert engine.indicator_cache.stats()["misses"] == misses
+        assert engine.indicator_cache.stats()["hits"] >= misses
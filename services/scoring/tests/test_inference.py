@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+import sys
+import os
+import threading
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("prometheus_client")
+
+from inference import MicroBatcher
+
+
+class RecordingModel:
+    """predict_batch with the EnsembleModel result shape that records batch sizes"""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.threads = set()
+        self.fail = fail
+
+    def predict_batch(self, symbols, market_data_list):
+        self.batches.append(len(symbols))
+        self.threads.add(threading.current_thread().name)
+        if self.fail:
+            raise ValueError("model failed")
+        values = np.array([m["value"] for m in market_data_list], dtype=float)
+        return values * 2, values / 10, {"rule_based": values, "xgboost": values + 1, "lstm": values - 1}
+
+
+class TestMicroBatcher:
+    def test_concurrent_requests_are_coalesced(self):
+        model = RecordingModel()
+
+        async def run():
+            batcher = MicroBatcher(model.predict_batch, max_batch=16, max_wait_ms=20, workers=1)
+            await batcher.start()
+            results = await asyncio.gather(*[batcher.submit(f"S{i}", {"value": i}) for i in range(40)])
+            await batcher.stop()
+            return results
+
+        results = asyncio.run(run())
+        assert results[7] == (14.0, 0.7, {"rule_based": 7.0, "xgboost": 8.0, "lstm": 6.0})
+        assert sum(model.batches) == 40
+        assert max(model.batches) == 16 and len(model.batches) <= 4
+        assert all(name.startswith("inference") for name in model.threads)
+
+    def test_batch_errors_reach_every_caller(self):
+        model = RecordingModel(fail=True)
+
+        async def run():
+            batcher = MicroBatcher(model.predict_batch, max_wait_ms=5)
+            await batcher.start()
+            results = await asyncio.gather(*[batcher.submit("S", {"value": 1}) for _ in range(3)],
+                                           return_exceptions=True)
+            await batcher.stop()
+            return results
+
+        assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+
+    def test_submit_requires_start(self):
+        batcher = MicroBatcher(RecordingModel().predict_batch)
+        with pytest.raises(RuntimeError):
+            asyncio.run(batcher.submit("S", {"value": 1}))
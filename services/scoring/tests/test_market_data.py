@@ -0,0 +1,122 @@
+import asyncio
+import json
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("prometheus_client")
+httpx = pytest.importorskip("httpx")
+
+from market_data import MarketDataService, FixtureMarketDataProvider, HTTPMarketDataProvider
+
+
+class CountingProvider:
+    """Wraps a provider, counting upstream fetches and holding each one open briefly"""
+
+    def __init__(self, provider, delay=0.02, fail=False):
+        self.provider = provider
+        self.delay = delay
+        self.fail = fail
+        self.fetches = 0
+
+    async def fetch(self, symbol, timeframe):
+        self.fetches += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return await self.provider.fetch(symbol, timeframe)
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def fixture_dir(tmp_path):
+    (tmp_path / "AAPL.json").write_text(json.dumps({"current_price": 190.5, "rsi": 62.0}))
+    (tmp_path / "MSFT.json").write_text(json.dumps({
+        "1d": {"current_price": 410.0, "rsi": 48.0},
+        "1h": {"current_price": 411.2, "rsi": 55.0}
+    }))
+    return str(tmp_path)
+
+
+class TestMarketDataService:
+    def test_concurrent_requests_share_one_fetch(self, fixture_dir):
+        provider = CountingProvider(FixtureMarketDataProvider(fixture_dir))
+        service = MarketDataService(provider)
+
+        async def run():
+            first = await asyncio.gather(*[service.snapshot("AAPL") for _ in range(25)])
+            second = await service.snapshot("aapl")
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert provider.fetches == 1
+        assert all(snapshot["current_price"] == 190.5 for snapshot in first)
+        assert second["as_of"] == first[0]["as_of"]
+
+    def test_snapshots_expire_by_timeframe(self, fixture_dir):
+        provider = CountingProvider(FixtureMarketDataProvider(fixture_dir), delay=0)
+        service = MarketDataService(provider, ttls={"1h": 0.05, "1d": 60})
+
+        async def run():
+            hourly = await service.snapshot("MSFT", "1h")
+            daily = await service.snapshot("MSFT", "1d")
+            await asyncio.sleep(0.1)
+            await service.snapshot("MSFT", "1h")
+            await service.snapshot("MSFT", "1d")
+            return hourly, daily
+
+        hourly, daily = asyncio.run(run())
+        assert hourly["current_price"] == 411.2
+        assert daily["current_price"] == 410.0
+        assert provider.fetches == 3  # Only the expired hourly snapshot was refetched
+
+    def test_callers_get_independent_copies(self, fixture_dir):
+        service = MarketDataService(FixtureMarketDataProvider(fixture_dir))
+
+        async def run():
+            snapshot = await service.snapshot("AAPL")
+            snapshot["current_price"] = 0
+            return await service.snapshot("AAPL")
+
+        assert asyncio.run(run())["current_price"] == 190.5
+
+    def test_failed_fetch_reaches_every_waiter_and_is_not_cached(self, fixture_dir):
+        provider = CountingProvider(FixtureMarketDataProvider(fixture_dir), fail=True)
+        service = MarketDataService(provider)
+
+        async def run():
+            results = await asyncio.gather(*[service.snapshot("AAPL") for _ in range(5)], return_exceptions=True)
+            provider.fail = False
+            return results, await service.snapshot("AAPL")
+
+        results, recovered = asyncio.run(run())
+        assert all(isinstance(result, ConnectionError) for result in results)
+        assert recovered["current_price"] == 190.5
+        assert provider.fetches == 2
+
+    def test_http_provider_uses_snapshot_endpoint(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"current_price": 101.0})
+
+        provider = HTTPMarketDataProvider("https://market.test", api_key="secret",
+                                          transport=httpx.MockTransport(handler))
+        service = MarketDataService(provider)
+
+        async def run():
+            snapshots = await service.snapshots(["AAPL", "AAPL", "MSFT"], "5m")
+            await service.close()
+            return snapshots
+
+        snapshots = asyncio.run(run())
+        assert [s["current_price"] for s in snapshots] == [101.0, 101.0, 101.0]
+        assert sorted(r.url.path for r in requests) == ["/snapshot/AAPL", "/snapshot/MSFT"]
+        assert requests[0].url.params["timeframe"] == "5m"
+        assert requests[0].headers["Authorization"] == "Bearer secret"
@@ -0,0 +1,89 @@
+import pytest
+import sys
+import os
+import json
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.base import LazyModel, ModelLoadError
+from models.ensemble import EnsembleModel
+
+
+class JsonModel(LazyModel):
+    """LazyModel over a JSON artifact that counts mock trainings"""
+    artifact_name = "weights.json"
+    trained = 0
+
+    def __init__(self, model_dir=None):
+        super().__init__(model_dir)
+        self.name = "json"
+
+    def _load_artifact(self, path):
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_artifact(self, model, path):
+        with open(path, "w") as f:
+            json.dump(model, f)
+
+    def _train_mock_model(self):
+        JsonModel.trained += 1
+        return {"bias": 1.5}
+
+    def _export_onnx(self, model, path):
+        raise RuntimeError("JSON weights have no ONNX form")
+
+    def _verify_onnx(self, path):
+        raise RuntimeError("JSON weights have no ONNX form")
+
+
+class BrokenModel(JsonModel):
+    def _load_artifact(self, path):
+        raise ValueError("corrupt artifact")
+
+
+class TestModelLoading:
+    def test_construction_does_not_load_frameworks(self):
+        model = EnsembleModel()
+        assert not model.xgb_model.loaded and not model.lstm_model.loaded
+        assert not model.ready
+        assert "tensorflow" not in sys.modules
+
+    def test_artifact_written_once_then_loaded(self, tmp_path):
+        JsonModel.trained = 0
+        first = JsonModel(str(tmp_path))
+        assert first.model == {"bias": 1.5}
+        assert first.load() == first.load_seconds
+        assert (tmp_path / "weights.json").exists()
+
+        second = JsonModel(str(tmp_path))
+        assert second.model == {"bias": 1.5}
+        assert JsonModel.trained == 1
+
+    def test_hooks_are_abstract(self):
+        class Incomplete(LazyModel):
+            def _load_artifact(self, path):
+                return None
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_failed_load_is_reported_not_loaded(self, tmp_path):
+        (tmp_path / "weights.json").write_text("{}")
+        model = BrokenModel(str(tmp_path))
+        assert model.model is None
+        assert not model.loaded
+        assert "corrupt artifact" in model.load_error
+
+    def test_warm_up_fails_and_stays_not_ready_when_a_model_fails(self, tmp_path):
+        (tmp_path / "weights.json").write_text("{}")
+        ensemble = EnsembleModel()
+        ensemble.xgb_model = BrokenModel(str(tmp_path))
+        ensemble.lstm_model = JsonModel(str(tmp_path / "lstm"))
+
+        with pytest.raises(ModelLoadError, match="corrupt artifact"):
+            ensemble.warm_up()
+        assert not ensemble.ready
+        assert list(ensemble.load_errors) == ["xgboost"]
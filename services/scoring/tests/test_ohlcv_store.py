@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ohlcv_store import OHLCVStore, FIELDS, FetchError, NoDataError
+from strategy_engine import StrategyEngine
+from indicator_cache import IndicatorCache
+from test_strategy_engine import make_ohlcv, make_strategy
+
+
+class RecordingFetcher:
+    """Serves slices of a synthetic frame and records requested ranges"""
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        self.calls = []
+
+    def __call__(self, symbol, start, end):
+        self.calls.append((symbol, start, end))
+        return self.data[(self.data.index >= start) & (self.data.index < end)]
+
+
+def write_slice(root, data):
+    OHLCVStore(root, fetcher=None).write("AAPL", data)
+
+
+class TestOHLCVStore:
+    def setup_method(self):
+        self.data = make_ohlcv(n=800)  # Spans 2023-2025
+
+    def test_round_trip_across_partitions(self, tmp_path):
+        store = OHLCVStore(str(tmp_path), fetcher=None)
+        store.write("AAPL", self.data)
+
+        loaded = store.read("AAPL", "2023-06-01", "2024-06-01")
+        expected = self.data.loc["2023-06-01":"2024-05-31"]
+
+        assert list(loaded.columns) == FIELDS
+        assert loaded.index.equals(expected.index)
+        np.testing.assert_allclose(loaded.values, expected.values)
+        assert (tmp_path / "AAPL" / "2023" / "Close.npy").exists()
+
+    def test_only_missing_ranges_are_fetched(self, tmp_path):
+        fetcher = RecordingFetcher(self.data)
+        store = OHLCVStore(str(tmp_path), fetcher=fetcher)
+
+        store.load("AAPL", "2023-03-01", "2023-09-01")
+        store.load("AAPL", "2023-03-01", "2023-09-01")
+        assert len(fetcher.calls) == 1
+
+        loaded = store.load("AAPL", "2023-01-01", "2023-12-01")
+        assert [(s.strftime("%Y-%m-%d"), e.strftime("%Y-%m-%d")) for _, s, e in fetcher.calls[1:]] == [
+            ("2023-01-01", "2023-03-01"),
+            ("2023-09-01", "2023-12-01"),
+        ]
+        assert loaded.index.equals(self.data.loc["2023-01-01":"2023-11-30"].index)
+
+    def test_backtest_runs_offline_and_deterministically(self, tmp_path):
+        store = OHLCVStore(str(tmp_path), fetcher=None)
+        store.write("AAPL", self.data)
+        engine = StrategyEngine(cache=IndicatorCache(), store=store)
+
+        first = engine.backtest_strategy(make_strategy(), "AAPL", "2023-01-01", "2024-01-01")
+        second = engine.backtest_strategy(make_strategy(), "AAPL", "2023-01-01", "2024-01-01")
+
+        assert first == second
+
+    def test_failed_fetch_is_not_recorded_as_covered(self, tmp_path):
+        responses = [pd.DataFrame(columns=FIELDS)]  # Transient failure, then data
+
+        def fetcher(symbol, start, end):
+            if responses:
+                return responses.pop()
+            return self.data[(self.data.index >= start) & (self.data.index < end)]
+
+        store = OHLCVStore(str(tmp_path), fetcher=fetcher)
+        assert store.load("AAPL", "2023-03-01", "2023-09-01").empty
+        assert store.missing_ranges("AAPL", "2023-03-01", "2023-09-01") != []
+
+        loaded = store.load("AAPL", "2023-03-01", "2023-09-01")
+        assert loaded.index.equals(self.data.loc["2023-03-01":"2023-08-31"].index)
+        assert store.missing_ranges("AAPL", "2023-03-01", "2023-09-01") == []
+
+    def test_recent_ranges_are_covered_up_to_the_last_bar(self, tmp_path):
+        today = pd.Timestamp.now().normalize()
+        recent = make_ohlcv(n=10)
+        recent.index = pd.date_range(end=today - pd.Timedelta(days=3), periods=10, freq="D")
+
+        store = OHLCVStore(str(tmp_path), fetcher=RecordingFetcher(recent))
+        store.load("AAPL", today - pd.Timedelta(days=30), today + pd.Timedelta(days=30))
+
+        assert store.missing_ranges("AAPL", today - pd.Timedelta(days=30), today + pd.Timedelta(days=30)) == [
+            (today - pd.Timedelta(days=2), today + pd.Timedelta(days=30))
+        ]
+
+    def test_writes_leave_no_temp_files(self, tmp_path):
+        store = OHLCVStore(str(tmp_path), fetcher=RecordingFetcher(self.data))
+        store.load("AAPL", "2023-01-01", "2024-06-01")
+        store.write("AAPL", self.data.loc["2023-06-01":"2023-07-01"])
+
+        assert not list(tmp_path.rglob("*.tmp"))
+        assert store.read("AAPL", "2023-01-01", "2024-06-01").index.equals(
+            self.data.loc["2023-01-01":"2024-05-31"].index)
+
+    def test_concurrent_process_writes_do_not_lose_rows(self, tmp_path):
+        slices = [self.data.iloc[i::4] for i in range(4)]  # Interleaved, so every partition is contended
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            list(executor.map(write_slice, [str(tmp_path)] * 4, slices))
+
+        loaded = OHLCVStore(str(tmp_path), fetcher=None).read("AAPL", "2000-01-01", "2100-01-01")
+        assert loaded.index.equals(self.data.index)
+        np.testing.assert_allclose(loaded.values, self.data.values)
+
+    @pytest.mark.parametrize("symbol", ["..", ".", "../etc", "AAPL/..", "A" * 16, "", "AA PL"])
+    def test_rejects_symbols_that_are_not_tickers(self, tmp_path, symbol):
+        store = OHLCVStore(str(tmp_path / "store"), fetcher=None)
+        with pytest.raises(ValueError):
+            store.write(symbol, self.data)
+        assert not (tmp_path / "store").exists() or not any((tmp_path / "store").iterdir())
+
+    @pytest.mark.parametrize("symbol", ["brk.b", "^GSPC", "ES=F", "BTC-USD"])
+    def test_accepts_ticker_formats(self, tmp_path, symbol):
+        store = OHLCVStore(str(tmp_path), fetcher=None)
+        store.write(symbol, self.data.iloc[:5])
+        assert len(store.read(symbol, "2000-01-01", "2100-01-01")) == 5
+
+    def test_backtest_raises_when_data_is_unavailable(self, tmp_path):
+        def down(symbol, start, end):
+            raise ConnectionError("provider down")
+
+        engine = StrategyEngine(cache=IndicatorCache(), store=OHLCVStore(str(tmp_path), fetcher=down))
+        with pytest.raises(FetchError):
+            engine.backtest_strategy(make_strategy(), "AAPL", "2023-01-01", "2024-01-01")
+
+        engine = StrategyEngine(cache=IndicatorCache(), store=OHLCVStore(str(tmp_path), fetcher=None))
+        with pytest.raises(NoDataError):
+            engine.backtest_strategy(make_strategy(), "AAPL", "2023-01-01", "2024-01-01")
@@ -0,0 +1,48 @@
+import pytest
+import sys
+import os
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.xgboost_model import XGBoostModel
+from models.lstm_model import LSTMModel
+from benchmark_runtime import market_data_batch
+
+
+class TestOnnxRuntime:
+    def test_missing_onnx_artifact_is_not_ready(self, tmp_path):
+        model = XGBoostModel(model_dir=str(tmp_path), runtime="onnx")
+        assert model.model is None
+        assert not model.loaded
+        assert "export_models.py --onnx" in model.load_error
+        assert not os.listdir(tmp_path)
+
+    @pytest.mark.parametrize("model_class", [XGBoostModel, LSTMModel])
+    def test_onnx_runtime_never_imports_the_frameworks(self, tmp_path, monkeypatch, model_class):
+        # The runtime image installs only onnxruntime; a None entry makes any import of these fail
+        for name in ("tensorflow", "xgboost", "onnxmltools", "tf2onnx"):
+            monkeypatch.setitem(sys.modules, name, None)
+
+        model = model_class(model_dir=str(tmp_path), runtime="onnx")
+        assert model.model is None
+        assert model.load_error.startswith("FileNotFoundError")
+
+    def test_unknown_runtime_is_rejected(self):
+        with pytest.raises(ValueError):
+            XGBoostModel(runtime="tensorrt")
+
+    def test_xgboost_onnx_export_matches_native(self, tmp_path):
+        pytest.importorskip("xgboost")
+        pytest.importorskip("onnxmltools")
+        pytest.importorskip("onnxruntime")
+
+        native = XGBoostModel(model_dir=str(tmp_path), runtime="native")
+        exported = native.export_onnx()
+        assert exported["max_abs_error"] < 1e-2
+
+        onnx = XGBoostModel(model_dir=str(tmp_path), runtime="onnx")
+        data = market_data_batch(200)
+        np.testing.assert_allclose(onnx.predict_batch(data), native.predict_batch(data), atol=1e-2)
+        assert onnx.predict("AAPL", data[0]) == pytest.approx(native.predict("AAPL", data[0]), abs=1e-2)
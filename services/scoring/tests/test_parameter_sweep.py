@@ -0,0 +1,142 @@
+import json
+import pytest
+import sys
+import os
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parameter_sweep
+from parameter_sweep import expand_grid, apply_point, router
+from ohlcv_store import OHLCVStore
+from strategy_engine import StrategyEngine, strategy_engine
+from indicator_cache import IndicatorCache
+from test_strategy_engine import make_ohlcv, make_strategy
+
+app = FastAPI()
+app.include_router(router, prefix="/api")
+client = TestClient(app)
+
+
+@pytest.fixture
+def local_store(tmp_path, monkeypatch):
+    store = OHLCVStore(str(tmp_path), fetcher=None)
+    store.write("AAPL", make_ohlcv(n=400))
+    monkeypatch.setattr(strategy_engine, "data_store", store)
+    return store
+
+
+def sweep_payload(grid):
+    return {
+        "strategy": make_strategy().model_dump(),
+        "symbol": "AAPL",
+        "start_date": "2023-01-01",
+        "end_date": "2024-01-01",
+        "parameter_grid": grid,
+        "top_n": 3
+    }
+
+
+def read_lines(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+class TestParameterSweep:
+    def test_expand_and_apply_grid(self):
+        points = expand_grid({"c1.value": [30, 40], "c1.period": [7, 14, 21]})
+        assert len(points) == 6
+
+        variant = apply_point(make_strategy(), {"c1.value": 30, "c1.period": 7})
+        assert variant.conditions[0].value == 30
+        assert variant.conditions[0].parameters["period"] == 7
+        assert make_strategy().conditions[0].parameters["period"] == 14
+
+        with pytest.raises(ValueError):
+            apply_point(make_strategy(), {"nope.value": 1})
+
+    @pytest.mark.parametrize("inline_points", [1000, 0])
+    def test_sweep_matches_direct_backtests(self, local_store, monkeypatch, inline_points):
+        """Inline and process-pool sweeps rank the same results as individual backtests"""
+        monkeypatch.setattr(parameter_sweep, "SWEEP_INLINE_POINTS", inline_points)
+        grid = {"c1.value": [35, 45, 55], "c4.period": [5, 10]}
+
+        response = client.post("/api/backtest/sweep", json=sweep_payload(grid))
+        assert response.status_code == 200
+
+        lines = read_lines(response)
+        assert lines[-1]["type"] == "complete"
+        assert lines[-1]["total"] == 6
+        ranked = lines[-1]["results"]
+        assert len(ranked) == 3
+        assert ranked[0]["result"]["sharpe_ratio"] >= ranked[-1]["result"]["sharpe_ratio"]
+
+        engine = StrategyEngine(cache=IndicatorCache(), store=local_store)
+        best = ranked[0]
+        direct = engine.backtest_strategy(apply_point(make_strategy(), best["parameters"]),
+                                          "AAPL", "2023-01-01", "2024-01-01")
+        assert direct.model_dump() == best["result"]
+
+    def test_rejects_oversized_grid(self, local_store, monkeypatch):
+        monkeypatch.setattr(parameter_sweep, "SWEEP_MAX_POINTS", 10)
+        payload = sweep_payload({"c1.value": list(range(50))})
+        payload["max_points"] = 10 ** 7  # Not a request field; cannot raise the limit
+        response = client.post("/api/backtest/sweep", json=payload)
+        assert response.status_code == 400
+
+    def test_rejects_huge_grid_without_expanding_it(self, local_store, monkeypatch):
+        def fail(grid):
+            raise AssertionError("grid expanded before the size check")
+
+        monkeypatch.setattr(parameter_sweep, "expand_grid", fail)
+        grid = {f"c1.p{i}": list(range(100)) for i in range(6)}  # 10**12 points
+        response = client.post("/api/backtest/sweep", json=sweep_payload(grid))
+        assert response.status_code == 400
+        assert str(10 ** 12) in response.json()["detail"]
+
+    def test_rejects_empty_grid(self, local_store):
+        for grid in ({}, {"c1.value": []}):
+            response = client.post("/api/backtest/sweep", json=sweep_payload(grid))
+            assert response.status_code == 400
+
+    def test_pool_sweeps_share_one_process_pool(self, local_store, monkeypatch):
+        monkeypatch.setattr(parameter_sweep, "SWEEP_INLINE_POINTS", 0)
+        grid = {"c1.value": [35, 45]}
+        try:
+            first = read_lines(client.post("/api/backtest/sweep", json=sweep_payload(grid)))
+            pool = parameter_sweep.sweep_pool()
+            second = read_lines(client.post("/api/backtest/sweep", json=sweep_payload(grid)))
+            assert parameter_sweep.sweep_pool() is pool
+            assert first[-1]["results"] == second[-1]["results"]
+        finally:
+            parameter_sweep.shutdown_pool()
+
+    @pytest.mark.parametrize("symbol, status", [("../AAPL", 400), ("MSFT", 404)])
+    def test_backtest_route_reports_unusable_symbols(self, local_store, symbol, status):
+        from strategy_engine import router as strategy_router
+
+        strategy_app = FastAPI()
+        strategy_app.include_router(strategy_router, prefix="/api")
+        payload = sweep_payload({})
+        del payload["parameter_grid"], payload["top_n"]
+        payload["symbol"] = symbol
+
+        response = TestClient(strategy_app).post("/api/backtest", json=payload)
+        assert response.status_code == status
+
+    def test_stream_is_strict_json_with_non_finite_metrics(self, local_store, monkeypatch):
+        def run_points(strategy, points, data, series, *args):
+            # No losing trades gives an infinite profit factor; an empty curve a NaN Sharpe
+            return [{"parameters": point, "result": {"sharpe_ratio": float("nan"), "profit_factor": float("inf")}}
+                    for point in points]
+
+        monkeypatch.setattr(parameter_sweep, "_run_points", run_points)
+        response = client.post("/api/backtest/sweep", json=sweep_payload({"c1.value": [35, 45]}))
+
+        def reject(constant):
+            raise ValueError(f"non-standard JSON constant {constant}")
+
+        lines = [json.loads(line, parse_constant=reject) for line in response.text.splitlines() if line]
+        assert lines[-1]["type"] == "complete"
+        assert lines[-1]["results"][0]["result"] == {"sharpe_ratio": None, "profit_factor": None}
@@ -0,0 +1,78 @@
+import pytest
+import sys
+import os
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parameter_sweep
+import portfolio_backtest
+from portfolio_backtest import backtest_portfolio, router
+from ohlcv_store import OHLCVStore
+from strategy_engine import StrategyEngine
+from indicator_cache import IndicatorCache
+from test_strategy_engine import make_ohlcv, make_strategy
+
+SYMBOLS = ["AAA", "BBB", "CCC", "DDD"]
+
+app = FastAPI()
+app.include_router(router, prefix="/api")
+client = TestClient(app)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = OHLCVStore(str(tmp_path), fetcher=None)
+    for seed, symbol in enumerate(SYMBOLS):
+        store.write(symbol, make_ohlcv(n=400, seed=seed))
+    return store
+
+
+class TestPortfolioBacktest:
+    def test_per_symbol_metrics_match_single_backtests(self, store):
+        """Each panel column reproduces the single-symbol backtest metrics"""
+        result = backtest_portfolio(make_strategy(), SYMBOLS, "2023-01-01", "2024-01-01", store=store)
+        engine = StrategyEngine(cache=IndicatorCache(), store=store)
+
+        assert [m.symbol for m in result.symbols] == SYMBOLS
+        for metrics in result.symbols:
+            single = engine.backtest_strategy(make_strategy(), metrics.symbol, "2023-01-01", "2024-01-01")
+            assert metrics.total_return == single.total_return
+            assert metrics.sharpe_ratio == single.sharpe_ratio
+            assert metrics.max_drawdown == single.max_drawdown
+
+    def test_chunked_universe_matches_single_pass(self, store, monkeypatch):
+        """Splitting the universe across worker processes gives the same result"""
+        single_pass = backtest_portfolio(make_strategy(), SYMBOLS, "2023-01-01", "2024-01-01",
+                                         allocation="signal", store=store)
+        monkeypatch.setattr(portfolio_backtest, "PORTFOLIO_CHUNK_SIZE", 1)
+        try:
+            chunked = backtest_portfolio(make_strategy(), SYMBOLS, "2023-01-01", "2024-01-01",
+                                         allocation="signal", store=store)
+            pool = parameter_sweep.sweep_pool()
+            backtest_portfolio(make_strategy(), SYMBOLS, "2023-01-01", "2024-01-01", store=store)
+            assert parameter_sweep.sweep_pool() is pool  # Shared with sweeps, not one per request
+        finally:
+            parameter_sweep.shutdown_pool()
+
+        assert chunked == single_pass
+
+    def test_missing_symbols_are_reported(self, store):
+        result = backtest_portfolio(make_strategy(), SYMBOLS + ["ZZZ"], "2023-01-01", "2024-01-01", store=store)
+        assert result.missing_symbols == ["ZZZ"]
+        assert len(result.symbols) == len(SYMBOLS)
+
+    def test_rejects_unknown_allocation(self, store):
+        with pytest.raises(ValueError):
+            backtest_portfolio(make_strategy(), SYMBOLS, "2023-01-01", "2024-01-01", allocation="kelly", store=store)
+
+    def test_rejects_too_many_symbols(self, monkeypatch):
+        monkeypatch.setattr(portfolio_backtest, "PORTFOLIO_MAX_SYMBOLS", 3)
+        response = client.post("/api/backtest/portfolio", json={
+            "strategy": make_strategy().model_dump(),
+            "symbols": SYMBOLS
+        })
+        assert response.status_code == 400
+        assert "limit is 3" in response.json()["detail"]
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import pytest
+import sys
+import os
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from progress import (ProgressPublisher, subscribe, last_event, format_sse, downsample, running_metrics,
+                      progress_channel, progress_key)
+
+
+class FakeRedis:
+    """In-memory pub/sub for the publisher and the async subscriber"""
+
+    def __init__(self):
+        self.values = {}
+        self.queues = {}
+
+    # Sync side (worker)
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    def _publish(self, channel, payload):
+        for queue in self.queues.get(channel, []):
+            queue.put_nowait({'type': 'message', 'data': payload})
+
+    # Async side (API)
+    async def get(self, key):
+        return self.values.get(key)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def publish(self, channel, payload):
+        self.ops.append(lambda: self.redis._publish(channel, payload))
+
+    def setex(self, key, ttl, payload):
+        self.ops.append(lambda: self.redis.values.__setitem__(key, payload))
+
+    def execute(self):
+        for op in self.ops:
+            op()
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis.queues.setdefault(channel, []).append(self.queue)
+
+    async def unsubscribe(self, channel):
+        self.redis.queues[channel].remove(self.queue)
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        pass
+
+
+class TestProgress:
+    def test_bars_publishes_partial_curve_and_metrics(self):
+        redis = FakeRedis()
+        values = 10000 * np.cumprod(1 + np.random.default_rng(0).normal(0, 0.01, 1000))
+        publisher = ProgressPublisher("t1", client=redis)
+        publisher.bars(values[:400], 1000)
+
+        last = json.loads(redis.values[progress_key("t1")])
+        assert last['type'] == 'progress'
+        assert (last['bars_processed'], last['total_bars'], last['percent']) == (400, 1000, 40.0)
+        assert last['metrics'] == running_metrics(values[:400])
+
+        publisher.bars(values, 1000)
+        last = json.loads(redis.values[progress_key("t1")])
+        assert last['bars_processed'] == last['total_bars'] == 1000
+        assert len(last['equity']) == 200
+        assert last['equity'][-1] == round(values[-1], 2)
+
+    def test_subscribe_streams_until_complete(self):
+        redis = FakeRedis()
+        publisher = ProgressPublisher("t2", client=redis)
+        publisher.stage("Starting backtest...")
+
+        async def run():
+            events = []
+            stream = subscribe("t2", client=redis, keepalive=0.05)
+            events.append(await stream.__anext__())  # Last state replayed first
+            values = np.linspace(100, 110, 50)
+            for processed in range(10, 60, 10):
+                publisher.bars(values[:processed], 50)
+            publisher.complete({'status': 'completed'})
+            async for event in stream:
+                if event is not None:
+                    events.append(event)
+            return events
+
+        events = asyncio.run(run())
+        assert [e['type'] for e in events] == ['stage'] + ['progress'] * 5 + ['complete']
+        assert [e['bars_processed'] for e in events[1:6]] == [10, 20, 30, 40, 50]
+        assert not redis.queues[progress_channel("t2")]
+
+    def test_late_subscriber_gets_terminal_state(self):
+        redis = FakeRedis()
+        ProgressPublisher("t3", client=redis).error("boom")
+
+        async def run():
+            return [event async for event in subscribe("t3", client=redis)]
+
+        assert asyncio.run(run()) == [{'task_id': 't3', 'type': 'error', 'error': 'boom'}]
+
+    def test_subscribe_ends_after_max_seconds(self):
+        redis = FakeRedis()
+        ProgressPublisher("t5", client=redis).stage("Queued")
+
+        async def run():
+            return [event async for event in subscribe("t5", client=redis, keepalive=0.01, max_seconds=0.05)]
+
+        events = asyncio.run(run())
+        assert events[0]['type'] == 'stage'
+        assert events[-1]['type'] == 'timeout'
+        assert all(event is None for event in events[1:-1])
+        assert not redis.queues[progress_channel("t5")]
+
+    def test_last_event(self):
+        redis = FakeRedis()
+        assert asyncio.run(last_event("t6", client=redis)) is None
+        ProgressPublisher("t6", client=redis).stage("Queued")
+        assert asyncio.run(last_event("t6", client=redis))['status'] == "Queued"
+
+    def test_helpers(self):
+        assert downsample(np.arange(5.0), max_points=10) == [0, 1, 2, 3, 4]
+        assert downsample(np.arange(1000.0), max_points=3) == [0, 500, 999]
+        assert format_sse({'type': 'stage', 'status': 'x'}) == 'event: stage\ndata: {"type": "stage", "status": "x"}\n\n'
+        assert ProgressPublisher("t4", client=None, redis_url=None).publish({'type': 'stage'}) is None
@@ -0,0 +1,145 @@
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("celery")
+pytest.importorskip("reportlab")
+pytest.importorskip("supabase")
+
+# storage builds its Supabase client at import; the tests replace every call on it
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+
+import report_tasks
+from backtest_artifacts import encode_backtest
+from backtest_tasks import generate_mock_backtest, calculate_metrics
+from report_generator import generate_csv_report, generate_pdf_report
+from result_cache import ResultCache
+from test_result_cache import FakeRedis
+
+
+class FakeStorage:
+    """Uploads kept in memory; fail_uploads makes every upload fail like upload_bytes_to_storage does"""
+
+    def __init__(self, artifacts=None, fail_uploads=False):
+        self.files = dict(artifacts or {})
+        self.uploads = []
+        self.fail_uploads = fail_uploads
+
+    def upload(self, payload, storage_path, content_type="application/octet-stream"):
+        self.uploads.append(storage_path)
+        if self.fail_uploads:
+            return ""
+        self.files[storage_path] = payload
+        return f"https://storage.test/{storage_path}"
+
+    def download(self, storage_path):
+        return self.files[storage_path]
+
+
+class FakeTable:
+    def __init__(self, updates):
+        self.updates = updates
+
+    def update(self, fields):
+        self.updates.append(dict(fields))
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def execute(self):
+        return None
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.updates = []
+
+    def table(self, name):
+        return FakeTable(self.updates)
+
+
+@pytest.fixture
+def backtest():
+    data = generate_mock_backtest("AAPL", 30, "1d")
+    return data, calculate_metrics(data)
+
+
+@pytest.fixture
+def env(monkeypatch, backtest):
+    data, _ = backtest
+    storage = FakeStorage({"backtests/AAPL_abc.npz": encode_backtest(data)})
+    db = FakeSupabase()
+    redis = FakeRedis()
+    cache = ResultCache(client=redis)
+
+    monkeypatch.setattr(report_tasks, "upload_bytes_to_storage", storage.upload)
+    monkeypatch.setattr(report_tasks, "download_from_storage", storage.download)
+    monkeypatch.setattr(report_tasks, "supabase", db)
+    monkeypatch.setattr(report_tasks, "result_cache", cache)
+    return storage, db, cache, redis
+
+
+def render(metrics):
+    return report_tasks.render_reports.apply(
+        args=("bt-1", "AAPL", "backtests/AAPL_abc.npz", metrics, "abc"),
+        kwargs={"request_hash": "hash", "backtest_task_id": "task-1"}
+    )
+
+
+class TestReportTasks:
+    def test_reports_render_in_memory(self, backtest):
+        data, metrics = backtest
+        csv = generate_csv_report("AAPL", data, metrics)
+        pdf = generate_pdf_report("AAPL", data, metrics)
+
+        assert csv.startswith(b"# Backtest Report for AAPL")
+        assert csv.count(b"\n") == 8 + 1 + len(data["dates"])  # Header comments, column row, bars
+        assert pdf.startswith(b"%PDF")
+
+    def test_render_uploads_and_records_urls(self, env, backtest):
+        storage, db, cache, _ = env
+        _, metrics = backtest
+        cache.set("hash", "task-1", {"status": "completed", "pdf_url": None, "csv_url": None})
+
+        result = render(metrics).get()
+
+        assert result["csv_url"] == "https://storage.test/backtests/AAPL_abc.csv"
+        assert result["pdf_url"].startswith("https://storage.test/reports/AAPL_")
+        assert db.updates == [{"pdf_url": result["pdf_url"], "csv_url": result["csv_url"],
+                               "report_status": "completed", "report_error": None}]
+        cached = cache.get("hash")["result"]
+        assert (cached["pdf_url"], cached["report_status"]) == (result["pdf_url"], "completed")
+
+    def test_pdf_is_rendered_once_per_report_hash(self, env, backtest, monkeypatch):
+        storage, _, _, _ = env
+        data, metrics = backtest
+        renders = []
+        monkeypatch.setattr(report_tasks, "generate_pdf_report",
+                            lambda *args: renders.append(args) or generate_pdf_report(*args))
+
+        first = report_tasks.cached_pdf_report("AAPL", data, metrics)
+        second = report_tasks.cached_pdf_report("AAPL", data, metrics)
+        assert first == second and len(renders) == 1
+
+        changed = dict(metrics, total_return=metrics["total_return"] + 1)
+        assert report_tasks.cached_pdf_report("AAPL", data, changed) != first
+        assert len(renders) == 2
+        assert len([path for path in storage.uploads if path.endswith(".pdf")]) == 2
+
+    def test_failed_uploads_retry_then_mark_the_report_failed(self, env, backtest):
+        storage, db, cache, _ = env
+        _, metrics = backtest
+        storage.fail_uploads = True
+        cache.set("hash", "task-1", {"status": "completed", "pdf_url": None, "csv_url": None})
+
+        outcome = render(metrics)
+
+        assert outcome.failed()
+        assert len(storage.uploads) == report_tasks.REPORT_MAX_RETRIES + 1  # First try plus retries
+        assert db.updates == [{"report_status": "failed", "report_error": "Failed to upload CSV report for AAPL"}]
+        assert cache.get("hash")["result"]["report_status"] == "failed"
@@ -0,0 +1,69 @@
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from result_cache import ResultCache, request_hash, market_data_version
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+
+class TestResultCache:
+    def test_request_hash_is_canonical(self):
+        key = request_hash("aapl", "1d", 30, "100:0")
+        assert key == request_hash("AAPL", "1d", 30, "100:0")
+        assert key != request_hash("AAPL", "1h", 30, "100:0")
+        assert key != request_hash("AAPL", "1d", 60, "100:0")
+        assert key != request_hash("AAPL", "1d", 30, "101:0")
+
+    def test_data_version_moves_with_new_bars_and_corrections(self):
+        redis = FakeRedis()
+        cache = ResultCache(client=redis)
+
+        assert market_data_version(redis, "AAPL", 86400, now=86400 * 10 + 5) == "10:0"
+        assert market_data_version(redis, "AAPL", 86400, now=86400 * 11) == "11:0"
+
+        assert cache.bump_market_data("aapl") == 1
+        assert market_data_version(redis, "AAPL", 86400, now=86400 * 11) == "11:1"
+        assert market_data_version(redis, "MSFT", 86400, now=86400 * 11) == "11:0"
+
+    def test_inflight_claims_coalesce_until_released(self):
+        cache = ResultCache(client=FakeRedis())
+
+        assert cache.claim("k", "task-1") is None
+        assert cache.claim("k", "task-2") == "task-1"
+
+        cache.set("k", "task-1", {"status": "completed"})
+        cache.release("k")
+        assert cache.get("k") == {"task_id": "task-1", "result": {"status": "completed"}}
+        assert cache.claim("k", "task-3") is None
+
+    def test_disabled_without_redis(self):
+        cache = ResultCache(redis_url=None)
+        assert cache.get("k") is None
+        assert cache.claim("k", "task-1") is None
+        assert cache.bump_market_data("AAPL") is None
@@ -0,0 +1,33 @@
+import pytest
+import sys
+import os
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.rule_based import RuleBasedModel
+
+
+class TestRuleBasedModel:
+    def test_batch_matches_single_predictions(self):
+        """Vectorized rules give the same score as the per-symbol path, boundaries included"""
+        rng = np.random.default_rng(0)
+        market_data_list = [
+            {
+                "price_change_percent": rng.uniform(-8, 8),
+                "volume_ratio": rng.uniform(0.2, 3.0),
+                "rsi": rng.uniform(5, 95),
+                "ma_signal": int(rng.integers(-1, 2))
+            }
+            for _ in range(500)
+        ]
+        market_data_list += [
+            {"price_change_percent": 5, "volume_ratio": 2.0, "rsi": 30, "ma_signal": 1},
+            {"price_change_percent": -2, "volume_ratio": 0.5, "rsi": 80, "ma_signal": -1},
+            {}
+        ]
+
+        model = RuleBasedModel()
+        expected = [model.predict("TEST", market_data) for market_data in market_data_list]
+        np.testing.assert_array_equal(model.predict_batch(market_data_list), expected)
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import pytest
+import sys
+import os
+import threading
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("prometheus_client")
+
+from signal_writer import SignalWriter
+
+
+class FlakyTable:
+    """Bulk insert that records batches and fails a set number of times first"""
+
+    def __init__(self, failures=0):
+        self.batches = []
+        self.failures = failures
+
+    def insert(self, rows):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.batches.append(list(rows))
+
+
+def rows(n, start=0):
+    return [{"symbol": f"S{i}", "confidence": 50.0} for i in range(start, start + n)]
+
+
+class TestSignalWriter:
+    def test_flushes_on_size_and_on_stop(self, tmp_path):
+        table = FlakyTable()
+
+        async def run():
+            writer = SignalWriter(table.insert, batch_size=10, flush_seconds=60,
+                                  spill_path=str(tmp_path / "spill.jsonl"))
+            await writer.start()
+            await writer.enqueue_many(rows(25))
+            await asyncio.sleep(0.05)
+            sizes_before_stop = [len(batch) for batch in table.batches]
+            await writer.stop()
+            return sizes_before_stop
+
+        assert asyncio.run(run()) == [10, 10]
+        assert [len(batch) for batch in table.batches] == [10, 10, 5]
+
+    def test_flushes_on_interval(self, tmp_path):
+        table = FlakyTable()
+
+        async def run():
+            writer = SignalWriter(table.insert, batch_size=100, flush_seconds=0.02,
+                                  spill_path=str(tmp_path / "spill.jsonl"))
+            await writer.start()
+            await writer.enqueue_many(rows(3))
+            await asyncio.sleep(0.1)
+            flushed = list(table.batches)
+            await writer.stop()
+            return flushed
+
+        assert asyncio.run(run()) == [rows(3)]
+
+    def test_retries_then_spills_and_replays(self, tmp_path):
+        spill_path = str(tmp_path / "spill.jsonl")
+        down = FlakyTable(failures=3)
+
+        async def fail():
+            writer = SignalWriter(down.insert, batch_size=5, max_retries=3, retry_delay=0.001, spill_path=spill_path)
+            await writer.start()
+            await writer.enqueue_many(rows(5))
+            await writer.stop()
+
+        asyncio.run(fail())
+        with open(spill_path) as f:
+            assert [json.loads(line) for line in f] == rows(5)
+
+        up = FlakyTable(failures=1)
+
+        async def recover():
+            writer = SignalWriter(up.insert, batch_size=5, retry_delay=0.001, spill_path=spill_path)
+            await writer.start()
+            await writer.stop()
+
+        asyncio.run(recover())
+        assert up.batches == [rows(5)]
+        assert not os.path.exists(spill_path)
+
+    def test_replay_skips_truncated_lines_and_picks_up_leftover_claims(self, tmp_path):
+        spill_path = str(tmp_path / "spill.jsonl")
+        with open(spill_path, "w") as f:
+            f.write("".join(json.dumps(row) + "\n" for row in rows(3)))
+            f.write('{"symbol": "S3", "confid')  # Crashed mid-append
+        with open(f"{spill_path}.replay", "w") as f:  # Left by a replay that crashed
+            f.write("".join(json.dumps(row) + "\n" for row in rows(2, start=10)))
+
+        table = FlakyTable()
+
+        async def run():
+            writer = SignalWriter(table.insert, batch_size=50, spill_path=spill_path)
+            await writer.start()
+            await writer.stop()
+
+        asyncio.run(run())
+        inserted = [row for batch in table.batches for row in batch]
+        assert sorted(r["symbol"] for r in inserted) == ["S0", "S1", "S10", "S11", "S2"]
+        assert os.listdir(tmp_path) == []
+
+    def test_replay_without_a_spill_file_is_a_no_op(self, tmp_path):
+        table = FlakyTable()
+
+        async def run():
+            writer = SignalWriter(table.insert, spill_path=str(tmp_path / "missing" / "spill.jsonl"))
+            await writer.start()
+            await writer.stop()
+
+        asyncio.run(run())
+        assert table.batches == []
+
+    def test_full_queue_spills_instead_of_blocking(self, tmp_path):
+        release = threading.Event()
+        table = FlakyTable()
+        spill_path = str(tmp_path / "spill.jsonl")
+
+        def slow_insert(batch):
+            release.wait(5)
+            table.insert(batch)
+
+        async def run():
+            writer = SignalWriter(slow_insert, batch_size=2, flush_seconds=60, max_queue=4, spill_path=spill_path)
+            await writer.start()
+            await asyncio.wait_for(writer.enqueue_many(rows(20)), 0.5)  # Never waits on the database
+            depth = writer._queue.qsize()
+            release.set()
+            await writer.stop()
+            return depth
+
+        assert asyncio.run(run()) <= 4
+        with open(spill_path) as f:
+            spilled = [json.loads(line) for line in f]
+        inserted = [row for batch in table.batches for row in batch]
+        assert len(spilled) >= 20 - 4 - 2  # At most a full queue plus the batch being inserted got through
+        assert sorted(r["symbol"] for r in inserted + spilled) == sorted(r["symbol"] for r in rows(20))
@@ -0,0 +1,94 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategy_engine import StrategyEngine, Strategy, StrategyCondition, StrategyLogic
+
+
+def make_ohlcv(n: int = 300, seed: int = 7) -> pd.DataFrame:
+    """Synthetic daily OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0.0005, 0.02, n))
+    index = pd.date_range("2023-01-01", periods=n, freq="D")
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.002, n)),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 5_000_000, n).astype(float)
+    }, index=index)
+
+
+def make_strategy() -> Strategy:
+    return Strategy(
+        name="parity",
+        conditions=[
+            StrategyCondition(id="c1", indicator="rsi", operator="<", value=45, timeframe="1d", parameters={"period": 14}),
+            StrategyCondition(id="c2", indicator="price", operator="cross_above", value=100, timeframe="1d"),
+            StrategyCondition(id="c3", indicator="macd", operator="cross_below", value=0, timeframe="1d"),
+            StrategyCondition(id="c4", indicator="sma", operator=">=", value=101, timeframe="1d", parameters={"period": 10}),
+            StrategyCondition(id="c5", indicator="bb", operator=">", value=99, timeframe="1d"),
+        ],
+        logic=StrategyLogic(groups=[
+            {"operator": "AND", "conditions": ["c1", "c4"]},
+            {"operator": "OR", "conditions": ["c2", "c3", "missing"]},
+            {"operator": "AND", "conditions": ["c5", "c1"]},
+        ])
+    )
+
+
+class TestVectorizedEvaluation:
+    def setup_method(self):
+        self.engine = StrategyEngine()
+        self.data = make_ohlcv()
+
+    def test_matches_loop_evaluation(self):
+        """Vectorized signals are identical to the bar-by-bar reference"""
+        strategy = make_strategy()
+        vectorized = self.engine.evaluate_strategy(strategy, self.data)
+        loop = self.engine.evaluate_strategy(strategy, self.data, vectorized=False)
+
+        assert vectorized.dtype == bool
+        assert vectorized.index.equals(self.data.index)
+        assert (vectorized.values == loop.values.astype(bool)).all()
+        assert vectorized.any()
+
+    @pytest.mark.parametrize("operator", [">", "<", ">=", "<=", "==", "cross_above", "cross_below"])
+    def test_each_operator_matches_loop(self, operator):
+        """Every operator gives the same mask in both modes"""
+        strategy = Strategy(
+            name=operator,
+            conditions=[StrategyCondition(id="c", indicator="rsi", operator=operator, value=50, timeframe="1d")],
+            logic=StrategyLogic(groups=[{"operator": "AND", "conditions": ["c"]}])
+        )
+        vectorized = self.engine.evaluate_strategy(strategy, self.data)
+        loop = self.engine.evaluate_strategy(strategy, self.data, vectorized=False)
+
+        assert (vectorized.values == loop.values.astype(bool)).all()
+
+    def test_unknown_indicator_yields_no_signals(self):
+        """Unknown indicators evaluate to False instead of raising"""
+        condition = StrategyCondition(id="c", indicator="unknown", operator=">", value=1, timeframe="1d")
+        mask = self.engine.evaluate_condition_vectorized(condition, self.data)
+
+        assert mask.shape == (len(self.data),)
+        assert not mask.any()
+
+    def test_indicator_computed_once_per_evaluation(self):
+        """Conditions sharing an indicator reuse one computed series"""
+        calls = []
+        original = self.engine.indicators["rsi"]
+
+        def counting_rsi(data, **params):
+            calls.append(params)
+            return original(data, **params)
+
+        self.engine.indicators["rsi"] = counting_rsi
+        self.engine.evaluate_strategy(make_strategy(), self.data)
+
+        assert len(calls) == 1
@@ -0,0 +1,50 @@
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import trade_kernel
+from trade_kernel import trade_ledger, trade_statistics
+
+PRICES = np.array([10.0, 11.0, 12.0, 11.0, 10.0, 9.0, 10.0, 12.0])
+HOLDINGS = np.array([0, 1, 1, 0, 0, 1, 1, 1], dtype=bool)
+
+
+class TestTradeLedger:
+    def test_runs_become_matched_trades(self):
+        """Each held run is one trade; the open run is marked to market on the last bar"""
+        trades = trade_ledger(HOLDINGS, PRICES, use_numba=False)
+
+        assert trades.dtype == trade_kernel.TRADE_DTYPE
+        assert trades['entry_index'].tolist() == [1, 5]
+        assert trades['exit_index'].tolist() == [3, 7]
+        np.testing.assert_allclose(trades['return'], [0.0, 12.0 / 9.0 - 1])
+
+    def test_costs_are_charged_per_side(self):
+        trades = trade_ledger(HOLDINGS, PRICES, commission=0.001, slippage=0.01, use_numba=False)
+        np.testing.assert_allclose(trades['entry_price'], [11.0 * 1.01, 9.0 * 1.01])
+        np.testing.assert_allclose(trades['exit_price'], [11.0 * 0.99, 12.0 * 0.99])
+        np.testing.assert_allclose(trades['return'], trades['exit_price'] / trades['entry_price'] - 1 - 0.002)
+
+    def test_statistics(self):
+        stats = trade_statistics(trade_ledger(np.array([1, 0, 1, 0, 1, 1], dtype=bool),
+                                              np.array([10.0, 12.0, 12.0, 9.0, 10.0, 11.0]), use_numba=False))
+        assert stats['total_trades'] == 3
+        assert stats['win_rate'] == pytest.approx(2 / 3)
+        assert stats['profit_factor'] == pytest.approx((0.2 + 0.1) / 0.25)
+        assert trade_statistics(trade_ledger(np.zeros(5, dtype=bool), np.ones(5)))['total_trades'] == 0
+
+    @pytest.mark.skipif(trade_kernel.njit is None, reason="numba not installed")
+    def test_numba_path_matches_numpy(self):
+        rng = np.random.default_rng(3)
+        holdings = rng.random(100_000) > 0.5
+        prices = 100 * np.cumprod(1 + rng.normal(0, 0.001, 100_000))
+
+        jitted = trade_ledger(holdings, prices, 0.0005, 0.0002, use_numba=True)
+        vectorized = trade_ledger(holdings, prices, 0.0005, 0.0002, use_numba=False)
+
+        for name in trade_kernel.TRADE_DTYPE.names:
+            np.testing.assert_allclose(jitted[name], vectorized[name])
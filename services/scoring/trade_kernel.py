@@ -0,0 +1,109 @@
+"""
+Trade-ledger kernel for strategy backtests
+
+`holdings[i]` is the position held after the close of bar i, i.e. the strategy
+signal. Each run of True bars is one trade: entered at the close of its first
+bar and exited at the close of the first bar after it. A trade still open on
+the last bar is marked to market there. Commission and slippage are fractions
+of price charged on each side.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the NumPy path gives identical ledgers
+    njit = None
+
+TRADE_DTYPE = np.dtype([
+    ('entry_index', np.int64),
+    ('exit_index', np.int64),
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('return', np.float64),
+])
+
+
+def _walk_holdings(holdings, prices, commission, slippage, entry_index, exit_index, entry_price, exit_price, returns):
+    """Single pass over the holdings array into preallocated buffers; returns the trade count"""
+    n_trades = 0
+    in_trade = False
+    entry = 0
+    last = len(holdings) - 1
+
+    for i in range(len(holdings)):
+        held = holdings[i]
+        if held and not in_trade:
+            in_trade = True
+            entry = i
+        if in_trade and (not held or i == last):
+            exit_bar = i
+            bought = prices[entry] * (1.0 + slippage)
+            sold = prices[exit_bar] * (1.0 - slippage)
+            entry_index[n_trades] = entry
+            exit_index[n_trades] = exit_bar
+            entry_price[n_trades] = bought
+            exit_price[n_trades] = sold
+            returns[n_trades] = sold / bought - 1.0 - 2.0 * commission
+            n_trades += 1
+            in_trade = False
+
+    return n_trades
+
+
+_walk_holdings_jit = njit(cache=True)(_walk_holdings) if njit is not None else None
+
+
+def trade_ledger(holdings, prices, commission: float = 0.0, slippage: float = 0.0, use_numba: bool = None) -> np.ndarray:
+    """Typed array of completed trades (TRADE_DTYPE), one entry per run of held bars"""
+    holdings = np.ascontiguousarray(holdings, dtype=np.bool_)
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    if use_numba is None:
+        use_numba = _walk_holdings_jit is not None
+
+    if use_numba and _walk_holdings_jit is not None:
+        capacity = len(holdings) // 2 + 1
+        buffers = [np.empty(capacity, dtype=np.int64), np.empty(capacity, dtype=np.int64),
+                   np.empty(capacity), np.empty(capacity), np.empty(capacity)]
+        n_trades = _walk_holdings_jit(holdings, prices, float(commission), float(slippage), *buffers)
+
+        trades = np.empty(n_trades, dtype=TRADE_DTYPE)
+        for name, buffer in zip(TRADE_DTYPE.names, buffers):
+            trades[name] = buffer[:n_trades]
+        return trades
+
+    # Vectorized path: run boundaries from the first difference of the holdings
+    edges = np.diff(holdings.astype(np.int8), prepend=0, append=0)
+    entries = np.flatnonzero(edges == 1)
+    exits = np.minimum(np.flatnonzero(edges == -1), len(holdings) - 1)
+
+    trades = np.empty(len(entries), dtype=TRADE_DTYPE)
+    trades['entry_index'] = entries
+    trades['exit_index'] = exits
+    trades['entry_price'] = prices[entries] * (1.0 + slippage)
+    trades['exit_price'] = prices[exits] * (1.0 - slippage)
+    trades['return'] = trades['exit_price'] / trades['entry_price'] - 1.0 - 2.0 * commission
+    return trades
+
+
+def trade_statistics(trades: np.ndarray) -> Dict[str, float]:
+    """Exact win rate and profit factor over a trade ledger"""
+    returns = trades['return']
+    if len(returns) == 0:
+        return {'total_trades': 0, 'win_rate': 0, 'profit_factor': 0}
+
+    gross_profit = returns[returns > 0].sum()
+    gross_loss = -returns[returns < 0].sum()
+
+    if gross_loss > 0:
+        profit_factor = gross_profit / gross_loss
+    else:
+        profit_factor = float('inf') if gross_profit > 0 else 0
+
+    return {
+        'total_trades': len(returns),
+        'win_rate': float((returns > 0).mean()),
+        'profit_factor': float(profit_factor)
+    }
@@ -25,6 +25,7 @@ interface BacktestStatus {
     };
     pdf_url: string;
     csv_url: string;
+    report_status?: 'pending' | 'completed' | 'failed';
   };
   error?: string;
 }
@@ -0,0 +1,5 @@
+-- Content-addressed lookup of completed backtests
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS request_hash TEXT;
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS task_id TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_backtests_request_hash ON backtests(request_hash);
@@ -0,0 +1,3 @@
+-- Report rendering state, so failed PDF/CSV reports are visible instead of staying null
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS report_status TEXT DEFAULT 'pending';
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS report_error TEXT;